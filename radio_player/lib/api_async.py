@@ -0,0 +1,220 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+import time
+import threading
+import asyncio
+import functools
+import weakref
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+LIBRARY_PATH  = MY_PATH
+PRODUCTION    = "production"
+STAGING       = "staging"
+DEVELOPMENT   = "development"
+
+# import custom libs
+sys.path.append(LIBRARY_PATH)
+try:
+    import api_client
+    import api_utils
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'api_client' and 'api_utils' libraries\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+# Concurrency limits (see podcast_player.conf). The per host limit
+# should not be larger than the http_pool_maxsize of the api client.
+ASYNC_MAX_CONCURRENCY = api_client.config_number("async_max_concurrency", 32, int)
+ASYNC_MAX_PER_HOST    = api_client.config_number("async_max_per_host",    api_client.HTTP_POOL_MAXSIZE, int)
+
+
+# ----------------------------------------------------------------------------- AsyncApiClient
+class AsyncApiClient(object):
+    """ asyncio front end for the api_utils calls. Every call is run on a
+        worker thread using the pooled api client, so the requests still
+        share keep-alive connections. A global semaphore bounds the total
+        number of calls in flight and a semaphore per host keeps one slow
+        environment from taking every slot. The semaphores belong to the
+        running event loop, so one client can be used by asyncio.run() more
+        than once. Cancelling a task releases its slots and stops any calls
+        that have not started yet. """
+
+    # -------------------------------------------------------------------------
+    def __init__(self,
+                 api_version     = "v1"                  ,
+                 environment     = STAGING               ,
+                 max_concurrency = ASYNC_MAX_CONCURRENCY ,
+                 max_per_host    = ASYNC_MAX_PER_HOST    ):
+
+        self.api_version     = api_version
+        self.environment     = environment
+        self.max_concurrency = max_concurrency
+        self.max_per_host    = max_per_host
+        self._executor       = ThreadPoolExecutor(max_workers=max_concurrency,
+                                                  thread_name_prefix="api_async")
+        self._semaphores     = weakref.WeakKeyDictionary()  # loop --> (global semaphore, {host: semaphore})
+
+    # -------------------------------------------------------------------------
+    def _loop_semaphores(self):
+        """ Return the global semaphore and the host semaphores of the
+            running loop, creating them on first use. An asyncio semaphore
+            can only be used on the loop it was first used on. """
+        loop = asyncio.get_running_loop()
+        semaphores = self._semaphores.get(loop)
+        if semaphores is None:
+            semaphores = (asyncio.Semaphore(self.max_concurrency), {})
+            self._semaphores[loop] = semaphores
+        return semaphores
+
+    # -------------------------------------------------------------------------
+    def _host_semaphore(self, host):
+        """ Return the semaphore for a host, creating it on first use """
+        host_semaphores = self._loop_semaphores()[LAST]
+        semaphore = host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_per_host)
+            host_semaphores[host] = semaphore
+        return semaphore
+
+    # -------------------------------------------------------------------------
+    async def _call(self, host, func, *args, **kwargs):
+        """ Run func on the worker pool once both a host slot and a global
+            slot are free. The host slot is taken first so that a task
+            waiting on a busy host never sits on a global slot. """
+        async with self._host_semaphore(host):
+            async with self._loop_semaphores()[FIRST]:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor,
+                                                  functools.partial(func, *args, **kwargs))
+
+    # -------------------------------------------------------------------------
+    def _host(self, environment):
+        return urlsplit(api_client.get_client(environment).base_url).netloc
+
+    # -------------------------------------------------------------------------
+    async def get_station_ids(self, api_version=None, environment=None):
+        """ Awaitable version of api_utils.get_station_ids() """
+        api_version = api_version or self.api_version
+        environment = environment or self.environment
+        return await self._call(self._host(environment), api_utils.get_station_ids,
+                                api_version=api_version, environment=environment)
+
+    # -------------------------------------------------------------------------
+    async def get_station_attributes(self, station_id, api_version=None, environment=None):
+        """ Awaitable version of api_utils.get_station_attributes() """
+        api_version = api_version or self.api_version
+        environment = environment or self.environment
+        return await self._call(self._host(environment), api_utils.get_station_attributes,
+                                station_id, api_version=api_version, environment=environment)
+
+    # -------------------------------------------------------------------------
+    async def station_id_2_podcast_list(self, station_id, api_version=None, environment=None):
+        """ Awaitable version of api_utils.station_id_2_podcast_list() """
+        api_version = api_version or self.api_version
+        environment = environment or self.environment
+        return await self._call(self._host(environment), api_utils.station_id_2_podcast_list,
+                                station_id, api_version=api_version, environment=environment)
+
+    # -------------------------------------------------------------------------
+    async def podcast_id_2_episodes(self, podcast_id, api_version=None, environment=None):
+        """ Awaitable version of api_utils.podcast_id_2_episodes() """
+        api_version = api_version or self.api_version
+        environment = environment or self.environment
+        return await self._call(self._host(environment), api_utils.podcast_id_2_episodes,
+                                podcast_id, api_version=api_version, environment=environment)
+
+    # -------------------------------------------------------------------------
+    async def fetch_all_station_attributes(self, ids=None):
+        """ Fetch the attributes of many stations at once. ids can be the
+            callsign --> station_id dictionary from get_station_ids() or any
+            iterable of station ids; when it is omitted every station from
+            get_station_ids() is fetched. Returns a dictionary keyed the
+            same way (callsign or station id) of station attributes. If the
+            caller is cancelled all of the outstanding fetches are cancelled
+            as well. """
+        if ids is None:
+            ids = await self.get_station_ids()
+
+        if isinstance(ids, Mapping):
+            keys = list(ids.keys())
+            station_ids = [ids[key] for key in keys]
+        else:
+            station_ids = list(ids)
+            keys = station_ids
+
+        tasks = [asyncio.ensure_future(self.get_station_attributes(station_id))
+                 for station_id in station_ids]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        return dict(zip(keys, results))
+
+    # -------------------------------------------------------------------------
+    def close(self):
+        """ Shut down the worker threads. Calls already running are allowed
+            to finish, queued calls are dropped. """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# =============================================================================
+# Unit tests, because Jon asked and he is right
+def test_call_is_bounded_per_host():
+    in_flight = [0, 0]  # current, peak
+    lock = threading.Lock()
+
+    def work():
+        with lock:
+            in_flight[FIRST] += 1
+            in_flight[LAST] = max(in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight[FIRST] -= 1
+
+    async def sweep():
+        client = AsyncApiClient(max_concurrency=8, max_per_host=2)
+        await asyncio.gather(*[client._call("localhost", work) for i in range(10)])
+        client.close()
+
+    asyncio.run(sweep())
+    assert in_flight[LAST] <= 2
+
+def test_fetch_all_station_attributes_keys():
+    async def fetch():
+        client = AsyncApiClient()
+        async def fake_attributes(station_id):
+            return {"id": station_id}
+        client.get_station_attributes = fake_attributes
+        result = await client.fetch_all_station_attributes({"WXYZ": 3, "KABC": 4})
+        client.close()
+        return result
+
+    assert asyncio.run(fetch()) == {"WXYZ": {"id": 3}, "KABC": {"id": 4}}
+
+def test_client_outlives_an_event_loop():
+    client = AsyncApiClient(max_concurrency=1, max_per_host=1)
+
+    async def calls():
+        return await asyncio.gather(*[client._call("localhost", lambda: "ok") for i in range(3)])
+
+    try:
+        assert asyncio.run(calls()) == ["ok"] * 3
+        assert asyncio.run(calls()) == ["ok"] * 3
+    finally:
+        client.close()
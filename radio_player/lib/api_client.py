@@ -0,0 +1,397 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+import time
+import threading
+from http import HTTPStatus
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+CONFIG_PATH   = os.path.join(MY_PATH, "../config")
+CONFIG_FILE   = os.path.join(CONFIG_PATH, "podcast_player.conf")
+LIBRARY_PATH  = MY_PATH
+PRODUCTION    = "production"
+STAGING       = "staging"
+DEVELOPMENT   = "development"
+
+# import custom libs
+sys.path.append(LIBRARY_PATH)
+try:
+    import podcast_player_utils
+    import response_cache
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'podcast_player_utils' and 'response_cache' libraries\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+# read configs
+CONFIGS = podcast_player_utils.config_2_dictionary(CONFIG_FILE)
+
+# assign base urls from config file
+api_base_urls = {PRODUCTION  : CONFIGS.get("prod_base_url", ""),
+                 STAGING     : CONFIGS.get("stg_base_url",  ""),
+                 DEVELOPMENT : CONFIGS.get("dev_base_url",  "")}
+
+# Get the v2 api auth token from the config file and use it to define
+# a header dictionary for v2 calls. The token is not kept in the repo
+# so fall back to an empty token rather than blowing up on import.
+v2_api_auth_token = CONFIGS.get("v2_api_auth_token", "")
+api_header = {"Authorization": v2_api_auth_token}
+
+
+# Third-part libraries, imported by import_requests() when the first session
+# is made
+requests    = None
+HTTPAdapter = None
+Retry       = None
+
+
+# ----------------------------------------------------------------------------- import_requests()
+def import_requests():
+    """ Import the requests library the first time a session is made and
+        return it. Importing it is a good part of starting the program, and
+        the GUI makes its first api call on a pool thread. """
+    global requests, HTTPAdapter, Retry
+    if requests is None:
+        try:
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            import requests
+        except ModuleNotFoundError:
+            sys.stderr.write("ERROR -- Unable to import the 'requests' library\n")
+            sys.stderr.write("         try: pip3 install requests --user\n")
+            sys.stderr.flush()
+            sys.exit(99)
+    return requests
+
+
+# ----------------------------------------------------------------------------- config_number()
+def config_number(key, default, cast=float):
+    """ Return the numeric value of a configuration key. If the key is
+        missing or is not a number then return the default. """
+    try:
+        return cast(CONFIGS[key])
+    except (KeyError, ValueError):
+        return default
+
+
+# Connection pool, timeout and retry settings (see podcast_player.conf)
+HTTP_CONNECT_TIMEOUT   = config_number("http_connect_timeout",   3.05)
+HTTP_READ_TIMEOUT      = config_number("http_read_timeout",      15.0)
+HTTP_RETRIES           = config_number("http_retries",           3,   int)
+HTTP_BACKOFF           = config_number("http_backoff",           0.3)
+HTTP_POOL_CONNECTIONS  = config_number("http_pool_connections",  4,   int)
+HTTP_POOL_MAXSIZE      = config_number("http_pool_maxsize",      16,  int)
+HTTP_RETRY_STATUSES    = (429, 500, 502, 503, 504)
+STREAM_CHUNK_SIZE      = 64 * 1024   # Bytes read at a time by ApiClient.stream()
+
+# Response cache settings (see podcast_player.conf)
+CACHE_ENABLED          = CONFIGS.get("cache_enabled", "yes").lower() in ("yes", "true", "1")
+CACHE_PATH             = CONFIGS.get("cache_path", os.path.join("/tmp", "podcast_player"))
+CACHE_MEMORY_BYTES     = config_number("cache_memory_mb", 32, int) * 1024 * 1024
+CACHE_TTLS             = {response_cache.STATION_LIST : config_number("cache_ttl_stations", 3600, int) ,
+                          response_cache.STATION      : config_number("cache_ttl_station",  600,  int) ,
+                          response_cache.PODCASTS     : config_number("cache_ttl_podcasts", 600,  int) ,
+                          response_cache.EPISODES     : config_number("cache_ttl_episodes", 300,  int) }
+
+
+# ----------------------------------------------------------------------------- cached_response()
+def cached_response(entry):
+    """ Build a requests.Response from a cache entry so callers can not
+        tell a cache hit from a 200 off the wire. from_cache is set on
+        the response for anyone who does want to know. """
+    requests = import_requests()
+    response = requests.models.Response()
+    response.status_code = HTTPStatus.OK
+    response.reason      = "OK"
+    response.url         = entry.url
+    response._content    = entry.body
+    response._content_consumed = True
+    response.encoding    = "utf-8"
+    response.headers     = requests.structures.CaseInsensitiveDict()
+    if entry.content_type:  response.headers["Content-Type"]  = entry.content_type
+    if entry.etag:          response.headers["ETag"]          = entry.etag
+    if entry.last_modified: response.headers["Last-Modified"] = entry.last_modified
+    response.from_cache  = True
+    return response
+
+
+# ----------------------------------------------------------------------------- ApiClient
+class ApiClient(object):
+    """ A pooled HTTP client for one API environment. All of the calls for
+        an environment share one requests.Session so that TCP and TLS
+        connections are kept alive and reused between calls. """
+
+    # -------------------------------------------------------------------------
+    def __init__(self,
+                 environment      = STAGING               ,
+                 base_url         = None                  ,
+                 connect_timeout  = HTTP_CONNECT_TIMEOUT  ,
+                 read_timeout     = HTTP_READ_TIMEOUT     ,
+                 retries          = HTTP_RETRIES          ,
+                 backoff          = HTTP_BACKOFF          ,
+                 pool_connections = HTTP_POOL_CONNECTIONS ,
+                 pool_maxsize     = HTTP_POOL_MAXSIZE     ,
+                 cache            = None                  ):
+
+        self.environment = environment
+        self.cache       = cache
+        self.base_url    = base_url if base_url is not None else api_base_urls[environment]
+        self.timeout     = (connect_timeout, read_timeout)
+        import_requests()
+
+        # Retry connection errors and transient server errors with an
+        # exponential back off. Once the retries are used up hand back the
+        # last response so callers still see the real status code.
+        retry = Retry(total            = retries             ,
+                      connect          = retries             ,
+                      read             = retries             ,
+                      status           = retries             ,
+                      backoff_factor   = backoff             ,
+                      status_forcelist = HTTP_RETRY_STATUSES ,
+                      allowed_methods  = frozenset(["GET", "HEAD"]),
+                      raise_on_status  = False               )
+
+        # pool_maxsize is the per-host connection limit, pool_block makes
+        # it a hard limit instead of opening throw-away connections.
+        adapter = HTTPAdapter(pool_connections = pool_connections ,
+                              pool_maxsize     = pool_maxsize     ,
+                              max_retries      = retry            ,
+                              pool_block       = True             )
+
+        self.session = requests.Session()
+        self.session.mount("http://",  adapter)
+        self.session.mount("https://", adapter)
+
+    # -------------------------------------------------------------------------
+    def api_url(self, api_version, path):
+        """ Build a full api url from the api version and the path
+            of the call, e.g. api_url("v1", "stations/3") """
+        return "%s/%s/%s" % (self.base_url, api_version, path)
+
+    # -------------------------------------------------------------------------
+    def get(self, url, headers=None):
+        """ Issue a GET on the pooled session and return the response.
+            When the client has a response cache a fresh entry is returned
+            without touching the network and a stale entry is revalidated
+            with a conditional request, so an unchanged payload only costs
+            a 304. Every listener is told about the call once it is done.
+            Exceptions are left to the caller to handle. """
+        start = time.perf_counter()
+        r = self._get(url, headers)
+        self._done(r, start)
+        return r
+
+    # -------------------------------------------------------------------------
+    def stream(self, url, headers=None, chunk_size=STREAM_CHUNK_SIZE):
+        """ Like get() but a generator of the body in chunks as they come
+            off the wire, for callers that can start on a large response
+            before all of it has arrived. A cached body comes back as one
+            chunk. The body is only stored in the cache, and the listeners
+            only told, once the last chunk has been read. Raises a
+            ValueError if the api does not answer with a 200. """
+        start = time.perf_counter()
+        r = self._get(url, headers, stream=True)
+        try:
+            if r.status_code != HTTPStatus.OK:
+                self._done(r, start)
+                raise ValueError("Bad Response (%d) from %s " % (r.status_code, url))
+            if r.from_cache:
+                yield r.content
+            else:
+                chunks = []
+                for chunk in r.iter_content(chunk_size):
+                    chunks.append(chunk)
+                    yield chunk
+                r._content = b"".join(chunks)  # So r.content still works for the listeners
+                self._store(url, r)
+        finally:
+            r.close()
+        self._done(r, start)
+
+    # -------------------------------------------------------------------------
+    def _done(self, r, start):
+        r.elapsed_ms = (time.perf_counter() - start) * 1000.0
+        for listener in list(_listeners):
+            try:
+                listener(self, r)
+            except Exception as e:
+                sys.stderr.write("ERROR -- api call listener failed for %s\n" % r.url)
+                sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
+                sys.stderr.flush()
+
+    # -------------------------------------------------------------------------
+    def _get(self, url, headers, stream=False):
+        if self.cache is None:
+            r = self.session.get(url, headers=headers, timeout=self.timeout, stream=stream)
+            r.from_cache = False
+            return r
+
+        key   = response_cache.cache_key(self.environment, url)
+        entry = self.cache.lookup(key)
+        if entry is not None and self.cache.is_fresh(entry):
+            return cached_response(entry)
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            request_headers.update(entry.conditional_headers())
+
+        r = self.session.get(url, headers=request_headers, timeout=self.timeout, stream=stream)
+        if r.status_code == HTTPStatus.NOT_MODIFIED and entry is not None:
+            r.close()
+            self.cache.revalidated(key, entry)
+            r = cached_response(entry)
+            r.revalidated = True
+            return r
+        r.from_cache = False
+        if not stream:
+            self._store(url, r)
+        return r
+
+    # -------------------------------------------------------------------------
+    def _store(self, url, r):
+        """ Keep the body of a 200 in the cache """
+        if self.cache is None or r.status_code != HTTPStatus.OK:
+            return
+        self.cache.store(response_cache.cache_key(self.environment, url),
+                         response_cache.CacheEntry(url                                      ,
+                                                   r.content                                ,
+                                                   r.headers.get("Content-Type",  "")       ,
+                                                   r.headers.get("ETag",          "")       ,
+                                                   r.headers.get("Last-Modified", "")       ))
+
+    # -------------------------------------------------------------------------
+    def close(self):
+        """ Close all of the pooled connections """
+        self.session.close()
+
+
+# One client per environment and one response cache shared by all
+# of them, created on first use
+_clients      = {}
+_clients_lock = threading.Lock()
+_cache        = None
+_listeners    = []
+
+
+# ----------------------------------------------------------------------------- add_listener()
+def add_listener(listener):
+    """ Have listener(client, response) called after every api call made by
+        any client. It is called on the thread that made the call, which is
+        often not the GUI thread. response.elapsed_ms and from_cache are
+        set, and revalidated on a cache hit that took a 304. This is the
+        one place to hang logging and metrics off. """
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+# ----------------------------------------------------------------------------- remove_listener()
+def remove_listener(listener):
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+# ----------------------------------------------------------------------------- get_response_cache()
+def get_response_cache():
+    """ Return the shared response cache or None if caching is turned off
+        in the config file. """
+    global _cache
+    if not CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = response_cache.ResponseCache(os.path.join(CACHE_PATH, "api"),
+                                              CACHE_MEMORY_BYTES,
+                                              CACHE_TTLS)
+    return _cache
+
+
+# ----------------------------------------------------------------------------- get_client()
+def get_client(environment=STAGING):
+    """ Return the shared ApiClient for an environment, creating it on
+        first use. Safe to call from any thread. """
+    with _clients_lock:
+        client = _clients.get(environment)
+        if client is None:
+            client = ApiClient(environment, cache=get_response_cache())
+            _clients[environment] = client
+        return client
+
+
+# ----------------------------------------------------------------------------- set_base_url()
+def set_base_url(environment, base_url):
+    """ Send the calls for an environment to a different host from now on,
+        e.g. a local stand-in server. The current client for the environment
+        is closed and the next get_client() makes a new one. """
+    with _clients_lock:
+        api_base_urls[environment] = base_url
+        client = _clients.pop(environment, None)
+    if client is not None:
+        client.close()
+
+
+# ----------------------------------------------------------------------------- close_clients()
+def close_clients():
+    """ Close and forget every shared client """
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+# =============================================================================
+# Unit tests, because Jon asked and he is right
+def test_get_client_is_shared():
+    assert get_client(STAGING) is get_client(STAGING)
+
+def test_get_client_per_environment():
+    assert get_client(STAGING) is not get_client(PRODUCTION)
+
+def test_api_url():
+    client = ApiClient(STAGING, base_url="http://localhost")
+    assert client.api_url("v1", "stations/3") == "http://localhost/v1/stations/3"
+
+def test_cache_revalidates_with_etag():
+    import tempfile
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+
+    calls = []
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            calls.append(self.headers.get("If-None-Match"))
+            if self.headers.get("If-None-Match") == '"1"':
+                self.send_response(304)
+                self.end_headers()
+            else:
+                self.send_response(200)
+                self.send_header("ETag", '"1"')
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    cache  = response_cache.ResponseCache(tempfile.mkdtemp(), ttls={response_cache.STATION: 0})
+    client = ApiClient(STAGING, base_url="http://127.0.0.1:%d" % server.server_port, cache=cache)
+    heard  = []
+    listener = lambda client, r: heard.append(r.from_cache)
+    add_listener(listener)
+    first  = client.get(client.api_url("v1", "stations/3"))
+    second = client.get(client.api_url("v1", "stations/3"))
+    cache.clear()
+    third  = b"".join(client.stream(client.api_url("v1", "stations/3")))
+    fourth = b"".join(client.stream(client.api_url("v1", "stations/3")))
+    remove_listener(listener)
+    server.shutdown()
+    assert calls == [None, '"1"', None, '"1"'] and heard == [False, True, False, True]
+    assert third == fourth == b"{}"
+    assert second.status_code == 200 and second.content == b"{}" and second.from_cache
@@ -0,0 +1,211 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+CONFIG_PATH   = os.path.join(MY_PATH, "../config")
+CONFIG_FILE   = os.path.join(CONFIG_PATH, "podcast_player.conf")
+LIBRARY_PATH  = MY_PATH
+PRODUCTION    = "production"
+STAGING       = "staging"
+DEVELOPMENT   = "development"
+
+# import custom libraries
+sys.path.append(LIBRARY_PATH)
+try:
+    import podcast_player_utils
+    import api_utils
+    import bench
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'podcast_player_utils', 'api_utils' and 'bench' libraries\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+CONFIGS        = podcast_player_utils.config_2_dictionary(CONFIG_FILE)
+PARITY_WORKERS = int(CONFIGS.get("sweep_workers", "8"))
+
+# The two versions compared, the one we have and the one we would move to
+OLD_VERSION = "v1"
+NEW_VERSION = "v2"
+VERSIONS    = (OLD_VERSION, NEW_VERSION)
+
+# Stations are asked for this many at a time, so a long station list never
+# queues thousands of calls on the pool at once
+BATCH_SIZE = 50
+
+
+# ----------------------------------------------------------------------------- timed()
+def timed(function, *args):
+    """ Call function(*args), returns (result, error, elapsed ms). Never
+        raises, a failed call has a result of None and the error text. """
+    start = time.perf_counter()
+    try:
+        result, error = function(*args), ""
+    except Exception as e:
+        result, error = None, str(e)
+    return (result, error, (time.perf_counter() - start) * 1000.0)
+
+
+# ----------------------------------------------------------------------------- _comparable()
+def _comparable(value):
+    """ v1 and v2 do not always agree on types, e.g. an id as 12 or "12",
+        numbers are compared as text so that is not reported as a mismatch """
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return str(value)
+    return value
+
+
+# ----------------------------------------------------------------------------- compare_records()
+def compare_records(old, new):
+    """ Compare the common records of one station from the two versions.
+        Returns (mismatched, only_old, only_new) lists of field names. """
+    mismatched = [field for field in old if field in new and _comparable(old[field]) != _comparable(new[field])]
+    only_old   = [field for field in old if field not in new]
+    only_new   = [field for field in new if field not in old]
+    return (mismatched, only_old, only_new)
+
+
+# ----------------------------------------------------------------------------- check_station()
+def check_station(environment, station_id):
+    """ Fetch one station from both versions at the same time and compare
+        them. Returns a parity dictionary:
+
+            {"id", "v1_ms", "v2_ms", "v1_error", "v2_error", "mismatched",
+             "only_v1", "only_v2"} """
+    with ThreadPoolExecutor(max_workers=len(VERSIONS), thread_name_prefix="parity_station") as executor:
+        futures = {version: executor.submit(timed, api_utils.get_adapter(version).station, environment, station_id)
+                   for version in VERSIONS}
+        results = {version: future.result() for version, future in futures.items()}
+
+    (old, old_error, old_ms), (new, new_error, new_ms) = results[OLD_VERSION], results[NEW_VERSION]
+    mismatched, only_old, only_new = [], [], []
+    if old is not None and new is not None:
+        mismatched, only_old, only_new = compare_records(old, new)
+    return {"id"                      : str(station_id)    ,
+            "%s_ms" % OLD_VERSION     : round(old_ms, 3)   ,
+            "%s_ms" % NEW_VERSION     : round(new_ms, 3)   ,
+            "%s_error" % OLD_VERSION  : old_error          ,
+            "%s_error" % NEW_VERSION  : new_error          ,
+            "mismatched"              : mismatched         ,
+            "only_%s" % OLD_VERSION   : only_old           ,
+            "only_%s" % NEW_VERSION   : only_new           }
+
+
+# ----------------------------------------------------------------------------- station_lists()
+def station_lists(environment):
+    """ The station list from both versions, fetched at the same time.
+        Returns {version: (list of station ids, error, elapsed ms)}. """
+    def station_ids(version):
+        return [str(station["id"]) for station in api_utils.iter_stations(version, environment)]
+
+    with ThreadPoolExecutor(max_workers=len(VERSIONS), thread_name_prefix="parity_list") as executor:
+        futures = {version: executor.submit(timed, station_ids, version) for version in VERSIONS}
+        return {version: future.result() for version, future in futures.items()}
+
+
+# ----------------------------------------------------------------------------- int_key()
+def int_key(station_id):
+    """ Sort key putting numeric ids in numeric order """
+    return (len(station_id), station_id)
+
+
+# ----------------------------------------------------------------------------- check_parity()
+def check_parity(environment=STAGING, workers=PARITY_WORKERS, max_stations=0, batch_size=BATCH_SIZE):
+    """ Generator of parity dictionaries, one per station in either
+        version's station list, in station order. The stations are
+        checked batch_size at a time on a pool of workers threads, each
+        check fetching the station from both versions at once. Never
+        raises, failed calls are in the errors of the dictionaries. The
+        first dictionary is the compare of the station lists themselves:
+
+            {"id": "stations", "v1_ms", "v2_ms", "v1_error", "v2_error",
+             "v1_count", "v2_count", "only_v1", "only_v2"} """
+    lists = station_lists(environment)
+    (old_ids, old_error, old_ms), (new_ids, new_error, new_ms) = lists[OLD_VERSION], lists[NEW_VERSION]
+    old_ids, new_ids = old_ids or [], new_ids or []
+    yield {"id"                       : "stations"                                        ,
+           "%s_ms" % OLD_VERSION      : round(old_ms, 3)                                  ,
+           "%s_ms" % NEW_VERSION      : round(new_ms, 3)                                  ,
+           "%s_error" % OLD_VERSION   : old_error                                         ,
+           "%s_error" % NEW_VERSION   : new_error                                         ,
+           "%s_count" % OLD_VERSION   : len(old_ids)                                      ,
+           "%s_count" % NEW_VERSION   : len(new_ids)                                      ,
+           "only_%s" % OLD_VERSION    : sorted(set(old_ids) - set(new_ids), key=int_key)  ,
+           "only_%s" % NEW_VERSION    : sorted(set(new_ids) - set(old_ids), key=int_key)  }
+
+    station_ids = sorted(set(old_ids) | set(new_ids), key=int_key)
+    if max_stations > 0:
+        station_ids = station_ids[:max_stations]
+    # Each check runs its two calls on a thread of its own, so halve the
+    # pool to keep workers calls in flight
+    with ThreadPoolExecutor(max_workers=max(1, workers // len(VERSIONS)), thread_name_prefix="parity") as executor:
+        for start in range(0, len(station_ids), max(1, batch_size)):
+            batch = station_ids[start:start + max(1, batch_size)]
+            yield from executor.map(lambda station_id: check_station(environment, station_id), batch)
+
+
+# ----------------------------------------------------------------------------- summarize()
+def summarize(results):
+    """ Latency of each version side by side over the station checks, and
+        counts of the stations that differ or failed. The station list
+        dictionary, if it is in results, is left out of the latency. """
+    stations = [result for result in results if result["id"] != "stations"]
+    summary  = {"stations": len(stations),
+                "mismatched": sum(1 for result in stations
+                                  if result["mismatched"] or result["only_%s" % OLD_VERSION]
+                                  or result["only_%s" % NEW_VERSION])}
+    for version in VERSIONS:
+        times = [result["%s_ms" % version] for result in stations if not result["%s_error" % version]]
+        summary["%s_errors" % version]  = sum(1 for result in stations if result["%s_error" % version])
+        summary["%s_p50_ms" % version]  = round(bench.percentile(times, 0.50), 3)
+        summary["%s_p95_ms" % version]  = round(bench.percentile(times, 0.95), 3)
+        summary["%s_mean_ms" % version] = round(sum(times) / len(times), 3) if times else 0.0
+    old_p50, new_p50 = summary["%s_p50_ms" % OLD_VERSION], summary["%s_p50_ms" % NEW_VERSION]
+    summary["faster"] = "" if not (old_p50 and new_p50) else (NEW_VERSION if new_p50 < old_p50 else OLD_VERSION)
+    return summary
+
+
+# ----------------------------------------------------------------------------- report()
+def report(summary):
+    """ The summary as a table, the versions side by side """
+    lines = ["%-10s %10s %10s %10s %8s" % ("version", "p50 ms", "p95 ms", "mean ms", "errors")]
+    for version in VERSIONS:
+        lines.append("%-10s %10.1f %10.1f %10.1f %8d" % (version, summary["%s_p50_ms" % version],
+                                                         summary["%s_p95_ms" % version],
+                                                         summary["%s_mean_ms" % version],
+                                                         summary["%s_errors" % version]))
+    lines.append("%d stations, %d differ, faster: %s" % (summary["stations"], summary["mismatched"],
+                                                         summary["faster"] or "-"))
+    return "\n".join(lines)
+
+
+# =============================================================================
+# Unit tests, because Jon asked and he is right
+def test_compare_records():
+    old = {"id": "12", "callsign": "KAAA", "band": "FM", "slug": "kaaa"}
+    new = {"id": 12,   "callsign": "KAAB", "band": "FM", "logo": "x.png"}
+    assert compare_records(old, new) == (["callsign"], ["slug"], ["logo"])
+
+def test_summarize():
+    results = [{"id": "stations", "v1_ms": 90.0, "v2_ms": 30.0, "v1_error": "", "v2_error": ""}]
+    for number, (old_ms, new_ms) in enumerate(((10.0, 4.0), (20.0, 6.0), (30.0, 0.0))):
+        results.append({"id": str(number), "v1_ms": old_ms, "v2_ms": new_ms, "v1_error": "",
+                        "v2_error": "Bad Response (404)" if number == 2 else "",
+                        "mismatched": ["callsign"] if number == 1 else [], "only_v1": [], "only_v2": []})
+    summary = summarize(results)
+    assert summary["stations"] == 3 and summary["mismatched"] == 1 and summary["v2_errors"] == 1
+    assert summary["v1_p50_ms"] == 20.0 and summary["v2_mean_ms"] == 5.0 and summary["faster"] == NEW_VERSION
+    assert "faster: v2" in report(summary)
@@ -2,7 +2,9 @@
 
 import sys
 import os
-import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import urljoin
 
 
 VERSION       = "1.0.0"
@@ -20,9 +22,10 @@ STAGING       = "staging"
 DEVELOPMENT   = "development"
 CONFIG_PATH   = os.path.join(MY_PATH, "../config")
 
-api_base_urls = {PRODUCTION  : "" ,
-                 STAGING     : "" ,
-                 DEVELOPMENT : "" }
+# Page sizes for the paginated api calls
+STATIONS_PAGE_SIZE = 400
+PODCASTS_PAGE_SIZE = 100
+EPISODES_PAGE_SIZE = 100
 
 # import custom libs
 sys.path.append(LIBRARY_PATH)
@@ -34,30 +37,300 @@ except:
     sys.stderr.flush()
     sys.exit(98)
 
-# Third-part library imports
 try:
-   import requests
-except:
-   sys.stderr.wite("ERROR -- Unable to import the 'vlc' library\n")
-   sys.stderr.wite("         try: pip3 install requests --user\n")
-   sys.stderr.flush()
-   sys.exit(99)
+    import api_client
+    import json_codec
+    import records
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'api_client', 'json_codec' and 'records' libraries\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
 
 # read configs 
 CONFIGS =  podcast_player_utils.config_2_dictionary(CONFIG_FILE)
 
-api_url_single_station =  CONFIGS["api_base_url"] + "/" + CONFIGS["api_version"] + "/" + "stations/"
+# The most pages read of any one paginated call (see podcast_player.conf)
+MAX_PAGES = api_client.config_number("api_max_pages", 1000, int)
+
+# The v2 api auth token and header dictionary for v2 calls
+# are read from the config file by the api client
+v2_api_auth_token = api_client.v2_api_auth_token
+api_header = api_client.api_header
+
+# Threads that fetch the next page while the caller works on the current one
+_prefetch_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="api_prefetch")
+
+
+# ----------------------------------------------------------------------------- _fetch_page()
+def _fetch_page(api_call_url, environment, headers=None):
+    """ Fetch one page of an api call and return the decoded response.
+        Raises a ValueError if the api does not answer with a 200. """
+    r = api_client.get_client(environment).get(api_call_url, headers=headers)
+    if r.status_code != HTTPStatus.OK:
+        raise ValueError("Bad Response (%d) from %s " % (r.status_code, api_call_url))
+    return json_codec.loads(r.content)
+
+
+# ----------------------------------------------------------------------------- _stream_page()
+def _stream_page(api_call_url, environment, headers=None, key="data", document=None):
+    """ Generator of the items of one page, a list at a time, as they come
+        off the wire. Once it is done document holds the rest of the
+        response, e.g. its links. Raises a ValueError if the api does not
+        answer with a 200. """
+    parser = json_codec.ItemParser(key)
+    for chunk in api_client.get_client(environment).stream(api_call_url, headers=headers):
+        items = parser.feed(chunk)
+        if items:
+            yield items
+    items, rest = parser.close()
+    if document is not None:
+        document.update(rest)
+    if items:
+        yield items
+
+
+# ----------------------------------------------------------------------------- next_page_url()
+def next_page_url(api_call_url, page_url, page_number, document, count, page_size):
+    """ The url of the page after page_url, page page_number of a paginated
+        v1 api call with count items on it, or "" when it is the last one.
+        Follows links.next in the document when the api provides it and
+        otherwise stops at the first short page, or after MAX_PAGES pages. """
+    next_url = ""
+    links = document.get("links") or {}
+    if links.get("next"):
+        next_url = urljoin(page_url, links["next"])
+    elif count >= page_size:
+        next_url = "%s&page[number]=%d" % (api_call_url, page_number + 1)
+    if count == 0 or next_url == page_url:
+        next_url = ""
+    if next_url and page_number >= MAX_PAGES:
+        sys.stderr.write("WARNING -- Stopped after %d pages of %s\n" % (page_number, api_call_url))
+        sys.stderr.flush()
+        next_url = ""
+    return next_url
+
+
+# ----------------------------------------------------------------------------- repeated_page()
+def repeated_page(items, last_items):
+    """ True if a page starts with the same item as the page before it, as
+        it does from an api that ignores page[number] and answers every
+        page with the first one """
+    if not items or not last_items:
+        return False
+    first, last_first = items[FIRST], last_items[FIRST]
+    if isinstance(first, dict) and isinstance(last_first, dict):
+        first, last_first = first.get("id"), last_first.get("id")
+    if first is None or first != last_first:
+        return False
+    sys.stderr.write("WARNING -- The api answered page after page with the same items, stopped\n")
+    sys.stderr.flush()
+    return True
+
+
+# ----------------------------------------------------------------------------- iter_pages()
+def iter_pages(api_call_url, page_size, environment=STAGING, headers=None, key="data"):
+    """ Generator of (page url, list of items) for every page of a paginated
+        v1 api call. api_call_url is the call without a page number. With
+        no fast JSON library the first page is streamed and its items
+        handed over in batches as they arrive. Each page after it is fetched in the background while the
+        caller works on the page before. Paging follows links.next when the
+        api provides it and otherwise stops at the first short page. Raises
+        a ValueError if any page can not be fetched. """
+    page_number = 1
+    page_url    = "%s&page[number]=%d" % (api_call_url, page_number)
+    future      = None
+    try:
+        # The caller is waiting on the first page anyway so fetch it on
+        # this thread, only the pages after it go to the prefetch threads
+        python_data = {}
+        count       = 0
+        last_items  = []  # The first items of the page before, to spot a repeated page
+        if json_codec.STREAM_ITEMS:
+            for items in _stream_page(page_url, environment, headers, key, python_data):
+                last_items = last_items or items[:1]
+                count     += len(items)
+                yield (page_url, items)
+            items = None
+        else:
+            python_data = _fetch_page(page_url, environment, headers)
+            items       = python_data.get(key, [])
+            count       = len(items)
+
+        while True:
+            # Work out the next page and start fetching it before
+            # handing this page to the caller
+            next_url = next_page_url(api_call_url, page_url, page_number, python_data, count, page_size)
+
+            this_url = page_url
+            if next_url:
+                page_number += 1
+                page_url = next_url
+                future   = _prefetch_executor.submit(_fetch_page, page_url, environment, headers)
+
+            if items is not None:
+                last_items = items[:1]
+                yield (this_url, items)
+
+            if future is None:
+                break
+            python_data = future.result()
+            future      = None
+            items       = python_data.get(key, [])
+            count       = len(items)
+            if repeated_page(items, last_items):
+                break
+    finally:
+        if future is not None:
+            future.cancel()
+
+
+# ----------------------------------------------------------------------------- V1Adapter
+class V1Adapter(object):
+    """ The v1 api is JSON:API: every item is {"id", "type", "attributes"}
+        and lists are paginated. Records are normalized to a flat
+        records.Record of the attributes, with "id" always set. """
+
+    api_version = "v1"
+
+    # -------------------------------------------------------------------------
+    def record(self, item, kind=records.Record):
+        return next(records.from_items(kind, (item,), unwrap=True))
+
+    # -------------------------------------------------------------------------
+    def records(self, kind, items):
+        return records.from_items(kind, items, unwrap=True)
+
+    # -------------------------------------------------------------------------
+    def list_call(self, environment, kind, parent_id=None, page_size=None):
+        """ The call listing the stations, the podcasts of station parent_id
+            or the episodes of podcast parent_id, by the record class kind.
+            Returns (url without a page number, page size, headers, key of
+            the items). """
+        if kind is records.Station:
+            page_size = page_size or STATIONS_PAGE_SIZE
+            path      = "stations?page[size]=%d" % page_size
+        elif kind is records.Podcast:
+            page_size = page_size or PODCASTS_PAGE_SIZE
+            path      = "podcasts?filter[station_id]=%s&page[size]=%d" % (parent_id, page_size)
+        else:
+            page_size = page_size or EPISODES_PAGE_SIZE
+            path      = "episodes?filter[podcast_id]=%s&page[size]=%d" % (parent_id, page_size)
+        return (api_client.get_client(environment).api_url(self.api_version, path), page_size, None, "data")
+
+    # -------------------------------------------------------------------------
+    def iter_stations(self, environment, page_size=STATIONS_PAGE_SIZE):
+        api_call_url = self.list_call(environment, records.Station, page_size=page_size)[FIRST]
+        for page_url, items in iter_pages(api_call_url, page_size, environment):
+            yield from records.from_items(records.Station, items, unwrap=True)
+
+    # -------------------------------------------------------------------------
+    def station(self, environment, station_id):
+        api_call_url = api_client.get_client(environment).api_url(self.api_version, "stations/%s" % station_id)
+        return self.record(_fetch_page(api_call_url, environment)["data"], records.Station)
+
+    # -------------------------------------------------------------------------
+    def podcast(self, environment, podcast_id):
+        api_call_url = api_client.get_client(environment).api_url(self.api_version, "podcasts/%s" % podcast_id)
+        return self.record(_fetch_page(api_call_url, environment)["data"], records.Podcast)
+
+    # -------------------------------------------------------------------------
+    def iter_station_podcasts(self, environment, station_id, page_size=PODCASTS_PAGE_SIZE):
+        api_call_url = self.list_call(environment, records.Podcast, station_id, page_size)[FIRST]
+        for page_url, items in iter_pages(api_call_url, page_size, environment):
+            yield from records.from_items(records.Podcast, items, unwrap=True)
+
+    # -------------------------------------------------------------------------
+    def iter_podcast_episodes(self, environment, podcast_id, page_size=EPISODES_PAGE_SIZE):
+        api_call_url = self.list_call(environment, records.Episode, podcast_id, page_size)[FIRST]
+        for page_url, items in iter_pages(api_call_url, page_size, environment):
+            yield from records.from_items(records.Episode, items, unwrap=True)
+
+
+# ----------------------------------------------------------------------------- V2Adapter
+class V2Adapter(object):
+    """ The v2 api needs the auth header and hands back flat objects, which
+        only need turning into records. Lists are not paginated. Podcasts and
+        episodes can not be filtered by station or podcast in v2 yet, so
+        those lists are always empty. """
+
+    api_version = "v2"
+
+    # -------------------------------------------------------------------------
+    def records(self, kind, items):
+        return records.from_items(kind, items)
+
+    # -------------------------------------------------------------------------
+    def list_call(self, environment, kind, parent_id=None, page_size=None):
+        """ Like V1Adapter.list_call(), the page size is 0 as there is only
+            the one page. None for the podcast and episode lists v2 does
+            not have yet. """
+        if kind is not records.Station:
+            return None
+        return (api_client.get_client(environment).api_url(self.api_version, "stations"), 0, api_header, "stations")
+
+    # -------------------------------------------------------------------------
+    def iter_stations(self, environment, page_size=STATIONS_PAGE_SIZE):
+        api_call_url = self.list_call(environment, records.Station)[FIRST]
+        yield from records.from_items(records.Station, _fetch_page(api_call_url, environment, headers=api_header)["stations"])
+
+    # -------------------------------------------------------------------------
+    def station(self, environment, station_id):
+        api_call_url = api_client.get_client(environment).api_url(self.api_version, "stations/%s" % station_id)
+        return records.Station.from_dict(_fetch_page(api_call_url, environment, headers=api_header)["station"],
+                                         records.Station.fields)
+
+    # -------------------------------------------------------------------------
+    def podcast(self, environment, podcast_id):
+        api_call_url = api_client.get_client(environment).api_url(self.api_version, "podcasts/%s" % podcast_id)
+        return records.Podcast.from_dict(_fetch_page(api_call_url, environment, headers=api_header)["podcast"],
+                                         records.Podcast.fields)
+
+    # -------------------------------------------------------------------------
+    def iter_station_podcasts(self, environment, station_id, page_size=PODCASTS_PAGE_SIZE):
+        # *** PODCAST FILTER BY STATION ID NOT YET IMPLEMENTED IN V2 API ***
+        return iter(())
+
+    # -------------------------------------------------------------------------
+    def iter_podcast_episodes(self, environment, podcast_id, page_size=EPISODES_PAGE_SIZE):
+        # *** EPISODES FILTER BY PODCAST ID NOT YET IMPLEMENTED IN V2 API ***
+        return iter(())
+
+
+ADAPTERS = {V1Adapter.api_version : V1Adapter() ,
+            V2Adapter.api_version : V2Adapter() }
+
+
+# ----------------------------------------------------------------------------- get_adapter()
+def get_adapter(api_version):
+    """ Return the adapter for an api version. Raises a ValueError for an
+        api version we know nothing about. """
+    try:
+        return ADAPTERS[api_version]
+    except KeyError:
+        raise ValueError("Unknown api version %s" % api_version)
+
+
+# ----------------------------------------------------------------------------- iter_stations()
+def iter_stations(api_version="v1", environment=STAGING, page_size=STATIONS_PAGE_SIZE):
+    """ Generator of every station record from the api, page by page.
+        Raises a ValueError if anything goes wrong. """
+    return get_adapter(api_version).iter_stations(environment, page_size)
+
+
+# ----------------------------------------------------------------------------- iter_station_podcasts()
+def iter_station_podcasts(station_id, api_version="v1", environment=STAGING, page_size=PODCASTS_PAGE_SIZE):
+    """ Generator of every podcast record for a station, page by page.
+        Raises a ValueError if anything goes wrong. """
+    return get_adapter(api_version).iter_station_podcasts(environment, station_id, page_size)
 
-# assign base urls from config file
-api_base_urls[PRODUCTION]  = CONFIGS["prod_base_url"]
-api_base_urls[STAGING]     = CONFIGS["stg_base_url"]
-api_base_urls[DEVELOPMENT] = CONFIGS["dev_base_url"]
 
-# Get the v2 api auth token from the config file
-# and use it to define a header dictionary for
-# v2 requests.get() calls
-v2_api_auth_token = CONFIGS["v2_api_auth_token"]
-api_header = {"Authorization": v2_api_auth_token}
+# ----------------------------------------------------------------------------- iter_podcast_episodes()
+def iter_podcast_episodes(podcast_id, api_version="v1", environment=STAGING, page_size=EPISODES_PAGE_SIZE):
+    """ Generator of every episode record for a podcast, page by page.
+        Raises a ValueError if anything goes wrong. """
+    return get_adapter(api_version).iter_podcast_episodes(environment, podcast_id, page_size)
 
 
 # ----------------------------------------------------------------------------- get_station_ids()
@@ -66,48 +339,8 @@ def get_station_ids(api_version="v1", environment=STAGING):
         wrong then return an empty dictionary. """
     station_data = {}
     try:
-
-        # Call out hte the API using the correct environment base url
-        # and the correct api version string
-
-        if api_version == "v1":
-
-            base_url = api_base_urls[environment]
-            api_call_url = "%s/%s/stations?page[size]=400" %(base_url, api_version)
-            r = "NO DATA"
-            r = requests.get(api_call_url)
-            if r == "NO DATA":
-                raise ValueError("No data from %s" %api_call_url)
-            else:
-                if r.status_code == requests.codes.ok:
-                    response = r.text
-                    python_data = json.loads(response)
-                    for item in python_data["data"]:
-                        station_data[item["attributes"]["callsign"]] = item["attributes"]["id"]
-                else:
-                    raise ValueError("Bad Response (%d) from %s " %(r.status_code, api_call_url))
-
-        if api_version == "v2":
-            # V2 calls use a special header and reutrn data differently
-            # than v1 calls.
-
-            base_url = api_base_urls[environment]
-            api_call_url = "%s/%s/stations" % (base_url, api_version)
-            r = "NO DATA"
-            r = requests.get(api_call_url,headers=api_header)
-            if r == "NO DATA":
-                raise ValueError("No data from %s" % api_call_url)
-            else:
-                if r.status_code == requests.codes.ok:
-                    response = r.text
-                    python_data = json.loads(response)
-                    for item in python_data["stations"]:
-                        station_data[item["callsign"]] = item["id"]
-                else:
-                    raise ValueError("Bad Response (%d) from %s " % (r.status_code, api_call_url))
-
-        else:
-            pass
+        for station in iter_stations(api_version, environment):
+            station_data[station["callsign"]] = station["id"]
 
     except Exception as e:
         sys.stderr.write("ERROR -- Unalbe to obtain information for stations\n")
@@ -122,51 +355,10 @@ def get_station_attributes(station_id, api_version="v1", environment=STAGING):
     """ Given a station ID return a dictionary of key-value pairs where each
         each key-value pair is a station attribute. If anything goes wrong
         return a empty dictionary. """
-
     station_id = str(station_id)
     station_attributes = {}
     try:
-
-
-        # Call out to the the API using the correct environment base url
-        # and the correct api version string
-
-        if api_version == "v1":
-
-            base_url = api_base_urls[environment]
-            api_call_url = "%s/%s/stations/%s" % (base_url, api_version, station_id)
-            r = "NO DATA"
-            r = requests.get(api_call_url)
-            if r == "NO DATA":
-                raise ValueError("No data from %s" % api_call_url)
-            else:
-                if r.status_code == requests.codes.ok:
-                    response = r.text
-                    python_data = json.loads(response)
-                    station_attributes =  python_data["data"]["attributes"]
-                else:
-                    raise ValueError("Bad Response (%d) from %s " % (r.status_code, api_call_url))
-
-        if api_version == "v2":
-            # V2 calls use a special header and reutrn data differently
-            # than v1 calls.
-
-            base_url = api_base_urls[environment]
-            api_call_url = "%s/%s/stations/%s" % (base_url, api_version, station_id)
-            r = "NO DATA"
-            r = requests.get(api_call_url, headers=api_header)
-            if r == "NO DATA":
-                raise ValueError("No data from %s" % api_call_url)
-            else:
-                if r.status_code == requests.codes.ok:
-                    response = r.text
-                    python_data = json.loads(response)
-                    station_attributes = python_data["station"]
-                else:
-                    raise ValueError("Bad Response (%d) from %s " % (r.status_code, api_call_url))
-
-        else:
-            pass
+        station_attributes = get_adapter(api_version).station(environment, station_id)
 
     except Exception as e:
         sys.stderr.write("ERROR -- Unable to obtain information for station %s\n" %station_id)
@@ -178,59 +370,12 @@ def get_station_attributes(station_id, api_version="v1", environment=STAGING):
 
 # ----------------------------------------------------------------------------- station_id_2_podcast_list()
 def station_id_2_podcast_list(station_id, api_version="v1", environment=STAGING):
-    """ Given a station ID return a list of podcasts for that station. If
-        anything goes wrong return an empty list.  """
+    """ Given a station ID return a list of podcast records for that station.
+        If anything goes wrong return an empty list.  """
     podcast_list = []
     station_id = str(station_id)
-    r = "NO DATA"
     try:
-
-        # Call out to the the API using the correct environment base url
-        # and the correct api version string
-
-        if api_version == "v1":
-
-            base_url = api_base_urls[environment]
-            api_call_url = "%s/%s/podcasts?filter[station_id]=%s&page[size]=100" % (base_url, api_version, station_id)
-            r = "NO DATA"
-            r = requests.get(api_call_url)
-            if r == "NO DATA":
-                raise ValueError("No data from %s" % api_call_url)
-            else:
-                if r.status_code == requests.codes.ok:
-                    response = r.text
-                    python_data = json.loads(response)
-                    podcast_list = python_data["data"]
-                else:
-                    raise ValueError("Bad Response (%d) from %s " % (r.status_code, api_call_url))
-
-        if api_version == "v2":
-            # V2 calls use a special header and reutrn data differently
-            # than v1 calls.
-            pass
-
-            # *** ********************************************************** ***
-            # *** PODCAST FILTER BY STATION ID NOT YET IMPLEMENTED IN V2 API ***
-            # *** ********************************************************** ***
-
-            """  
-            base_url = api_base_urls[environment]
-            api_call_url = "%s/%s/podcasts?filter[station_id]=%s&page[size]=100" % (base_url, api_version, station_id)
-            r = "NO DATA"
-            r = requests.get(api_call_url, headers=api_header)
-            if r == "NO DATA":
-                raise ValueError("No data from %s" % api_call_url)
-            else:
-                if r.status_code == requests.codes.ok:
-                    response = r.text
-                    python_data = json.loads(response)
-                    station_attributes = python_data["station"]
-                else:
-                    raise ValueError("Bad Response (%d) from %s " % (r.status_code, api_call_url))
-            """
-
-        else:
-            pass
+        podcast_list = list(iter_station_podcasts(station_id, api_version, environment))
 
     except Exception as e:
         sys.stderr.write("ERROR -- Unable to obtain podcast information\n")
@@ -242,65 +387,16 @@ def station_id_2_podcast_list(station_id, api_version="v1", environment=STAGING)
 
 # -----------------------------------------------------------------------------
 def podcast_id_2_episodes(podcast_id, environment=STAGING, api_version="v1"):
-    """ Given a podcast id as eitehr an int or a string, return a list of episodes for
-        that podcast where each item in the list is a set of attributes for a particular
-        episode. If anything goes wrong, return an empty list.  """
+    """ Given a podcast id as eitehr an int or a string, return a list of episode
+        records for that podcast. If anything goes wrong, return an empty list.  """
 
     #  Example API call
     # http://originapi-stg.radio.com/v1/episodes?filter%5Bpodcast_id%5D=22334&page%5Bsize%5D=100&page%5Bnumber%5D=1
 
     episodes = []
-    r = "NO DATA"
     podcast_id = str(podcast_id)
-
     try:
-
-        # Call out to the the API using the correct environment base url
-        # and the correct api version string
-
-        if api_version == "v1":
-
-            base_url = api_base_urls[environment]
-            api_call_url = "%s/%s/episodes?filter[podcast_id]=%s&page[size]=100" % (base_url, api_version, podcast_id)
-            r = "NO DATA"
-            r = requests.get(api_call_url)
-            if r == "NO DATA":
-                raise ValueError("No data from %s" % api_call_url)
-            else:
-                if r.status_code == requests.codes.ok:
-                    response = r.text
-                    python_data = json.loads(response)
-                    episodes = python_data["data"]
-                else:
-                    raise ValueError("Bad Response (%d) from %s " % (r.status_code, api_call_url))
-
-        if api_version == "v2":
-            # V2 calls use a special header and reutrn data differently
-            # than v1 calls.
-            pass
-
-            # *** ********************************************************** ***
-            # *** EPISODES FILTER BY PODCAST ID NOT YET IMPLEMENTED IN V2 API ***
-            # *** ********************************************************** ***
-
-            """  
-            base_url = api_base_urls[environment]
-            api_call_url = "%s/%s/podcasts?filter[station_id]=%s&page[size]=100" % (base_url, api_version, station_id)
-            r = "NO DATA"
-            r = requests.get(api_call_url, headers=api_header)
-            if r == "NO DATA":
-                raise ValueError("No data from %s" % api_call_url)
-            else:
-                if r.status_code == requests.codes.ok:
-                    response = r.text
-                    python_data = json.loads(response)
-                    station_attributes = python_data["station"]
-                else:
-                    raise ValueError("Bad Response (%d) from %s " % (r.status_code, api_call_url))
-            """
-
-        else:
-            pass
+        episodes = list(iter_podcast_episodes(podcast_id, api_version, environment))
 
     except Exception as e:
         sys.stderr.write("ERROR -- Unalbe to obtain episodes for podcast_id %s\n" % podcast_id)
@@ -315,59 +411,12 @@ def podcast_id_2_image_url(podcast_id, api_version="v1", environment=STAGING):
     """ Given a podcast ID return the url to later download an image for
         the podcast. If anything goes wrong return an empty string. """
     image_url = ""
-    r = "NO DATA"
     podcast_id = str(podcast_id)
-
     try:
-        # Call out to the the API using the correct environment base url
-        # and the correct api version string
-
-        if api_version == "v1":
-
-            base_url = api_base_urls[environment]
-            api_call_url = "%s/%s/podcasts?filter[station_id]=%s&page[size]=100" % (base_url, api_version, podcast_id)
-            r = "NO DATA"
-            r = requests.get(api_call_url)
-            if r == "NO DATA":
-                raise ValueError("No data from %s" % api_call_url)
-            else:
-                if r.status_code == requests.codes.ok:
-                    response = r.text
-                    python_data = json.loads(response)
-                    episodes = python_data["data"]
-                else:
-                    raise ValueError("Bad Response (%d) from %s " % (r.status_code, api_call_url))
-
-        if api_version == "v2":
-            # V2 calls use a special header and reutrn data differently
-            # than v1 calls.
-            pass
-
-            # *** ********************************************************** ***
-            # *** PODCAST FILTER BY PODCAST ID NOT YET IMPLEMENTED IN V2 API ***
-            # *** ********************************************************** ***
-
-            """  
-            base_url = api_base_urls[environment]
-            api_call_url = "%s/%s/podcasts?filter[station_id]=%s&page[size]=100" % (base_url, api_version, station_id)
-            r = "NO DATA"
-            r = requests.get(api_call_url, headers=api_header)
-            if r == "NO DATA":
-                raise ValueError("No data from %s" % api_call_url)
-            else:
-                if r.status_code == requests.codes.ok:
-                    response = r.text
-                    python_data = json.loads(response)
-                    station_attributes = python_data["station"]
-                else:
-                    raise ValueError("Bad Response (%d) from %s " % (r.status_code, api_call_url))
-            """
-
-        else:
-            pass
+        image_url = get_adapter(api_version).podcast(environment, podcast_id).get("image") or ""
 
     except Exception as e:
-        sys.stderr.write("ERROR -- Unable to obtain information for stations\n")
+        sys.stderr.write("ERROR -- Unable to obtain the image for podcast %s\n" % podcast_id)
         sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
         sys.stderr.flush()
         image_url = ""
@@ -383,8 +432,44 @@ def podcast_id_2_image_url(podcast_id, api_version="v1", environment=STAGING):
 #     $HOME/Library/Python/3.7/bin/pytest ./api_utils.py
 
 def test_get_station_ids_count():
-    assert len(get_station_ids()) > 300
+    # Against the mock api, which has the 400 or so stations of staging,
+    # so no network is needed
+    import mock_api
+    base_url, cache_enabled = api_client.api_base_urls[STAGING], api_client.CACHE_ENABLED
+    mock = mock_api.MockApi(stations=400, podcasts=1, episodes=1).start().install([STAGING])
+    try:
+        api_client.CACHE_ENABLED = False
+        station_ids = get_station_ids()
+        assert len(station_ids) > 300 and type(station_ids) == type({})
+    finally:
+        api_client.CACHE_ENABLED = cache_enabled
+        api_client.set_base_url(STAGING, base_url)
+        mock.stop()
 
 def test_get_station_ids_type():
     assert type(get_station_ids()) == type({})
 
+def test_a_repeated_page_stops_the_paging():
+    import mock_api
+    base_url, cache_enabled = api_client.api_base_urls[STAGING], api_client.CACHE_ENABLED
+    mock = mock_api.MockApi(stations=3, podcasts=1, episodes=250).start().install([STAGING])
+    try:
+        api_client.CACHE_ENABLED = False
+        # An api that ignores page[number] and has no links.next
+        mock.catalog.ignore_page_number = True
+        assert len(list(iter_podcast_episodes(1001))) == EPISODES_PAGE_SIZE
+    finally:
+        api_client.CACHE_ENABLED = cache_enabled
+        api_client.set_base_url(STAGING, base_url)
+        mock.stop()
+
+def test_v1_records_are_flat():
+    record = V1Adapter().record({"id": 7, "type": "podcasts", "attributes": {"title": "Pod"}})
+    assert record == {"title": "Pod", "id": 7}
+
+def test_unknown_api_version():
+    try:
+        get_adapter("v3")
+        assert False
+    except ValueError:
+        pass
@@ -0,0 +1,105 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+
+# import third-party libraries
+try:
+    from PyQt5.QtCore import (QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot)
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'PyQt5' library\n")
+    sys.stderr.write("         try: pip3 install pyqt5 --user\n")
+    sys.stderr.flush()
+    sys.exit(99)
+
+
+# ----------------------------------------------------------------------------- _CallTask
+class _CallTask(QRunnable):
+    """ Run one function on a pool thread and hand what it returned back to
+        the BackgroundCall with a signal, which Qt queues over to the GUI
+        thread. """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, caller, generation, function, args, kwargs):
+        super().__init__()
+        self.caller     = caller
+        self.generation = generation
+        self.function   = function
+        self.args       = args
+        self.kwargs     = kwargs
+
+    # -------------------------------------------------------------------------
+    def run(self):
+        # Python hates unhandled exceptions in threads so catch everything
+        result = None
+        try:
+            result = self.function(*self.args, **self.kwargs)
+        except Exception as e:
+            sys.stderr.write("ERROR -- Background call to %s failed\n" % getattr(self.function, "__name__", self.function))
+            sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
+            sys.stderr.flush()
+        finally:
+            try:
+                self.caller._task_finished.emit(self.generation, result)
+            except RuntimeError:
+                pass  # The caller went away while we were busy, e.g. the window was closed
+
+
+# ----------------------------------------------------------------------------- BackgroundCall
+class BackgroundCall(QObject):
+    """ Runs a blocking call, e.g. an api call, off the GUI thread so the
+        window keeps painting while it waits. finished(result) is emitted on
+        the GUI thread when it is done, result is None if the call blew up.
+        Only the result of the latest start() is delivered, anything started
+        before it is forgotten. """
+
+    finished       = pyqtSignal(object)
+    _task_finished = pyqtSignal(int, object)
+
+    # -------------------------------------------------------------------------
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.generation = 0
+        self.running    = False
+        self._task_finished.connect(self._on_task_finished)
+
+    # -------------------------------------------------------------------------
+    def start(self, function, *args, **kwargs):
+        self.generation += 1
+        self.running     = True
+        QThreadPool.globalInstance().start(_CallTask(self, self.generation, function, args, kwargs))
+
+    # -------------------------------------------------------------------------
+    @pyqtSlot(int, object)
+    def _on_task_finished(self, generation, result):
+        if generation != self.generation:
+            return  # Left over from before the last start()
+        self.running = False
+        self.finished.emit(result)
+
+
+# =============================================================================
+# Unit tests, because Jon asked and he is right
+def test_only_the_latest_call_is_delivered():
+    from PyQt5.QtCore import QCoreApplication, QEventLoop
+    import threading
+    app    = QCoreApplication.instance() or QCoreApplication([])
+    gate   = threading.Event()
+    caller = BackgroundCall()
+    heard  = []
+    caller.finished.connect(heard.append)
+    caller.start(lambda: gate.wait(5) and "stale")
+    caller.start(lambda: "fresh")
+    gate.set()
+    QThreadPool.globalInstance().waitForDone(5000)
+    app.processEvents(QEventLoop.AllEvents)
+    assert heard == ["fresh"] and not caller.running
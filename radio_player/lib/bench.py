@@ -0,0 +1,140 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+import json
+import time
+import tracemalloc
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+
+# A p50 has to be this much slower than the baseline, as well as slower by
+# the tolerance, to count as a regression. Stops a 0.2 ms call that took
+# 0.3 ms on a busy machine from failing the run.
+MIN_REGRESSION_MS = 2.0
+
+
+# ----------------------------------------------------------------------------- percentile()
+def percentile(values, fraction):
+    """ The value below which fraction, 0.0 to 1.0, of values fall,
+        interpolating between the two nearest when it is not one of them """
+    values = sorted(values)
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * fraction
+    lower    = int(position)
+    upper    = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+# ----------------------------------------------------------------------------- measure()
+def measure(name, function, repeat=5, trace_memory=True):
+    """ Time function(run) repeat times, run counting up from 0 so each call
+        can ask for something it has not asked for before. One more call is
+        made under tracemalloc for the peak memory it allocates, tracemalloc
+        slows everything down so that call is not timed. Returns a result
+        dictionary for report() and compare(), peak_kb is None with
+        trace_memory False. Python 3.11's tracemalloc can crash when a
+        thread Python did not start, e.g. one of Qt's pool threads, first
+        calls into Python while it traces, so hot paths that hand work to
+        a QThreadPool have to leave it off. """
+    times = []
+    for run in range(repeat):
+        start = time.perf_counter()
+        function(run)
+        times.append((time.perf_counter() - start) * 1000.0)
+
+    peak = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            function(repeat)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return {"name"    : name                          ,
+            "runs"    : repeat                        ,
+            "p50_ms"  : round(percentile(times, 0.50), 3) ,
+            "p95_ms"  : round(percentile(times, 0.95), 3) ,
+            "min_ms"  : round(min(times), 3)          ,
+            "max_ms"  : round(max(times), 3)          ,
+            "peak_kb" : None if peak is None else round(peak / 1024.0, 1) }
+
+
+# ----------------------------------------------------------------------------- compare()
+def compare(results, baseline, tolerance=0.25):
+    """ Check results against a baseline, a dictionary of name --> result as
+        saved by save_baseline(). Returns a list of lines, one per hot path
+        whose p50 or peak memory grew by more than tolerance, e.g. 0.25 for
+        25%. Hot paths missing from the baseline are not checked. """
+    regressions = []
+    for result in results:
+        before = baseline.get(result["name"])
+        if not before:
+            continue
+        if (result["p50_ms"] > before["p50_ms"] * (1.0 + tolerance) and
+                result["p50_ms"] - before["p50_ms"] > MIN_REGRESSION_MS):
+            regressions.append("%s p50 %.1f ms, was %.1f ms" % (result["name"], result["p50_ms"], before["p50_ms"]))
+        if result["peak_kb"] is None or before.get("peak_kb") is None:
+            continue
+        if result["peak_kb"] > before["peak_kb"] * (1.0 + tolerance) and result["peak_kb"] - before["peak_kb"] > 64:
+            regressions.append("%s peak memory %.0f KB, was %.0f KB" % (result["name"], result["peak_kb"], before["peak_kb"]))
+    return regressions
+
+
+# ----------------------------------------------------------------------------- save_baseline()
+def save_baseline(results, file_name):
+    with open(file_name, "w") as f:
+        json.dump({result["name"]: result for result in results}, f, indent=1, sort_keys=True)
+
+
+# ----------------------------------------------------------------------------- load_baseline()
+def load_baseline(file_name):
+    """ Read a baseline saved by save_baseline(). Raises OSError or
+        ValueError if it is missing or not a baseline. """
+    with open(file_name) as f:
+        baseline = json.load(f)
+    if not isinstance(baseline, dict):
+        raise ValueError("%s is not a benchmark baseline" % file_name)
+    return baseline
+
+
+# ----------------------------------------------------------------------------- report()
+def report(results):
+    """ The results as a table, one hot path per line """
+    lines = ["%-28s %6s %10s %10s %10s %10s" % ("hot path", "runs", "p50 ms", "p95 ms", "max ms", "peak KB")]
+    for result in results:
+        peak = "-" if result["peak_kb"] is None else "%.0f" % result["peak_kb"]
+        lines.append("%-28s %6d %10.1f %10.1f %10.1f %10s" % (result["name"], result["runs"], result["p50_ms"],
+                                                             result["p95_ms"], result["max_ms"], peak))
+    return "\n".join(lines)
+
+
+# =============================================================================
+# Unit tests, because Jon asked and he is right
+def test_percentile():
+    assert percentile([], 0.5) == 0.0
+    assert percentile([3, 1, 2], 0.5) == 2
+    assert percentile(range(1, 101), 0.95) == 95.05
+
+def test_measure_and_compare():
+    runs   = []
+    result = measure("sum", lambda run: runs.append(sum([run] * 20000)), repeat=3)
+    assert runs == [0, 20000, 40000, 60000] and result["runs"] == 3 and result["peak_kb"] > 100
+    slower = dict(result, p50_ms=result["p50_ms"] * 2 + 10)
+    assert compare([result], {"sum": result}) == []
+    assert compare([slower], {"sum": result})[FIRST].startswith("sum p50")
+    assert compare([slower], {}) == []
+
+def test_memory_can_be_left_untraced():
+    result = measure("sum", lambda run: sum([run] * 20000), repeat=2, trace_memory=False)
+    assert result["peak_kb"] is None and "-" in report([result]).splitlines()[LAST]
+    assert compare([result], {"sum": dict(result, peak_kb=1.0)}) == []
@@ -0,0 +1,187 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+import threading
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+
+
+# ----------------------------------------------------------------------------- catalog_id()
+def catalog_id(record_id):
+    """ The api hands back ids as ints in some places and strings in others,
+        the catalog always keys by the string form. """
+    return str(record_id)
+
+
+# ----------------------------------------------------------------------------- Catalog
+class Catalog(object):
+    """ In-memory catalog of stations, podcasts and episodes with dictionary
+        indexes by id, by station and by podcast so every lookup is O(1).
+        Records are kept exactly as api_utils hands them back. The catalog is
+        shared by the GUI and the command line tools and is safe to fill
+        from several worker threads at once. """
+
+    # -------------------------------------------------------------------------
+    def __init__(self):
+        self.stations                = {}   # station id  --> station attributes
+        self.podcasts                = {}   # podcast id  --> podcast record
+        self.episodes                = {}   # episode id  --> episode record
+        self.station_ids_by_callsign = {}   # callsign    --> station id
+        self.podcast_ids_by_station  = {}   # station id  --> [podcast id, ...]
+        self.episode_ids_by_podcast  = {}   # podcast id  --> [episode id, ...]
+        self._lock                   = threading.RLock()
+
+    # -------------------------------------------------------------------------
+    def add_station(self, station):
+        """ Add or replace a station, given its attributes. Returns its id """
+        station_id = catalog_id(station["id"])
+        with self._lock:
+            self.stations[station_id] = station
+            if "callsign" in station:
+                self.station_ids_by_callsign[station["callsign"]] = station_id
+        return station_id
+
+    # -------------------------------------------------------------------------
+    def set_station_podcasts(self, station_id, podcasts):
+        """ Replace the podcasts of a station. Podcasts the station no longer
+            has are dropped along with their episodes. Returns the list of
+            podcast ids in api order. """
+        station_id  = catalog_id(station_id)
+        podcast_ids = []
+        with self._lock:
+            for podcast in podcasts:
+                podcast_id = catalog_id(podcast["id"])
+                self.podcasts[podcast_id] = podcast
+                podcast_ids.append(podcast_id)
+            for old_id in set(self.podcast_ids_by_station.get(station_id, [])) - set(podcast_ids):
+                self.podcasts.pop(old_id, None)
+                self._drop_episodes(old_id)
+            self.podcast_ids_by_station[station_id] = podcast_ids
+        return podcast_ids
+
+    # -------------------------------------------------------------------------
+    def drop_other_stations(self, station_id):
+        """ Drop the podcasts, and their episodes, of every station but
+            station_id, for the GUI which only shows one station at a time.
+            A podcast station_id also has is kept. The station records
+            themselves are kept. """
+        station_id = catalog_id(station_id)
+        with self._lock:
+            kept = set(self.podcast_ids_by_station.get(station_id, []))
+            for other_id in [other_id for other_id in self.podcast_ids_by_station if other_id != station_id]:
+                for podcast_id in set(self.podcast_ids_by_station.pop(other_id)) - kept:
+                    self.podcasts.pop(podcast_id, None)
+                    self._drop_episodes(podcast_id)
+
+    # -------------------------------------------------------------------------
+    def drop_other_podcasts(self, podcast_id):
+        """ Drop the episodes of every podcast but podcast_id, for the GUI
+            which only shows the episodes of one podcast at a time. An
+            episode podcast_id also has is kept. The podcast records
+            themselves are kept. """
+        podcast_id = catalog_id(podcast_id)
+        with self._lock:
+            kept = set(self.episode_ids_by_podcast.get(podcast_id, []))
+            for other_id in [other_id for other_id in self.episode_ids_by_podcast if other_id != podcast_id]:
+                for episode_id in set(self.episode_ids_by_podcast.pop(other_id)) - kept:
+                    self.episodes.pop(episode_id, None)
+
+    # -------------------------------------------------------------------------
+    def stream_podcast_episodes(self, podcast_id, episodes):
+        """ Generator that adds each episode from episodes (a list or any
+            iterator) to the catalog as it arrives and yields its id. The
+            episodes already held for the podcast are replaced. """
+        podcast_id = catalog_id(podcast_id)
+        with self._lock:
+            self._drop_episodes(podcast_id)
+            episode_ids = []
+            self.episode_ids_by_podcast[podcast_id] = episode_ids
+        for episode in episodes:
+            episode_id = catalog_id(episode["id"])
+            with self._lock:
+                self.episodes[episode_id] = episode
+                episode_ids.append(episode_id)
+            yield episode_id
+
+    # -------------------------------------------------------------------------
+    def set_podcast_episodes(self, podcast_id, episodes):
+        """ Replace the episodes of a podcast. Returns the list of episode ids """
+        return list(self.stream_podcast_episodes(podcast_id, episodes))
+
+    # -------------------------------------------------------------------------
+    def _drop_episodes(self, podcast_id):
+        for episode_id in self.episode_ids_by_podcast.pop(podcast_id, []):
+            self.episodes.pop(episode_id, None)
+
+    # --- Lookups --------------------------------------------------------------
+    def station(self, station_id):
+        return self.stations.get(catalog_id(station_id))
+
+    def station_by_callsign(self, callsign):
+        return self.station(self.station_ids_by_callsign.get(callsign, ""))
+
+    def podcast(self, podcast_id):
+        return self.podcasts.get(catalog_id(podcast_id))
+
+    def episode(self, episode_id):
+        return self.episodes.get(catalog_id(episode_id))
+
+    def station_podcasts(self, station_id):
+        """ Return the podcast records of a station in api order """
+        return [self.podcasts[podcast_id] for podcast_id in self.podcast_ids_by_station.get(catalog_id(station_id), [])]
+
+    def podcast_episodes(self, podcast_id):
+        """ Return the episode records of a podcast in api order """
+        return [self.episodes[episode_id] for episode_id in self.episode_ids_by_podcast.get(catalog_id(podcast_id), [])]
+
+    # -------------------------------------------------------------------------
+    def counts(self):
+        """ Return a dictionary of how many of each record type we hold """
+        return {"stations" : len(self.stations) ,
+                "podcasts" : len(self.podcasts) ,
+                "episodes" : len(self.episodes) }
+
+
+# =============================================================================
+# Unit tests, because Jon asked and he is right
+def test_drop_other_stations():
+    catalog = Catalog()
+    catalog.set_station_podcasts(1, [{"id": 10}, {"id": 12}])
+    catalog.set_station_podcasts(2, [{"id": 11}, {"id": 12}])
+    catalog.set_podcast_episodes(10, [{"id": 100}])
+    catalog.set_podcast_episodes(12, [{"id": 120}])
+    catalog.drop_other_stations(2)
+    assert catalog.counts() == {"stations": 0, "podcasts": 2, "episodes": 1}
+    assert catalog.podcast(10) is None and catalog.episode(120)["id"] == 120
+
+def test_drop_other_podcasts():
+    catalog = Catalog()
+    catalog.set_station_podcasts(1, [{"id": 10}, {"id": 11}])
+    catalog.set_podcast_episodes(10, [{"id": 100}, {"id": 101}])
+    catalog.set_podcast_episodes(11, [{"id": 110}, {"id": 101}])
+    catalog.drop_other_podcasts(11)
+    assert catalog.counts() == {"stations": 0, "podcasts": 2, "episodes": 2}
+    assert catalog.episode(100) is None and [episode["id"] for episode in catalog.podcast_episodes(11)] == [110, 101]
+
+def test_lookup_by_id_and_station():
+    catalog = Catalog()
+    catalog.add_station({"id": 3, "callsign": "WXYZ"})
+    catalog.set_station_podcasts(3, [{"id": 10, "title": "a"}, {"id": "11", "title": "b"}])
+    assert catalog.station_by_callsign("WXYZ")["id"] == 3
+    assert catalog.podcast("10")["id"] == 10
+    assert [podcast["id"] for podcast in catalog.station_podcasts("3")] == [10, "11"]
+
+def test_replacing_podcasts_drops_old_episodes():
+    catalog = Catalog()
+    catalog.set_station_podcasts(3, [{"id": 10}])
+    catalog.set_podcast_episodes(10, [{"id": 100}, {"id": 101}])
+    catalog.set_station_podcasts(3, [{"id": 11}])
+    assert catalog.counts() == {"stations": 0, "podcasts": 1, "episodes": 0}
@@ -0,0 +1,261 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+CONFIG_PATH   = os.path.join(MY_PATH, "../config")
+CONFIG_FILE   = os.path.join(CONFIG_PATH, "podcast_player.conf")
+LIBRARY_PATH  = MY_PATH
+PRODUCTION    = "production"
+STAGING       = "staging"
+DEVELOPMENT   = "development"
+
+# import custom libraries
+sys.path.append(LIBRARY_PATH)
+try:
+    import podcast_player_utils
+    import api_utils
+    import catalog
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'podcast_player_utils', 'api_utils' and 'catalog' libraries\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+CONFIGS       = podcast_player_utils.config_2_dictionary(CONFIG_FILE)
+DIFF_WORKERS  = int(CONFIGS.get("sweep_workers", "8"))
+IGNORE_FIELDS = tuple(field for field in CONFIGS.get("diff_ignore_fields", "updated_at").split(",") if field)
+
+# The kinds of record compared, in the order they are reported
+STATION = "station"
+PODCAST = "podcast"
+EPISODE = "episode"
+KINDS   = (STATION, PODCAST, EPISODE)
+
+# Data moves from development to staging to production
+PROMOTIONS = ((DEVELOPMENT, STAGING), (STAGING, PRODUCTION))
+
+
+# ----------------------------------------------------------------------------- fingerprint()
+def fingerprint(record, ignore=IGNORE_FIELDS):
+    """ A short hash of every field of a record but the ignored ones. Two
+        records with the same fingerprint are taken to be the same, so
+        each record is only serialised once however many environments it
+        is compared against. """
+    fields = {key: value for key, value in record.items() if key not in ignore}
+    text   = json.dumps(fields, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+# ----------------------------------------------------------------------------- EnvironmentCatalog
+class EnvironmentCatalog(object):
+    """ Everything fetched from one environment: the records in a
+        catalog.Catalog, the fingerprint of each by kind and id, and an
+        error line for every api call that failed. Children of a failed
+        call are missing, so they can show up as removed. """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, environment, api_version):
+        self.environment  = environment
+        self.api_version  = api_version
+        self.catalog      = catalog.Catalog()
+        self.fingerprints = {kind: {} for kind in KINDS}
+        self.errors       = []
+        self.elapsed_ms   = 0.0
+        self._lock        = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    def records(self, kind):
+        return {STATION: self.catalog.stations, PODCAST: self.catalog.podcasts, EPISODE: self.catalog.episodes}[kind]
+
+    # -------------------------------------------------------------------------
+    def failed(self, what, error):
+        with self._lock:
+            self.errors.append("%s %s: %s" % (self.environment, what, error))
+
+    # -------------------------------------------------------------------------
+    def counts(self):
+        return {kind: len(self.fingerprints[kind]) for kind in KINDS}
+
+    # -------------------------------------------------------------------------
+    def fingerprint_records(self, ignore=IGNORE_FIELDS):
+        for kind in KINDS:
+            self.fingerprints[kind] = {record_id: fingerprint(record, ignore)
+                                       for record_id, record in self.records(kind).items()}
+
+
+# ----------------------------------------------------------------------------- fetch_catalog()
+def fetch_catalog(environment, api_version="v1", episodes=False, workers=DIFF_WORKERS, max_stations=0,
+                  ignore=IGNORE_FIELDS):
+    """ Fetch the stations and podcasts, and the episodes if asked, of one
+        environment on a pool of worker threads and fingerprint every
+        record. Never raises, failed calls are in the errors of the
+        EnvironmentCatalog returned. """
+    result = EnvironmentCatalog(environment, api_version)
+    start  = time.perf_counter()
+    try:
+        stations = list(api_utils.iter_stations(api_version, environment))
+    except Exception as e:
+        result.failed("stations", e)
+        stations = []
+    if max_stations > 0:
+        stations = stations[:max_stations]
+    for station in stations:
+        result.catalog.add_station(station)
+
+    def podcasts(station_id):
+        try:
+            # Read every page before handing them over, the catalog holds
+            # its lock while it takes the podcasts in
+            podcast_list = list(api_utils.iter_station_podcasts(station_id, api_version, environment))
+            result.catalog.set_station_podcasts(station_id, podcast_list)
+        except Exception as e:
+            result.failed("podcasts of station %s" % station_id, e)
+
+    def podcast_episodes(podcast_id):
+        try:
+            result.catalog.set_podcast_episodes(podcast_id, api_utils.iter_podcast_episodes(podcast_id, api_version,
+                                                                                            environment))
+        except Exception as e:
+            result.failed("episodes of podcast %s" % podcast_id, e)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="diff_%s" % environment) as executor:
+        list(executor.map(podcasts, list(result.catalog.stations)))
+        if episodes:
+            list(executor.map(podcast_episodes, list(result.catalog.podcasts)))
+
+    result.fingerprint_records(ignore)
+    result.elapsed_ms = (time.perf_counter() - start) * 1000.0
+    return result
+
+
+# ----------------------------------------------------------------------------- sync_catalog()
+def sync_catalog(store, environment, api_version="v1", episodes=False, workers=DIFF_WORKERS, max_stations=0,
+                 ignore=IGNORE_FIELDS):
+    """ Like fetch_catalog() but read from a catalog_store.CatalogStore,
+        which is brought up to date first, so only what changed since the
+        last run comes over the wire """
+    result  = EnvironmentCatalog(environment, api_version)
+    start   = time.perf_counter()
+    summary = store.sync(api_version, environment, episodes, workers, max_stations)
+    result.errors  = list(summary["errors"])
+    result.catalog = store.load_catalog(api_version, environment, episodes, max_stations)
+    result.fingerprint_records(ignore)
+    result.elapsed_ms = (time.perf_counter() - start) * 1000.0
+    return result
+
+
+# ----------------------------------------------------------------------------- fetch_environments()
+def fetch_environments(environments, api_version="v1", episodes=False, workers=DIFF_WORKERS, max_stations=0,
+                       ignore=IGNORE_FIELDS, store=None):
+    """ fetch_catalog() every environment at the same time, or
+        sync_catalog() them if given a store. Returns a dictionary of
+        environment --> EnvironmentCatalog """
+    environments = list(dict.fromkeys(environments))
+    with ThreadPoolExecutor(max_workers=max(1, len(environments)), thread_name_prefix="diff") as executor:
+        if store is None:
+            futures = {environment: executor.submit(fetch_catalog, environment, api_version, episodes, workers,
+                                                    max_stations, ignore)
+                       for environment in environments}
+        else:
+            futures = {environment: executor.submit(sync_catalog, store, environment, api_version, episodes,
+                                                    workers, max_stations, ignore)
+                       for environment in environments}
+        return {environment: future.result() for environment, future in futures.items()}
+
+
+# ----------------------------------------------------------------------------- diff_fingerprints()
+def diff_fingerprints(old, new):
+    """ Compare two dictionaries of id --> fingerprint in one pass over
+        each. Returns (added, removed, changed) lists of ids, sorted. """
+    added   = [record_id for record_id in new if record_id not in old]
+    removed = [record_id for record_id in old if record_id not in new]
+    changed = [record_id for record_id, value in new.items() if record_id in old and old[record_id] != value]
+    key = lambda record_id: (len(record_id), record_id)  # Numeric ids in numeric order
+    return (sorted(added, key=key), sorted(removed, key=key), sorted(changed, key=key))
+
+
+# ----------------------------------------------------------------------------- changed_fields()
+def changed_fields(old, new, ignore=IGNORE_FIELDS):
+    """ The fields that differ between two versions of a record, only ever
+        asked for the records whose fingerprints differ """
+    fields = list(old.keys()) + [key for key in new.keys() if key not in old]
+    return [field for field in fields if field not in ignore and old.get(field) != new.get(field)]
+
+
+# ----------------------------------------------------------------------------- diff_catalogs()
+def diff_catalogs(old, new, ignore=IGNORE_FIELDS):
+    """ Compare two EnvironmentCatalogs. Returns a list of difference
+        dictionaries, stations first then podcasts then episodes:
+
+            {"from": ..., "to": ..., "kind": ..., "change": "added" |
+             "removed" | "changed", "id": ..., "fields": [...]} """
+    differences = []
+    for kind in KINDS:
+        added, removed, changed = diff_fingerprints(old.fingerprints[kind], new.fingerprints[kind])
+        old_records, new_records = old.records(kind), new.records(kind)
+        for change, record_ids in (("added", added), ("removed", removed), ("changed", changed)):
+            for record_id in record_ids:
+                fields = []
+                if change == "changed":
+                    fields = changed_fields(old_records[record_id], new_records[record_id], ignore)
+                differences.append({"from"   : old.environment ,
+                                    "to"     : new.environment ,
+                                    "kind"   : kind            ,
+                                    "change" : change          ,
+                                    "id"     : record_id       ,
+                                    "fields" : fields          })
+    return differences
+
+
+# ----------------------------------------------------------------------------- summarize()
+def summarize(old, new, differences):
+    """ Counts of the differences between two environments by kind """
+    summary = {"from": old.environment, "to": new.environment, "errors": len(old.errors) + len(new.errors)}
+    for kind in KINDS:
+        for change in ("added", "removed", "changed"):
+            summary["%ss_%s" % (kind, change)] = 0
+    for difference in differences:
+        summary["%ss_%s" % (difference["kind"], difference["change"])] += 1
+    return summary
+
+
+# =============================================================================
+# Unit tests, because Jon asked and he is right
+def _environment(name, stations, podcasts):
+    result = EnvironmentCatalog(name, "v1")
+    for station in stations:
+        result.catalog.add_station(station)
+    result.catalog.set_station_podcasts(1, podcasts)
+    result.fingerprint_records()
+    return result
+
+def test_fingerprint_ignores_field_order_and_ignored_fields():
+    assert fingerprint({"id": 1, "name": "a", "updated_at": "x"}) == fingerprint({"name": "a", "id": 1, "updated_at": "y"})
+    assert fingerprint({"id": 1, "name": "a"}) != fingerprint({"id": 1, "name": "b"})
+
+def test_diff_catalogs():
+    staging    = _environment(STAGING,    [{"id": 1, "callsign": "KAAA"}, {"id": 2, "callsign": "KBBB"}],
+                              [{"id": 10, "title": "Old", "updated_at": "1"}, {"id": 11, "title": "Same"}])
+    production = _environment(PRODUCTION, [{"id": 1, "callsign": "KAAA"}, {"id": 3, "callsign": "KCCC"}],
+                              [{"id": 10, "title": "New", "updated_at": "2"}, {"id": 11, "title": "Same"}])
+    differences = diff_catalogs(staging, production)
+    assert [(d["kind"], d["change"], d["id"], d["fields"]) for d in differences] == [
+        (STATION, "added",   "3",  []),
+        (STATION, "removed", "2",  []),
+        (PODCAST, "changed", "10", ["title"])]
+    summary = summarize(staging, production, differences)
+    assert summary["stations_added"] == 1 and summary["podcasts_changed"] == 1 and summary["episodes_removed"] == 0
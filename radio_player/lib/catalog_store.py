@@ -0,0 +1,644 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from http import HTTPStatus
+from concurrent.futures import ThreadPoolExecutor
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+CONFIG_PATH   = os.path.join(MY_PATH, "../config")
+CONFIG_FILE   = os.path.join(CONFIG_PATH, "podcast_player.conf")
+LIBRARY_PATH  = MY_PATH
+PRODUCTION    = "production"
+STAGING       = "staging"
+DEVELOPMENT   = "development"
+
+# import custom libraries
+sys.path.append(LIBRARY_PATH)
+try:
+    import podcast_player_utils
+    import api_client
+    import api_utils
+    import json_codec
+    import records
+    import catalog
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'podcast_player_utils', 'api_client', 'api_utils', "
+                     "'json_codec', 'records' and 'catalog' libraries\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+
+CONFIGS      = podcast_player_utils.config_2_dictionary(CONFIG_FILE)
+STORE_PATH   = CONFIGS.get("catalog_store", os.path.join(api_client.CACHE_PATH, "catalog.sqlite"))
+SYNC_WORKERS = int(CONFIGS.get("sweep_workers", "8"))
+
+# The kinds of record held, the record class of each and the kind whose
+# lists hang off each record, the podcasts of a station and so on
+STATION  = "station"
+PODCAST  = "podcast"
+EPISODE  = "episode"
+KINDS    = (STATION, PODCAST, EPISODE)
+CLASSES  = {STATION: records.Station, PODCAST: records.Podcast, EPISODE: records.Episode}
+CHILDREN = {STATION: PODCAST, PODCAST: EPISODE}
+
+# Records are read from and written to the store this many at a time when a
+# list is streamed, the GUI's list models show 100 rows at a time
+BATCH_SIZE = 100
+
+# Every record once by id, every list as its ids in api order, and every
+# page of every list with the ETag and fingerprint of its body and the ids
+# on it, so a page that has not changed never needs to be read again. The
+# members of each list are also kept one row each, indexed by record id, to
+# look up whether a record is still on any list
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (environment TEXT, api_version TEXT, kind TEXT, id TEXT,
+                                    updated_at TEXT, fingerprint TEXT, record TEXT,
+                                    PRIMARY KEY (environment, api_version, kind, id));
+CREATE TABLE IF NOT EXISTS lists   (environment TEXT, api_version TEXT, kind TEXT, parent_id TEXT,
+                                    ids TEXT, pages TEXT, synced_at REAL,
+                                    PRIMARY KEY (environment, api_version, kind, parent_id));
+CREATE TABLE IF NOT EXISTS pages   (environment TEXT, api_version TEXT, url TEXT,
+                                    etag TEXT, fingerprint TEXT, next_url TEXT, ids TEXT,
+                                    PRIMARY KEY (environment, api_version, url));
+CREATE TABLE IF NOT EXISTS members (environment TEXT, api_version TEXT, kind TEXT, parent_id TEXT, id TEXT,
+                                    PRIMARY KEY (environment, api_version, kind, parent_id, id));
+CREATE INDEX IF NOT EXISTS members_by_id ON members (environment, api_version, kind, id);
+"""
+
+
+# ----------------------------------------------------------------------------- fingerprint()
+def fingerprint(data):
+    """ A short hash of a page body or of the JSON of a record, bytes """
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+# ----------------------------------------------------------------------------- ListDelta
+class ListDelta(object):
+    """ What one sync_list() found: the ids on the list now, in api order,
+        the ids added, changed and removed since the last sync, and how
+        many pages were asked for and how many of those had not changed """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, kind, parent_id=""):
+        self.kind            = kind
+        self.parent_id       = parent_id
+        self.ids             = []
+        self.added           = []
+        self.changed         = []
+        self.removed         = []
+        self.pages           = 0
+        self.pages_unchanged = 0
+
+    # -------------------------------------------------------------------------
+    def changes(self):
+        return len(self.added) + len(self.changed) + len(self.removed)
+
+
+# ----------------------------------------------------------------------------- CatalogStore
+class CatalogStore(object):
+    """ The stations, podcasts and episodes of every environment and api
+        version we have looked at, in a SQLite file that survives between
+        runs, so the GUI and the command line tools can read from it before
+        going to the api.
+
+        sync_list() brings one list up to date with a conditional request
+        per page. A page whose ETag still matches costs a 304, one whose
+        body hashes the same is not parsed, and only the records on the
+        pages that changed are compared and only the ones that differ
+        written.
+        sync() does that for a whole environment and only looks at the
+        episodes of podcasts that are new or whose record, updated_at
+        included, changed. One connection is shared by every thread. """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, path=None):
+        path       = path or STORE_PATH
+        self.path  = path
+        self._lock = threading.RLock()
+        try:
+            if path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = self._open(path)
+        except (OSError, sqlite3.Error) as e:
+            sys.stderr.write("ERROR -- Unable to open the catalog store %s\n" % path)
+            sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
+            sys.stderr.flush()
+            self.path = ":memory:"  # Good for this run only
+            self._db  = self._open(self.path)
+
+    # -------------------------------------------------------------------------
+    def _open(self, path):
+        db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")   # The GUI and a command line tool can share the file
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript(SCHEMA)
+        with db:
+            # A store from before the members were kept has them in its lists
+            if db.execute("SELECT 1 FROM members LIMIT 1").fetchone() is None:
+                db.execute("INSERT OR IGNORE INTO members SELECT environment, api_version, kind, parent_id, "
+                           "json_each.value FROM lists, json_each(lists.ids)")
+        return db
+
+    # -------------------------------------------------------------------------
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    # --- Reads ---------------------------------------------------------------
+    def list_ids(self, kind, parent_id="", api_version="v1", environment=STAGING):
+        """ The ids on a list in api order, None if it was never synced """
+        with self._lock:
+            row = self._db.execute("SELECT ids FROM lists WHERE environment=? AND api_version=? AND kind=? "
+                                   "AND parent_id=?", (environment, api_version, kind, str(parent_id))).fetchone()
+        return None if row is None else json.loads(row[FIRST])
+
+    # -------------------------------------------------------------------------
+    def _select(self, column, kind, ids, api_version, environment):
+        """ A dictionary of id --> column of the records of a kind with ids """
+        found = {}
+        with self._lock:
+            for start in range(0, len(ids), 500):  # SQLite has a limit on parameters
+                batch = ids[start:start + 500]
+                found.update(self._db.execute("SELECT id, %s FROM records WHERE environment=? AND api_version=? "
+                                              "AND kind=? AND id IN (%s)" % (column, ",".join("?" * len(batch))),
+                                              [environment, api_version, kind] + batch).fetchall())
+        return found
+
+    # -------------------------------------------------------------------------
+    def records(self, kind, ids, api_version="v1", environment=STAGING):
+        """ The records of a kind with ids, in that order, leaving out any
+            not held """
+        ids   = [str(record_id) for record_id in ids]
+        found = self._select("record", kind, ids, api_version, environment)
+        return [CLASSES[kind].from_dict(json.loads(found[record_id])) for record_id in ids if record_id in found]
+
+    # -------------------------------------------------------------------------
+    def iter_records(self, kind, ids, api_version="v1", environment=STAGING, batch_size=BATCH_SIZE):
+        """ Generator of the records of a kind with ids, in that order,
+            read batch_size at a time so a long list is only read and
+            parsed as far as it is used """
+        ids = [str(record_id) for record_id in ids]
+        for start in range(0, len(ids), max(1, batch_size)):
+            yield from self.records(kind, ids[start:start + max(1, batch_size)], api_version, environment)
+
+    # -------------------------------------------------------------------------
+    def _children(self, kind, parent_id, api_version, environment):
+        ids = self.list_ids(kind, parent_id, api_version, environment)
+        return None if ids is None else self.records(kind, ids, api_version, environment)
+
+    # -------------------------------------------------------------------------
+    def station_ids(self, api_version="v1", environment=STAGING):
+        """ Like api_utils.get_station_ids(), a dictionary of callsigns -->
+            station ids, empty if the stations were never synced """
+        return {station["callsign"]: station["id"]
+                for station in self._children(STATION, "", api_version, environment) or []}
+
+    def station(self, station_id, api_version="v1", environment=STAGING):
+        held = self.records(STATION, [station_id], api_version, environment)
+        return held[FIRST] if held else None
+
+    def station_podcasts(self, station_id, api_version="v1", environment=STAGING):
+        """ The podcast records of a station, None if never synced """
+        return self._children(PODCAST, station_id, api_version, environment)
+
+    def podcast_episodes(self, podcast_id, api_version="v1", environment=STAGING):
+        """ A generator of the episode records of a podcast, read from the
+            store as it is used, None if never synced """
+        ids = self.list_ids(EPISODE, podcast_id, api_version, environment)
+        return None if ids is None else self.iter_records(EPISODE, ids, api_version, environment)
+
+    # -------------------------------------------------------------------------
+    def load_catalog(self, api_version="v1", environment=STAGING, episodes=True, max_stations=0):
+        """ A catalog.Catalog of everything held for an environment, the
+            first max_stations stations if that is not 0 """
+        result      = catalog.Catalog()
+        station_ids = self.list_ids(STATION, "", api_version, environment) or []
+        if max_stations > 0:
+            station_ids = station_ids[:max_stations]
+        for station in self.records(STATION, station_ids, api_version, environment):
+            result.add_station(station)
+        for station_id in station_ids:
+            podcasts = self.station_podcasts(station_id, api_version, environment)
+            if podcasts is None:
+                continue
+            for podcast_id in result.set_station_podcasts(station_id, podcasts):
+                podcast_episodes = self.podcast_episodes(podcast_id, api_version, environment) if episodes else None
+                if podcast_episodes is not None:
+                    result.set_podcast_episodes(podcast_id, podcast_episodes)
+        return result
+
+    # --- Sync ----------------------------------------------------------------
+    def _page(self, url, api_version, environment):
+        with self._lock:
+            row = self._db.execute("SELECT etag, fingerprint, next_url, ids FROM pages WHERE environment=? AND "
+                                   "api_version=? AND url=?", (environment, api_version, url)).fetchone()
+        return None if row is None else (row[0], row[1], row[2], json.loads(row[3]))
+
+    # -------------------------------------------------------------------------
+    def sync_list(self, kind, parent_id="", api_version="v1", environment=STAGING):
+        """ Bring one list up to date, the stations or the podcasts of
+            station parent_id or the episodes of podcast parent_id, and
+            return a ListDelta. Every page is asked for with the ETag it
+            had last time. Raises a ValueError if a page can not be
+            fetched, the store is then left as it was. """
+        parent_id = str(parent_id)
+        delta     = ListDelta(kind, parent_id)
+        adapter   = api_utils.get_adapter(api_version)
+        call      = adapter.list_call(environment, CLASSES[kind], parent_id or None)
+        if call is None:
+            return delta  # The api version does not have this list
+        api_call_url, page_size, headers, key = call
+        client      = api_client.get_client(environment)
+        page_number = 1
+        page_url    = "%s&page[number]=%d" % (api_call_url, page_number) if page_size else api_call_url
+        pages       = []  # [url, etag, fingerprint, next url, ids, records or None when unchanged]
+        while page_url and page_url not in [page[FIRST] for page in pages]:
+            old             = self._page(page_url, api_version, environment)
+            request_headers = dict(headers or {})
+            if old is not None and old[0]:
+                request_headers["If-None-Match"] = old[0]
+            r = client.get(page_url, headers=request_headers)
+            delta.pages += 1
+            if r.status_code == HTTPStatus.NOT_MODIFIED and old is not None:
+                page = [page_url] + list(old) + [None]
+            elif r.status_code != HTTPStatus.OK:
+                raise ValueError("Bad Response (%d) from %s " % (r.status_code, page_url))
+            elif old is not None and old[1] == fingerprint(r.content):
+                # The response cache answered, or the api sends no ETags
+                page = [page_url, r.headers.get("ETag", "") or old[0]] + list(old[1:]) + [None]
+            else:
+                document     = json_codec.loads(r.content)
+                items        = document.get(key) or []
+                page_records = list(adapter.records(CLASSES[kind], items))
+                next_url     = ""
+                if page_size:
+                    next_url = api_utils.next_page_url(api_call_url, page_url, page_number, document, len(items),
+                                                       page_size)
+                page = [page_url, r.headers.get("ETag", ""), fingerprint(r.content), next_url,
+                        [catalog.catalog_id(record["id"]) for record in page_records], page_records]
+            if pages and api_utils.repeated_page(page[4], pages[LAST][4]):
+                break
+            if page[LAST] is None:
+                delta.pages_unchanged += 1
+            pages.append(page)
+            page_number += 1
+            page_url     = page[3]
+        self._apply(delta, pages, api_version, environment)
+        return delta
+
+    # -------------------------------------------------------------------------
+    def put_list(self, kind, parent_id, list_records, api_version="v1", environment=STAGING):
+        """ Hold a list that was fetched some other way, e.g. streamed into
+            the GUI. list_records can be any iterator, the records are
+            written BATCH_SIZE at a time as they come and only their ids
+            kept. There are no page validators for the list so the next
+            sync_list() reads every page, but only writes the records that
+            differ. If list_records raises, the list is left as it was and
+            the exception raised again. Returns a ListDelta. """
+        delta    = ListDelta(kind, str(parent_id))
+        held_ids = set(self.list_ids(kind, parent_id, api_version, environment) or [])
+        batch    = []
+        try:
+            for record in list_records:
+                batch.append(record)
+                if len(batch) >= BATCH_SIZE:
+                    self._put_records(delta, batch, held_ids, api_version, environment)
+                    batch = []
+            self._put_records(delta, batch, held_ids, api_version, environment)
+        except Exception:
+            with self._lock, self._db:
+                self._sweep(kind, delta.ids, api_version, environment)  # The ones written that are on no list
+            raise
+        self._apply(delta, [[None, "", "", "", delta.ids, None]], api_version, environment)
+        return delta
+
+    # -------------------------------------------------------------------------
+    def put_page(self, kind, page_records, api_version="v1", environment=STAGING):
+        """ Hold the records of one page of a list fetched some other way,
+            e.g. streamed into the GUI, as the page comes. The list itself
+            is left to sync_list(), which then finds these records held and
+            only has to write the list. Returns the ids of the records
+            that were new or differed. """
+        delta = ListDelta(kind)
+        fresh = self._fresh(page_records)
+        with self._lock, self._db:
+            self._write(delta, fresh, set(), api_version, environment)
+        return delta.added
+
+    # -------------------------------------------------------------------------
+    def _put_records(self, delta, list_records, held_ids, api_version, environment):
+        """ Write a batch of put_list() records, only the ones that differ """
+        fresh = self._fresh(list_records)
+        delta.ids.extend(row[FIRST] for row in fresh)
+        with self._lock, self._db:
+            self._write(delta, fresh, held_ids, api_version, environment)
+
+    # -------------------------------------------------------------------------
+    def _fresh(self, list_records):
+        """ (id, updated_at, fingerprint, JSON) of each record """
+        fresh = []
+        for record in list_records:
+            text = json.dumps(dict(record), separators=(",", ":"), default=str)
+            fresh.append((catalog.catalog_id(record["id"]), str(record.get("updated_at") or ""),
+                          fingerprint(text.encode("utf-8")), text))
+        return fresh
+
+    # -------------------------------------------------------------------------
+    def _write(self, delta, fresh, held_ids, api_version, environment):
+        """ Write the fresh records that differ from the ones held, noting
+            them in the delta as added or, if on the list before, changed.
+            Caller holds the lock and the transaction. """
+        held    = self._select("fingerprint", delta.kind, [row[FIRST] for row in fresh], api_version, environment)
+        written = [row for row in fresh if held.get(row[FIRST]) != row[2]]
+        self._db.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             [(environment, api_version, delta.kind) + row for row in written])
+        for row in written:
+            (delta.changed if row[FIRST] in held_ids else delta.added).append(row[FIRST])
+
+    # -------------------------------------------------------------------------
+    def _apply(self, delta, pages, api_version, environment):
+        """ Write what sync_list() found in one transaction, pages without
+            a url are records only """
+        kind, parent_id = delta.kind, delta.parent_id
+        delta.ids = [record_id for page in pages for record_id in page[4]]
+        fresh     = self._fresh(record for page in pages for record in page[LAST] or [])  # On the pages that changed
+        with self._lock, self._db:
+            row      = self._db.execute("SELECT ids, pages FROM lists WHERE environment=? AND api_version=? AND "
+                                        "kind=? AND parent_id=?", (environment, api_version, kind, parent_id)).fetchone()
+            old_ids  = json.loads(row[0]) if row else []
+            old_urls = set(json.loads(row[1])) if row else set()
+            self._write(delta, fresh, set(old_ids), api_version, environment)
+            new_ids       = set(delta.ids)
+            delta.removed = [record_id for record_id in old_ids if record_id not in new_ids]
+            held_ids      = set(old_ids)
+            self._db.executemany("DELETE FROM members WHERE environment=? AND api_version=? AND kind=? AND "
+                                 "parent_id=? AND id=?",
+                                 [(environment, api_version, kind, parent_id, record_id)
+                                  for record_id in delta.removed])
+            self._db.executemany("INSERT OR IGNORE INTO members VALUES (?, ?, ?, ?, ?)",
+                                 [(environment, api_version, kind, parent_id, record_id)
+                                  for record_id in new_ids if record_id not in held_ids])
+            pages = [page for page in pages if page[FIRST]]
+            for url in old_urls - set(page[FIRST] for page in pages):
+                self._db.execute("DELETE FROM pages WHERE environment=? AND api_version=? AND url=?",
+                                 (environment, api_version, url))
+            for page in pages:
+                self._db.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                 (environment, api_version, page[0], page[1], page[2], page[3], json.dumps(page[4])))
+            self._db.execute("INSERT OR REPLACE INTO lists VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (environment, api_version, kind, parent_id, json.dumps(delta.ids),
+                              json.dumps([page[FIRST] for page in pages]), time.time()))
+            self._sweep(kind, delta.removed, api_version, environment)
+
+    # -------------------------------------------------------------------------
+    def _referenced(self, kind, ids, api_version, environment):
+        """ The ids of a kind that are still on a list, a podcast can be on
+            more than one station. Caller holds the lock. """
+        found = set()
+        for start in range(0, len(ids), 500):  # SQLite has a limit on parameters
+            batch = ids[start:start + 500]
+            found.update(row[FIRST] for row in self._db.execute(
+                "SELECT DISTINCT id FROM members WHERE environment=? AND api_version=? AND kind=? "
+                "AND id IN (%s)" % ",".join("?" * len(batch)),
+                [environment, api_version, kind] + batch))
+        return found
+
+    # -------------------------------------------------------------------------
+    def _sweep(self, kind, ids, api_version, environment):
+        """ Forget the records of ids that have gone from a list and are on
+            no other list, along with the lists hanging off them and every
+            record on those that is left on no list. Caller holds the lock
+            and the transaction. """
+        referenced = self._referenced(kind, ids, api_version, environment)
+        orphans    = [record_id for record_id in ids if record_id not in referenced]
+        child      = CHILDREN.get(kind)
+        child_ids  = []
+        for record_id in orphans:
+            self._db.execute("DELETE FROM records WHERE environment=? AND api_version=? AND kind=? AND id=?",
+                             (environment, api_version, kind, record_id))
+            if child is None:
+                continue
+            row = self._db.execute("SELECT ids, pages FROM lists WHERE environment=? AND api_version=? AND kind=? "
+                                   "AND parent_id=?", (environment, api_version, child, record_id)).fetchone()
+            if row is None:
+                continue
+            for url in json.loads(row[1]):
+                self._db.execute("DELETE FROM pages WHERE environment=? AND api_version=? AND url=?",
+                                 (environment, api_version, url))
+            self._db.execute("DELETE FROM lists WHERE environment=? AND api_version=? AND kind=? AND parent_id=?",
+                             (environment, api_version, child, record_id))
+            self._db.execute("DELETE FROM members WHERE environment=? AND api_version=? AND kind=? AND "
+                             "parent_id=?", (environment, api_version, child, record_id))
+            child_ids.extend(json.loads(row[0]))
+        if child_ids:
+            self._sweep(child, list(dict.fromkeys(child_ids)), api_version, environment)
+
+    # -------------------------------------------------------------------------
+    def sync(self, api_version="v1", environment=STAGING, episodes=False, workers=SYNC_WORKERS, max_stations=0,
+             full=False):
+        """ Bring everything held for an environment up to date: the
+            stations, the podcasts of every station and, if asked, the
+            episodes of every podcast that is new or changed or whose
+            episodes were never synced. full looks at the episodes of every
+            podcast, for an api that does not move a podcast's updated_at
+            on when it gets an episode. The podcast and episode lists are
+            synced on a pool of worker threads. Never raises, returns a
+            summary dictionary with an error line for each list that
+            failed. """
+        start   = time.perf_counter()
+        lock    = threading.Lock()
+        summary = {"api_version": api_version, "environment": environment}
+        for kind in KINDS:
+            for change in ("added", "changed", "removed"):
+                summary["%ss_%s" % (kind, change)] = 0
+        summary.update({"lists": 0, "pages": 0, "pages_unchanged": 0, "errors": []})
+
+        def run(kind, parent_id=""):
+            try:
+                delta = self.sync_list(kind, parent_id, api_version, environment)
+            except Exception as e:
+                with lock:
+                    summary["errors"].append("%s %s list %s: %s" % (environment, kind, parent_id, e))
+                return None
+            with lock:
+                for change in ("added", "changed", "removed"):
+                    summary["%ss_%s" % (kind, change)] += len(getattr(delta, change))
+                summary["lists"]           += 1
+                summary["pages"]           += delta.pages
+                summary["pages_unchanged"] += delta.pages_unchanged
+            return delta
+
+        stations    = run(STATION)
+        station_ids = stations.ids if stations else self.list_ids(STATION, "", api_version, environment) or []
+        if max_stations > 0:
+            station_ids = station_ids[:max_stations]
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="sync_%s" % environment) as executor:
+            deltas = list(executor.map(lambda station_id: run(PODCAST, station_id), station_ids))
+            if episodes:
+                podcast_ids = []
+                for station_id, delta in zip(station_ids, deltas):
+                    fresh = set(delta.added + delta.changed) if delta else set()
+                    ids   = delta.ids if delta else self.list_ids(PODCAST, station_id, api_version, environment) or []
+                    podcast_ids.extend(podcast_id for podcast_id in ids
+                                       if full or podcast_id in fresh
+                                       or self.list_ids(EPISODE, podcast_id, api_version, environment) is None)
+                list(executor.map(lambda podcast_id: run(EPISODE, podcast_id), podcast_ids))
+        summary["elapsed_ms"] = round((time.perf_counter() - start) * 1000.0, 3)
+        return summary
+
+    # --- For the GUI, these never raise --------------------------------------
+    def sync_stations(self, api_version="v1", environment=STAGING):
+        """ Sync the station list and return it like station_ids(), what
+            is held if the api can not be reached """
+        try:
+            self.sync_list(STATION, "", api_version, environment)
+        except Exception as e:
+            sys.stderr.write("ERROR -- Unable to sync the stations, using the ones held\n")
+            sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
+            sys.stderr.flush()
+        return self.station_ids(api_version, environment)
+
+    # -------------------------------------------------------------------------
+    def sync_station_podcasts(self, station_id, api_version="v1", environment=STAGING):
+        """ Sync the podcasts of a station, returns the ListDelta or None
+            if the api can not be reached """
+        try:
+            return self.sync_list(PODCAST, station_id, api_version, environment)
+        except Exception as e:
+            sys.stderr.write("ERROR -- Unable to sync the podcasts of station %s\n" % station_id)
+            sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
+            sys.stderr.flush()
+            return None
+
+    # -------------------------------------------------------------------------
+    def sync_podcast_episodes(self, podcast_id, api_version="v1", environment=STAGING):
+        """ Sync the episodes of a podcast, returns the ListDelta or None
+            if the api can not be reached """
+        try:
+            return self.sync_list(EPISODE, podcast_id, api_version, environment)
+        except Exception as e:
+            sys.stderr.write("ERROR -- Unable to sync the episodes of podcast %s\n" % podcast_id)
+            sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
+            sys.stderr.flush()
+            return None
+
+
+# =============================================================================
+# Unit tests, because Jon asked and he is right
+def test_sync_only_reads_what_changed():
+    import mock_api
+    base_url, cache_enabled = api_client.api_base_urls[DEVELOPMENT], api_client.CACHE_ENABLED
+    mock  = mock_api.MockApi(stations=3, podcasts=2, episodes=150).start().install([DEVELOPMENT])
+    store = CatalogStore(":memory:")
+    try:
+        api_client.CACHE_ENABLED = False
+        api_client.close_clients()
+        first = store.sync("v1", DEVELOPMENT, episodes=True)
+        assert not first["errors"] and first["podcasts_added"] == 6 and first["episodes_added"] == 900
+        assert store.station_ids("v1", DEVELOPMENT)["K0002"] == 2
+        assert [podcast["id"] for podcast in store.station_podcasts(2, "v1", DEVELOPMENT)] == [2001, 2002]
+
+        # Every station loses its second podcast and 2001 is updated, so
+        # only the podcast pages are read and only 2001's episodes looked at
+        mock.catalog.touch(2001)
+        mock.catalog.podcasts = 1
+        again = store.sync("v1", DEVELOPMENT, episodes=True)
+        assert (again["pages"], again["pages_unchanged"]) == (1 + 3 + 2, 1 + 0 + 2)
+        assert again["podcasts_removed"] == 3 and again["podcasts_changed"] == 1 and again["episodes_changed"] == 0
+        assert store.podcast_episodes(2002, "v1", DEVELOPMENT) is None
+        assert store.load_catalog("v1", DEVELOPMENT).counts() == {"stations": 3, "podcasts": 3, "episodes": 450}
+
+        # A list put without its pages is read again in full, once
+        held = store.put_list(EPISODE, 1001, store.podcast_episodes(1001, "v1", DEVELOPMENT), "v1", DEVELOPMENT)
+        assert not held.changes() and store.sync_list(EPISODE, 1001, "v1", DEVELOPMENT).pages_unchanged == 0
+        assert store.sync_list(EPISODE, 1001, "v1", DEVELOPMENT).pages_unchanged == 2
+    finally:
+        api_client.CACHE_ENABLED = cache_enabled
+        api_client.set_base_url(DEVELOPMENT, base_url)
+        mock.stop()
+
+def test_shared_and_moved_podcasts_are_kept():
+    store   = CatalogStore(":memory:")
+    podcast = records.Podcast.from_dict({"id": 7, "title": "Shared"})
+    episode = records.Episode.from_dict({"id": 70, "title": "One"})
+    store.put_list(PODCAST, 1, [podcast])
+    store.put_list(PODCAST, 2, [podcast])
+    store.put_list(EPISODE, 7, [episode])
+
+    # Off one station and still on the other, nothing is forgotten
+    assert store.put_list(PODCAST, 1, []).removed == ["7"]
+    assert [held["id"] for held in store.station_podcasts(2)] == [7]
+    assert [held["id"] for held in store.podcast_episodes(7)] == [70]
+
+    # Moved to station 3 before it went from station 2
+    store.put_list(PODCAST, 3, [podcast])
+    store.put_list(PODCAST, 2, [])
+    assert [held["id"] for held in store.station_podcasts(3)] == [7]
+    assert [held["id"] for held in store.podcast_episodes(7)] == [70]
+
+    # Off every station, it and its episodes go
+    store.put_list(PODCAST, 3, [])
+    assert store.records(PODCAST, [7]) == [] and store.podcast_episodes(7) is None
+    assert store.records(EPISODE, [70]) == []
+
+def test_put_list_streams():
+    store    = CatalogStore(":memory:")
+    episodes = [records.Episode.from_dict({"id": number, "title": str(number)}) for number in range(BATCH_SIZE + 5)]
+    assert len(store.put_list(EPISODE, 7, iter(episodes)).added) == BATCH_SIZE + 5
+
+    # A stream given up on leaves the list as it was and nothing new held
+    def given_up():
+        yield from episodes[:3]
+        yield records.Episode.from_dict({"id": 9999, "title": "new"})
+        raise ValueError("Gave up")
+    try:
+        store.put_list(EPISODE, 7, given_up())
+        assert False, "put_list() should raise"
+    except ValueError:
+        pass
+    assert len(store.list_ids(EPISODE, 7)) == BATCH_SIZE + 5 and store.records(EPISODE, [9999]) == []
+
+    # Read back a batch at a time, only as far as it is used
+    held = store.podcast_episodes(7)
+    assert [next(held)["id"] for _ in range(3)] == [0, 1, 2] and len(list(held)) == BATCH_SIZE + 2
+
+def test_pages_put_are_not_written_again():
+    import mock_api
+    base_url, cache_enabled = api_client.api_base_urls[DEVELOPMENT], api_client.CACHE_ENABLED
+    mock  = mock_api.MockApi(stations=1, podcasts=1, episodes=150).start().install([DEVELOPMENT])
+    store = CatalogStore(":memory:")
+    try:
+        api_client.CACHE_ENABLED = False
+        first_page = list(api_utils.iter_podcast_episodes(1001, "v1", DEVELOPMENT))[:100]
+        assert len(store.put_page(EPISODE, first_page, "v1", DEVELOPMENT)) == 100
+        assert store.list_ids(EPISODE, 1001, "v1", DEVELOPMENT) is None
+        delta = store.sync_list(EPISODE, 1001, "v1", DEVELOPMENT)
+        assert len(delta.ids) == 150 and len(delta.added) == 50
+    finally:
+        api_client.CACHE_ENABLED = cache_enabled
+        api_client.set_base_url(DEVELOPMENT, base_url)
+        mock.stop()
+
+def test_members_of_an_older_store_are_filled_in(tmp_path):
+    path  = str(tmp_path / "catalog.sqlite")
+    store = CatalogStore(path)
+    store.put_list(PODCAST, 1, [records.Podcast.from_dict({"id": 7})])
+    with store._db:
+        store._db.execute("DELETE FROM members")
+    store.close()
+    store = CatalogStore(path)
+    assert store.put_list(PODCAST, 2, []).removed == [] and store._referenced(PODCAST, ["7"], "v1", STAGING) == {"7"}
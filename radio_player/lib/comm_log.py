@@ -0,0 +1,295 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+import json
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from urllib.parse import unquote
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+
+# import third-party libraries
+try:
+    from PyQt5.QtCore import (Qt, QTimer, QAbstractTableModel, QModelIndex, QVariant)
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'PyQt5' library\n")
+    sys.stderr.write("         try: pip3 install pyqt5 --user\n")
+    sys.stderr.flush()
+    sys.exit(99)
+
+# The kinds of event in the log
+API    = "api"
+IMAGE  = "image"
+PLAYER = "player"
+NOTE   = "note"
+
+# How a call was answered
+CACHE_MISS        = "miss"          # Off the wire
+CACHE_HIT         = "hit"           # From the cache, no network
+CACHE_REVALIDATED = "revalidated"   # From the cache after a 304
+CACHE_STALE       = "stale"         # From the cache because the server could not be reached
+
+MAX_EVENTS = 5000
+
+
+# ----------------------------------------------------------------------------- _now()
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+# ----------------------------------------------------------------------------- CommLog
+class CommLog(object):
+    """ The last max_events api calls, image downloads, player events and
+        notes, oldest first. Each event is a flat dictionary:
+
+            seq, time, kind, url, status, bytes, elapsed_ms, wait_ms,
+            cache, content_type, message
+
+        The listener methods, api_call(), image_fetch() and so on, can be
+        called from any thread. Once the log is full the oldest event is
+        dropped for each new one, so a long session never grows it. seq
+        counts every event ever added, since() uses it to hand a view just
+        the events it has not seen yet. """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, max_events=MAX_EVENTS):
+        self.max_events = max_events
+        self.sequence   = 0
+        self._events    = deque(maxlen=max_events)
+        self._lock      = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    def add(self, kind, url="", status=0, size=0, elapsed_ms=0.0, wait_ms=0.0, cache="", content_type="", message=""):
+        """ Add one event, returns it """
+        with self._lock:
+            self.sequence += 1
+            event = {"seq"          : self.sequence          ,
+                     "time"         : _now()                 ,
+                     "kind"         : kind                   ,
+                     "url"          : url                    ,
+                     "status"       : status                 ,
+                     "bytes"        : size                   ,
+                     "elapsed_ms"   : round(elapsed_ms, 3)   ,
+                     "wait_ms"      : round(wait_ms, 3)      ,
+                     "cache"        : cache                  ,
+                     "content_type" : content_type           ,
+                     "message"      : message                }
+            self._events.append(event)
+        return event
+
+    # -------------------------------------------------------------------------
+    def note(self, message, kind=NOTE):
+        """ A line of text, e.g. "Exported 3 play sessions". Trailing blank
+            lines and separators are dropped, every event is its own row. """
+        return self.add(kind, message=message.rstrip("\n-").strip())
+
+    # -------------------------------------------------------------------------
+    def api_call(self, client, response):
+        """ api_client listener """
+        if getattr(response, "revalidated", False):
+            cache = CACHE_REVALIDATED
+        else:
+            cache = CACHE_HIT if getattr(response, "from_cache", False) else CACHE_MISS
+        wait_ms = response.elapsed.total_seconds() * 1000.0 if cache != CACHE_HIT else 0.0
+        self.add(API, unquote(response.url), response.status_code, len(response.content),
+                 getattr(response, "elapsed_ms", 0.0), wait_ms, cache,
+                 response.headers.get("Content-Type", ""), client.environment)
+
+    # -------------------------------------------------------------------------
+    def image_fetch(self, url, status, size, elapsed_ms, cache):
+        """ image_cache listener """
+        self.add(IMAGE, url, status, size, elapsed_ms, cache=cache)
+
+    # -------------------------------------------------------------------------
+    def play_session(self, session):
+        """ playback_metrics.PlaybackMonitor.session_finished, session is
+            the dictionary of a finished PlaySession """
+        self.add(PLAYER, session["url"], status=session["end_reason"],
+                 elapsed_ms=session["time_to_audio_ms"] or 0.0,
+                 message="Playback (%s): time to audio: %s ms, stalls: %d (%s ms, longest %s ms), "
+                         "input bitrate: %s kb/s (lowest %s), lost buffers: %d, errors: %d"
+                         % (session["player"], session["time_to_audio_ms"], session["stalls"],
+                            session["stall_ms"], session["longest_stall_ms"], session["input_kbps_average"],
+                            session["input_kbps_lowest"], session["lost_buffers"], session["errors"]))
+
+    # -------------------------------------------------------------------------
+    def events(self):
+        """ A copy of every event in the log, oldest first """
+        with self._lock:
+            return list(self._events)
+
+    # -------------------------------------------------------------------------
+    def since(self, sequence):
+        """ Returns (events, sequence), the events added after sequence that
+            are still in the log and the sequence to ask for next time """
+        with self._lock:
+            missed = min(self.sequence - sequence, len(self._events))
+            events = [self._events[index] for index in range(len(self._events) - missed, len(self._events))]
+            return (events, self.sequence)
+
+    # -------------------------------------------------------------------------
+    def export_jsonl(self, file_name):
+        """ Write every event to file_name as JSON lines, returns how many """
+        events = self.events()
+        with open(file_name, "w") as f:
+            for event in events:
+                f.write(json.dumps(event) + "\n")
+        return len(events)
+
+    # -------------------------------------------------------------------------
+    def export_har(self, file_name):
+        """ Write the api calls and image downloads to file_name as a HAR
+            1.2 archive, which browsers and most HTTP tools can open.
+            Returns how many entries were written. """
+        entries = []
+        for event in self.events():
+            if event["kind"] not in (API, IMAGE):
+                continue
+            wait_ms = event["wait_ms"] or event["elapsed_ms"]
+            entries.append({"startedDateTime" : event["time"]       ,
+                            "time"            : event["elapsed_ms"] ,
+                            "request"         : {"method"      : "GET"        ,
+                                                 "url"         : event["url"] ,
+                                                 "httpVersion" : "HTTP/1.1"   ,
+                                                 "cookies"     : []           ,
+                                                 "headers"     : []           ,
+                                                 "queryString" : []           ,
+                                                 "headersSize" : -1           ,
+                                                 "bodySize"    : 0            },
+                            "response"        : {"status"      : event["status"] ,
+                                                 "statusText"  : ""              ,
+                                                 "httpVersion" : "HTTP/1.1"      ,
+                                                 "cookies"     : []              ,
+                                                 "headers"     : []              ,
+                                                 "content"     : {"size"     : event["bytes"]        ,
+                                                                  "mimeType" : event["content_type"] },
+                                                 "redirectURL" : ""              ,
+                                                 "headersSize" : -1              ,
+                                                 "bodySize"    : event["bytes"]  },
+                            "cache"           : {}                  ,
+                            "timings"         : {"send"    : 0                                            ,
+                                                 "wait"    : wait_ms                                      ,
+                                                 "receive" : round(max(event["elapsed_ms"] - wait_ms, 0.0), 3) },
+                            "comment"         : "%s, cache %s" % (event["kind"], event["cache"] or "none")})
+        har = {"log": {"version" : "1.2"                                           ,
+                       "creator" : {"name": "podcast_player", "version": VERSION} ,
+                       "entries" : entries                                         }}
+        with open(file_name, "w") as f:
+            json.dump(har, f, indent=1)
+        return len(entries)
+
+
+# ----------------------------------------------------------------------------- CommLogModel
+class CommLogModel(QAbstractTableModel):
+    """ Table model over a CommLog for the Comm Log tab. Every refresh_ms
+        the rows added since the last look are inserted at the bottom and
+        the rows the log has dropped are removed from the top, so the view
+        only ever repaints what changed however busy the program is and
+        however long it runs. """
+
+    COLUMNS = [("Time", "time"), ("Kind", "kind"), ("Status", "status"), ("Bytes", "bytes"),
+               ("ms", "elapsed_ms"), ("Cache", "cache"), ("URL / Message", "url")]
+
+    # -------------------------------------------------------------------------
+    def __init__(self, log, refresh_ms=250, parent=None):
+        super().__init__(parent)
+        self.log      = log
+        self.sequence = 0
+        self._rows    = deque()
+        self._timer   = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start(refresh_ms)
+
+    # -------------------------------------------------------------------------
+    def refresh(self):
+        """ Catch up with the log, returns how many rows were added """
+        events, self.sequence = self.log.since(self.sequence)
+        if not events:
+            return 0
+        events = events[-self.log.max_events:]
+        drop   = min(len(self._rows) + len(events) - self.log.max_events, len(self._rows))
+        if drop > 0:
+            self.beginRemoveRows(QModelIndex(), 0, drop - 1)
+            for _ in range(drop):
+                self._rows.popleft()
+            self.endRemoveRows()
+        self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(events) - 1)
+        self._rows.extend(events)
+        self.endInsertRows()
+        return len(events)
+
+    # -------------------------------------------------------------------------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    # -------------------------------------------------------------------------
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section][FIRST]
+        return QVariant()
+
+    # -------------------------------------------------------------------------
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return QVariant()
+        event = self._rows[index.row()]
+        key   = self.COLUMNS[index.column()][LAST]
+        if role == Qt.DisplayRole:
+            if key == "time":
+                return event["time"][11:23]   # Just the time of day
+            if key == "url":
+                return " ".join(text for text in (event["url"], event["message"]) if text)
+            if key in ("status", "bytes", "elapsed_ms") and not event[key]:
+                return ""
+            if key == "elapsed_ms":
+                return "%.1f" % event[key]
+            return str(event[key])
+        if role == Qt.ToolTipRole and key == "url":
+            return event["message"] or event["url"]
+        if role == Qt.TextAlignmentRole and key in ("status", "bytes", "elapsed_ms"):
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return QVariant()
+
+
+# =============================================================================
+# Unit tests, because Jon asked and he is right
+def test_the_log_is_a_ring_buffer():
+    log = CommLog(max_events=3)
+    for number in range(5):
+        log.note("note %d\n----------------\n" % number)
+    assert [event["message"] for event in log.events()] == ["note 2", "note 3", "note 4"]
+    assert [event["seq"] for event in log.since(3)[FIRST]] == [4, 5] and log.since(0)[LAST] == 5
+
+def test_model_follows_the_log():
+    from PyQt5.QtCore import QCoreApplication
+    app   = QCoreApplication.instance() or QCoreApplication([])
+    log   = CommLog(max_events=3)
+    model = CommLogModel(log)
+    log.image_fetch("http://a/1.png", 200, 10, 5.0, CACHE_MISS)
+    assert model.refresh() == 1 and model.rowCount() == 1
+    for number in range(4):
+        log.note("note %d" % number)
+    assert model.refresh() == 3 and model.rowCount() == 3
+    assert model.index(0, 6).data() == "note 1"
+
+def test_export_har(tmp_path):
+    log = CommLog()
+    log.image_fetch("http://a/1.png", 200, 10, 5.0, CACHE_MISS)
+    log.note("not a request")
+    assert log.export_har(str(tmp_path / "log.har")) == 1
+    assert log.export_jsonl(str(tmp_path / "log.jsonl")) == 2
+    with open(str(tmp_path / "log.har")) as f:
+        entry = json.load(f)["log"]["entries"][FIRST]
+    assert entry["request"]["url"] == "http://a/1.png" and entry["timings"]["wait"] == 5.0
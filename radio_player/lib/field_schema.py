@@ -0,0 +1,102 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+import json
+import threading
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+CONFIG_PATH   = os.path.join(MY_PATH, "../config")
+CONFIG_FILE   = os.path.join(CONFIG_PATH, "podcast_player.conf")
+LIBRARY_PATH  = MY_PATH
+
+# import custom libraries
+sys.path.append(LIBRARY_PATH)
+try:
+    import podcast_player_utils
+    import image_cache
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'podcast_player_utils' and 'image_cache' libraries\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+CONFIGS     = podcast_player_utils.config_2_dictionary(CONFIG_FILE)
+CACHE_PATH  = CONFIGS.get("cache_path", os.path.join("/tmp", "podcast_player"))
+SCHEMA_FILE = os.path.join(CACHE_PATH, "field_schema.json")
+
+# The kinds of record that have a details tab
+STATION = "station"
+PODCAST = "podcast"
+EPISODE = "episode"
+
+# What the details tabs start with the very first time, before the api has
+# been heard from. Every record shown after that updates the schema.
+STATIC_FIELDS = {STATION : ["id", "callsign", "name", "station_stream", "square_logo_small"] ,
+                 PODCAST : ["id", "title", "image"]                                            ,
+                 EPISODE : ["id", "title", "published_date", "audio_url"]                      }
+
+
+# ----------------------------------------------------------------------------- FieldSchema
+class FieldSchema(object):
+    """ The field names shown on each details tab. The GUI used to ask the
+        api for a station, a podcast list and an episode list before it
+        could draw anything, just to learn the names for the labels. Now
+        the names seen last time are kept in a small file in the cache
+        folder, so the tabs are labelled straight away, and a record with
+        different fields updates them for this run and the next. """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, schema_file=SCHEMA_FILE):
+        self.schema_file = schema_file
+        self._lock       = threading.Lock()
+        self._fields     = {kind: list(fields) for kind, fields in STATIC_FIELDS.items()}
+        try:
+            with open(schema_file) as f:
+                cached = json.load(f)
+            for kind in self._fields:
+                if cached.get(kind):
+                    self._fields[kind] = [str(field) for field in cached[kind]]
+        except (OSError, ValueError, AttributeError):
+            pass  # First run, or a file we can not use, the static fields will do
+
+    # -------------------------------------------------------------------------
+    def fields(self, kind):
+        with self._lock:
+            return list(self._fields[kind])
+
+    # -------------------------------------------------------------------------
+    def remember(self, kind, record):
+        """ Take the field names from a record the api sent. Returns True
+            if they are not the ones we had, which are then saved. """
+        fields = [str(field) for field in record.keys()]
+        with self._lock:
+            if not fields or fields == self._fields[kind]:
+                return False
+            self._fields[kind] = fields
+            data = json.dumps(self._fields, indent=1).encode("utf-8")
+        try:
+            os.makedirs(os.path.dirname(self.schema_file), exist_ok=True)
+            image_cache.atomic_write(self.schema_file, data)
+        except OSError as e:
+            sys.stderr.write("ERROR -- Unable to save the field schema to %s\n" % self.schema_file)
+            sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
+            sys.stderr.flush()
+        return True
+
+
+# =============================================================================
+# Unit tests, because Jon asked and he is right
+def test_static_fields_until_a_record_is_seen(tmp_path):
+    schema = FieldSchema(str(tmp_path / "schema.json"))
+    assert schema.fields(PODCAST) == STATIC_FIELDS[PODCAST]
+    assert schema.remember(PODCAST, {"id": 1, "title": "Pod", "station_id": 3})
+    assert not schema.remember(PODCAST, {"id": 2, "title": "Other", "station_id": 3})
+    assert FieldSchema(str(tmp_path / "schema.json")).fields(PODCAST) == ["id", "title", "station_id"]
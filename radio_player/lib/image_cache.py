@@ -0,0 +1,310 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+CACHE_PATH    = os.path.join("/tmp", "podcast_player", "images")
+META_SUFFIX   = ".json"
+
+# Third-part library, imported by import_requests() when the first image is
+# downloaded
+requests = None
+
+
+# ----------------------------------------------------------------------------- import_requests()
+def import_requests():
+    """ Import the requests library the first time an image is downloaded
+        and return it, images already cached are shown without it """
+    global requests
+    if requests is None:
+        try:
+            import requests.adapters
+        except ModuleNotFoundError:
+            sys.stderr.write("ERROR -- Unable to import the 'requests' library\n")
+            sys.stderr.write("         try: pip3 install requests --user\n")
+            sys.stderr.flush()
+            sys.exit(99)
+    return requests
+
+
+# ----------------------------------------------------------------------------- atomic_write()
+def atomic_write(file_name, data):
+    """ Write data to a temporary file in the same folder and rename it into
+        place, so a reader sees either the old file or the new one and never
+        a half written file. """
+    fd, temp_name = tempfile.mkstemp(dir=os.path.dirname(file_name), prefix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_name, file_name)
+    except BaseException:
+        try:
+            os.remove(temp_name)
+        except OSError:
+            pass
+        raise
+
+
+# Told about every fetch, see add_listener()
+_listeners = []
+
+
+# ----------------------------------------------------------------------------- add_listener()
+def add_listener(listener):
+    """ Have listener(url, status, size, elapsed_ms, cache) called after
+        every fetch by any ImageCache, on the thread that fetched. cache is
+        "hit", "revalidated", "stale" or "miss", and status is 0 if the
+        server could not be reached. """
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+# ----------------------------------------------------------------------------- remove_listener()
+def remove_listener(listener):
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+# ----------------------------------------------------------------------------- _notify()
+def _notify(url, status, size, start, cache):
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+    for listener in list(_listeners):
+        try:
+            listener(url, status, size, elapsed_ms, cache)
+        except Exception as e:
+            sys.stderr.write("ERROR -- image fetch listener failed for %s\n" % url)
+            sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
+            sys.stderr.flush()
+
+
+# ----------------------------------------------------------------------------- ImageCache
+class ImageCache(object):
+    """ Content addressed cache of downloaded images. Each image is stored
+        under the sha256 of its url, so two servers that both serve
+        image.jpg never collide. Images older than revalidate_after seconds
+        are revalidated with a conditional request, and the least recently
+        used images are evicted once the cache grows past max_bytes. """
+
+    # -------------------------------------------------------------------------
+    def __init__(self,
+                 cache_path       = CACHE_PATH          ,
+                 max_bytes        = 256 * 1024 * 1024   ,
+                 revalidate_after = 24 * 60 * 60        ,
+                 timeout          = (3.05, 15.0)        ,
+                 pool_maxsize     = 16                  ):
+
+        self.cache_path       = cache_path
+        self.max_bytes        = max_bytes
+        self.revalidate_after = revalidate_after
+        self.timeout          = timeout
+        self.total_bytes      = None  # Counted on the first write
+        self._lock            = threading.Lock()
+        self._url_locks       = {}    # url --> [lock, threads using it]
+        self.pool_maxsize     = pool_maxsize
+        self.session          = None  # Made by open_session() on the first download
+
+        os.makedirs(self.cache_path, exist_ok=True)
+
+
+    # -------------------------------------------------------------------------
+    def open_session(self):
+        """ Return the pooled session images are downloaded with, made the
+            first time it is needed """
+        with self._lock:
+            if self.session is None:
+                requests = import_requests()
+                adapter  = requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=self.pool_maxsize)
+                session  = requests.Session()
+                session.mount("http://",  adapter)
+                session.mount("https://", adapter)
+                self.session = session
+            return self.session
+
+    # -------------------------------------------------------------------------
+    def file_name(self, url):
+        """ Return the cache file name for a url, keeping the extension of
+            the original file so image readers can use it as a hint. """
+        extension = os.path.splitext(urlsplit(url).path)[LAST].lower()
+        if len(extension) > 5:
+            extension = ""
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_path, digest + extension)
+
+    # -------------------------------------------------------------------------
+    @contextmanager
+    def _url_lock(self, url):
+        """ Hold the lock of a url so two threads asking for the same image
+            only download it once. A url's lock is forgotten once no thread
+            is using it, so there are only as many as fetches in flight. """
+        with self._lock:
+            entry = self._url_locks.get(url)
+            if entry is None:
+                entry = self._url_locks[url] = [threading.Lock(), 0]
+            entry[LAST] += 1
+        try:
+            with entry[FIRST]:
+                yield
+        finally:
+            with self._lock:
+                entry[LAST] -= 1
+                if entry[LAST] == 0:
+                    del self._url_locks[url]
+
+    # -------------------------------------------------------------------------
+    def _read_meta(self, image_file):
+        try:
+            with open(image_file + META_SUFFIX, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    # -------------------------------------------------------------------------
+    def _write_meta(self, image_file, meta):
+        atomic_write(image_file + META_SUFFIX, json.dumps(meta).encode("utf-8"))
+
+    # -------------------------------------------------------------------------
+    def _touch(self, image_file):
+        """ Mark an image as recently used, the modification time is
+            the LRU clock. """
+        try:
+            os.utime(image_file)
+        except OSError:
+            pass
+
+    # -------------------------------------------------------------------------
+    def fetch(self, url):
+        """ Return the name of a local file holding the image at url,
+            downloading or revalidating it as needed. If the download fails
+            but an older copy is cached the older copy is returned. Raises
+            an exception if there is no image to return. """
+        start      = time.perf_counter()
+        image_file = self.file_name(url)
+        with self._url_lock(url):
+            meta = self._read_meta(image_file) if os.path.isfile(image_file) else {}
+            if meta and time.time() - meta.get("fetched_at", 0) < self.revalidate_after:
+                self._touch(image_file)
+                _notify(url, HTTPStatus.OK, 0, start, "hit")
+                return image_file
+
+            headers = {}
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+            session = self.open_session()
+            try:
+                response = session.get(url, headers=headers, timeout=self.timeout)
+            except requests.RequestException:
+                _notify(url, 0, 0, start, "stale" if meta else "miss")
+                if meta:
+                    self._touch(image_file)
+                    return image_file
+                raise
+
+            if response.status_code == HTTPStatus.NOT_MODIFIED and meta:
+                meta["fetched_at"] = time.time()
+                self._write_meta(image_file, meta)
+                self._touch(image_file)
+                _notify(url, response.status_code, 0, start, "revalidated")
+                return image_file
+
+            if response.status_code != HTTPStatus.OK:
+                _notify(url, response.status_code, len(response.content), start, "stale" if meta else "miss")
+                if meta:
+                    return image_file
+                raise ValueError("Bad Response (%d) from %s " % (response.status_code, url))
+
+            old_size = os.path.getsize(image_file) if os.path.isfile(image_file) else 0
+            atomic_write(image_file, response.content)
+            self._write_meta(image_file, {"url"           : url                                        ,
+                                          "etag"          : response.headers.get("ETag", "")          ,
+                                          "last_modified" : response.headers.get("Last-Modified", "") ,
+                                          "fetched_at"    : time.time()                                })
+
+        _notify(url, response.status_code, len(response.content), start, "miss")
+        self._grew(len(response.content) - old_size)
+        return image_file
+
+    # -------------------------------------------------------------------------
+    def _grew(self, delta):
+        """ Keep a running total of the cache size and evict when it goes
+            over the limit. The folder is only scanned on the first write
+            and when evicting. """
+        with self._lock:
+            if self.total_bytes is None:
+                self.total_bytes = sum(size for name, size, used in self._entries())
+            else:
+                self.total_bytes += delta
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    # -------------------------------------------------------------------------
+    def _entries(self):
+        """ Yield (file name, size, last used) for every cached image """
+        for entry in os.scandir(self.cache_path):
+            if entry.name.startswith(".") or entry.name.endswith(META_SUFFIX):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            yield (entry.path, stat.st_size, stat.st_mtime)
+
+    # -------------------------------------------------------------------------
+    def _evict(self):
+        """ Delete the least recently used images until the cache is back
+            under 90% of its limit. Caller holds the lock. """
+        entries = sorted(self._entries(), key=lambda entry: entry[LAST])
+        total   = sum(entry[1] for entry in entries)
+        target  = self.max_bytes * 0.9
+        for image_file, size, used in entries:
+            if total <= target:
+                break
+            for file_name in (image_file, image_file + META_SUFFIX):
+                try:
+                    os.remove(file_name)
+                except OSError:
+                    pass
+            total -= size
+        self.total_bytes = total
+
+
+# =============================================================================
+# Unit tests, because Jon asked and he is right
+def test_file_name_is_content_addressed():
+    cache = ImageCache(tempfile.mkdtemp())
+    assert cache.file_name("http://a.com/image.jpg") != cache.file_name("http://b.com/image.jpg")
+    assert cache.file_name("http://a.com/image.jpg").endswith(".jpg")
+
+def test_evict_least_recently_used():
+    cache = ImageCache(tempfile.mkdtemp(), max_bytes=10)
+    for index, name in enumerate(["old", "new"]):
+        file_name = os.path.join(cache.cache_path, name)
+        atomic_write(file_name, b"1234567")
+        os.utime(file_name, (index, index))
+    cache._grew(0)
+    assert sorted(os.listdir(cache.cache_path)) == ["new"]
+
+def test_url_locks_are_forgotten():
+    cache = ImageCache(tempfile.mkdtemp())
+    with cache._url_lock("http://a.com/image.jpg"):
+        with cache._url_lock("http://b.com/image.jpg"):
+            assert len(cache._url_locks) == 2
+    assert cache._url_locks == {}
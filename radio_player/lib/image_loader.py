@@ -0,0 +1,114 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+CONFIG_PATH   = os.path.join(MY_PATH, "../config")
+CONFIG_FILE   = os.path.join(CONFIG_PATH, "podcast_player.conf")
+RESOURCE_PATH = os.path.join(MY_PATH, "../res")
+LIBRARY_PATH  = MY_PATH
+
+# import third-party libraries
+try:
+    from PyQt5.QtCore import (QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot)
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'PyQt5' library\n")
+    sys.stderr.write("         try: pip3 install pyqt5 --user\n")
+    sys.stderr.flush()
+    sys.exit(99)
+
+# import custom libraries
+sys.path.append(LIBRARY_PATH)
+try:
+    import podcast_player_utils
+    import thumbnails
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'podcast_player_utils' and 'thumbnails' libraries\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+CONFIGS              = podcast_player_utils.config_2_dictionary(CONFIG_FILE)
+IMAGE_LOADER_THREADS = int(CONFIGS.get("image_loader_threads", "8"))
+NO_IMAGE_FILE        = os.path.join(RESOURCE_PATH, "no_image.jpg")
+
+
+# ----------------------------------------------------------------------------- _ImageTask
+class _ImageTask(QRunnable):
+    """ Download one image and make its thumbnail on a pool thread. Nothing
+        in here touches a widget, the result goes back to the loader with a
+        signal and Qt queues it over to the GUI thread. """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, loader, key, url, generation):
+        super().__init__()
+        self.loader     = loader
+        self.key        = key
+        self.url        = url
+        self.generation = generation
+
+    # -------------------------------------------------------------------------
+    def run(self):
+        # Python hates unhandled exceptions in threads so catch everything
+        image_file = ""
+        try:
+            image_file = podcast_player_utils.download_station_logo(self.url) if self.url else ""
+            if len(image_file) == 0:
+                image_file = NO_IMAGE_FILE
+            image_file = thumbnails.thumbnail_file(image_file, self.loader.size, self.loader.size) or image_file
+        except Exception as e:
+            sys.stderr.write("ERROR -- Unable to load image from %s\n" % self.url)
+            sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
+            sys.stderr.flush()
+        finally:
+            self.loader._task_finished.emit(self.key, image_file, self.generation)
+
+
+# ----------------------------------------------------------------------------- ImageLoader
+class ImageLoader(QObject):
+    """ Loads images on a bounded QThreadPool. image_ready(key, image_file) is
+        emitted on the GUI thread as each image arrives, image_file is the
+        name of a thumbnail ready to be shown. cancel() drops every queued
+        load and ignores the results of any that are already running. """
+
+    image_ready    = pyqtSignal(object, str)
+    _task_finished = pyqtSignal(object, str, int)
+
+    # -------------------------------------------------------------------------
+    def __init__(self, size=thumbnails.ICON_SIZE, max_threads=IMAGE_LOADER_THREADS, parent=None):
+        super().__init__(parent)
+        self.size       = size
+        self.generation = 0
+        self.pending    = 0
+        self.pool       = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self._task_finished.connect(self._on_task_finished)
+
+    # -------------------------------------------------------------------------
+    def load(self, key, url):
+        """ Queue an image to load, key is handed back with the result """
+        self.pending += 1
+        self.pool.start(_ImageTask(self, key, url, self.generation))
+
+    # -------------------------------------------------------------------------
+    def cancel(self):
+        """ Forget about every load that has been asked for so far """
+        self.generation += 1
+        self.pending = 0
+        self.pool.clear()
+
+    # -------------------------------------------------------------------------
+    @pyqtSlot(object, str, int)
+    def _on_task_finished(self, key, image_file, generation):
+        if generation != self.generation:
+            return  # Left over from before the last cancel()
+        self.pending -= 1
+        self.image_ready.emit(key, image_file)
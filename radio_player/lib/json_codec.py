@@ -0,0 +1,200 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+import re
+import json
+import codecs
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+
+# Optional third-party libraries, the fastest one we have does the decoding.
+# All of them take the raw bytes of a response, so the body never has to be
+# turned into a str first.
+try:
+    import orjson
+    JSON_LIBRARY = "orjson"
+    loads        = orjson.loads
+except ModuleNotFoundError:
+    try:
+        import ujson
+        JSON_LIBRARY = "ujson"
+        loads        = ujson.loads
+    except ModuleNotFoundError:
+        JSON_LIBRARY = "json"
+        loads        = json.loads
+
+# orjson and ujson decode a whole page of a few hundred KB faster than the
+# ItemParser below can hand back its first items, so it is only worth
+# streaming the items of a response when neither of them is installed
+STREAM_ITEMS = JSON_LIBRARY == "json"
+
+# A JSON string, a piece of one cut off at the end of what we have so far, or
+# one of the characters that give a document its structure. Numbers, true,
+# false, null and white space never matter for finding where an item ends.
+_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|"|[\[\]{},]', re.S)
+
+_SPACE         = re.compile(r"\s*")
+
+_QUOTE         = ord('"')
+_OPEN          = (ord("{"), ord("["))
+_CLOSE         = (ord("}"), ord("]"))
+_OPEN_BRACKET  = ord("[")
+_COMMA         = ord(",")
+
+# Where an ItemParser is in the document
+_BEFORE_ITEMS  = 0
+_IN_ITEMS      = 1
+_AFTER_ITEMS   = 2
+
+
+# ----------------------------------------------------------------------------- ItemParser
+class ItemParser(object):
+    """ Incremental parser for an api response whose items are a list under
+        one key of the top level object, e.g. {"data": [...], "links": ...}.
+        Feed it the body a chunk at a time as it comes off the wire and it
+        hands back each item as soon as the whole item has arrived, so the
+        first stations of a page of 400 can be used while the rest are
+        still on their way. Items are decoded one at a time, each as soon
+        as all of it is in.
+
+            parser = ItemParser("data")
+            for chunk in chunks:
+                for item in parser.feed(chunk):
+                    ...
+            items, document = parser.close()
+
+        close() returns any items that were left and the rest of the
+        document with the list of items emptied. If the key is not a list
+        the whole document is only decoded by close() and the items come
+        from there. """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, key="data"):
+        self.key        = json.dumps(key).encode("utf-8")
+        self.state      = _BEFORE_ITEMS
+        self.buffer     = b""
+        self.position   = 0      # Where scanning picks up in the buffer
+        self.depth      = 0
+        self.member     = None   # Name of the top level member being read
+        self.head       = b""    # The document up to the "[" of the items
+        self.text       = ""     # Decoded body from the end of the last whole item
+        self.tail       = []     # Chunks from the "]" of the items on
+        self.utf8       = codecs.getincrementaldecoder("utf-8")()
+        self.decoder    = json.JSONDecoder()
+
+    # -------------------------------------------------------------------------
+    def feed(self, chunk):
+        """ Add the next chunk of the body, return the list of items that
+            are now complete """
+        if self.state == _AFTER_ITEMS:
+            self.tail.append(chunk)
+            return []
+        if self.state == _IN_ITEMS:
+            self.text += self.utf8.decode(chunk)
+            return self._items()
+
+        # Up to the items only the structure matters, so just the tokens
+        # that give the top level object its shape are looked at
+        buffer   = self.buffer + chunk
+        position = self.position
+        for match in _TOKEN.finditer(buffer, position):
+            token = match.group()
+            first = token[FIRST]
+            if first == _QUOTE:
+                if len(token) == 1:
+                    break  # The rest of this string is in a later chunk
+                if self.depth == 1 and self.member is None:
+                    self.member = token
+            elif first in _OPEN:
+                if self.depth == 1 and first == _OPEN_BRACKET and self.member == self.key:
+                    self.state  = _IN_ITEMS
+                    self.head   = buffer[:match.end()]
+                    self.text   = self.utf8.decode(buffer[match.end():])
+                    self.buffer = b""
+                    return self._items()
+                self.depth += 1
+            elif first in _CLOSE:
+                self.depth -= 1
+            elif first == _COMMA and self.depth == 1:
+                self.member = None
+            position = match.end()
+        self.buffer   = buffer
+        self.position = position
+        return []
+
+    # -------------------------------------------------------------------------
+    def _items(self):
+        """ Decode every whole item at the front of self.text """
+        items    = []
+        text     = self.text
+        position = 0
+        length   = len(text)
+        while True:
+            position = _SPACE.match(text, position).end()
+            if position == length:
+                break
+            if text[position] == ",":
+                position += 1
+                continue
+            if text[position] == "]":
+                self.state = _AFTER_ITEMS
+                self.tail  = [text[position:].encode("utf-8")]
+                break
+            try:
+                item, end = self.decoder.raw_decode(text, position)
+            except ValueError:
+                break  # The rest of this item is in a later chunk
+            if end == length and text[position] not in '{["':
+                break  # A number or literal may not be whole yet
+            items.append(item)
+            position = end
+        self.text = text[position:] if self.state == _IN_ITEMS else ""
+        return items
+
+    # -------------------------------------------------------------------------
+    def close(self):
+        """ Call once the whole body has been fed. Returns (items, document),
+            the items not yet handed back and the decoded top level object
+            without them. Raises a ValueError if the body was cut short. """
+        if self.state == _IN_ITEMS:
+            raise ValueError("The response ended in the middle of the items")
+        if self.state == _AFTER_ITEMS:
+            return ([], loads(self.head + b"".join(self.tail)))
+        document = loads(self.buffer)
+        items    = document.get(self.key.decode("utf-8")) if isinstance(document, dict) else None
+        if isinstance(items, list):
+            document = dict(document)
+            document[self.key.decode("utf-8")] = []
+            return (items, document)
+        return ([], document)
+
+
+# =============================================================================
+# Unit tests, because Jon asked and he is right
+def test_items_are_parsed_as_they_arrive():
+    body = json.dumps({"meta": {"count": 3, "note": "a [tricky}, \"one\""},
+                       "data": [{"id": 1, "name": "x]},"}, {"id": 2, "tags": [1, {"a": "\\"}]}, 3],
+                       "links": {"next": "/v1/stations?page[number]=2"}}).encode("utf-8")
+    for size in (1, 7, len(body)):
+        parser = ItemParser("data")
+        items  = []
+        for start in range(0, len(body), size):
+            items.extend(parser.feed(body[start:start + size]))
+        rest, document = parser.close()
+        assert items + rest == json.loads(body)["data"]
+        assert document["links"]["next"].endswith("=2") and document["data"] == []
+    parser = ItemParser("data")
+    assert parser.feed(body[:body.index(b"{\"id\": 2")]) == [{"id": 1, "name": "x]},"}]
+
+def test_a_single_item_is_left_to_close():
+    parser = ItemParser("data")
+    assert parser.feed(b'{"data": {"id": 3, "type": "stations"}}') == []
+    assert parser.close() == ([], {"data": {"id": 3, "type": "stations"}})
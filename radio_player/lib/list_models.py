@@ -0,0 +1,290 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+from collections import OrderedDict
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+RESOURCE_PATH = os.path.join(MY_PATH, "../res")
+LIBRARY_PATH  = MY_PATH
+
+# import third-party libraries
+try:
+    from PyQt5.QtGui import (QIcon)
+    from PyQt5.QtCore import (Qt, QObject, QAbstractListModel, QModelIndex, QVariant, pyqtSignal, pyqtSlot)
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'PyQt5' library\n")
+    sys.stderr.write("         try: pip3 install pyqt5 --user\n")
+    sys.stderr.flush()
+    sys.exit(99)
+
+# import custom libraries
+sys.path.append(LIBRARY_PATH)
+try:
+    import thumbnails
+    import image_loader
+    import catalog
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'thumbnails', 'image_loader' and 'catalog' libraries\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+
+# ----------------------------------------------------------------------------- ArtworkCache
+class ArtworkCache(QObject):
+    """ A bounded LRU of list icons keyed by image url. Asking for an icon
+        that is not loaded yet returns the place holder icon and starts
+        loading the image in the background, icon_ready(url) is emitted
+        once it is available. Only the icons for rows that are painted
+        are ever asked for, so only visible artwork is downloaded. """
+
+    icon_ready = pyqtSignal(str)
+
+    # -------------------------------------------------------------------------
+    def __init__(self, loader=None, max_icons=500, parent=None):
+        super().__init__(parent)
+        self.loader      = loader if loader is not None else image_loader.ImageLoader(thumbnails.ICON_SIZE, parent=self)
+        self.max_icons   = max_icons
+        self.placeholder = QIcon(thumbnails.thumbnail_pixmap(image_loader.NO_IMAGE_FILE,
+                                                             self.loader.size, self.loader.size))
+        self._icons      = OrderedDict()
+        self._requested  = set()
+        self.loader.image_ready.connect(self._on_image_ready)
+
+    # -------------------------------------------------------------------------
+    def icon(self, url):
+        """ Return the icon for url, or the place holder while it loads """
+        icon = self._icons.get(url)
+        if icon is not None:
+            self._icons.move_to_end(url)
+            return icon
+        if url and url not in self._requested:
+            self._requested.add(url)
+            self.loader.load(url, url)
+        return self.placeholder
+
+    # -------------------------------------------------------------------------
+    def cancel(self):
+        """ Stop loading everything that has been asked for so far """
+        self.loader.cancel()
+        self._requested.clear()
+
+    # -------------------------------------------------------------------------
+    @pyqtSlot(object, str)
+    def _on_image_ready(self, url, image_file):
+        self._requested.discard(url)
+        self._icons[url] = QIcon(image_file)
+        while len(self._icons) > self.max_icons:
+            self._icons.popitem(last=False)
+        self.icon_ready.emit(url)
+
+
+# ----------------------------------------------------------------------------- RecordListModel
+class RecordListModel(QAbstractListModel):
+    """ List model over record ids, the records themselves live in a
+        catalog.Catalog and are looked up by id as rows are painted. Each
+        row hands back its id as Qt.UserRole data. Rows are handed to the
+        view batch_size at a time through canFetchMore()/fetchMore() as the
+        user scrolls, and artwork comes from an ArtworkCache as rows are
+        painted. The ids can be a list or any iterator, such as the one
+        from Catalog.stream_podcast_episodes(), in which case ids are only
+        pulled from it as rows are needed. Subclasses say how a record is
+        found with lookup() and shown with display_text(), image_url() and,
+        for sorted models, sort_key(). """
+
+    is_sorted = False  # True if rows are ordered by sort_key()
+
+    # -------------------------------------------------------------------------
+    def __init__(self, artwork, record_catalog=None, batch_size=100, parent=None):
+        super().__init__(parent)
+        self.artwork      = artwork
+        self.catalog      = record_catalog if record_catalog is not None else catalog.Catalog()
+        self.batch_size   = batch_size
+        self.ids          = []
+        self.loaded       = 0
+        self._source      = None
+        self._rows_by_url = {}
+        self.artwork.icon_ready.connect(self._on_icon_ready)
+
+    # --- Overridden by subclasses --------------------------------------------
+    def lookup(self, record_id):
+        return None
+
+    def display_text(self, record):
+        return str(record["id"])
+
+    def image_url(self, record):
+        return ""
+
+    def sort_key(self, record):
+        return None
+
+    # -------------------------------------------------------------------------
+    def set_ids(self, ids):
+        """ Replace the rows shown by the model. A sorted model has to
+            read all of an iterator up front, otherwise it is streamed. """
+        self.beginResetModel()
+        self._source = None
+        if isinstance(ids, (list, tuple)) or self.is_sorted:
+            self.ids = list(ids)
+            if self.is_sorted:
+                self.ids.sort(key=lambda record_id: self.sort_key(self.lookup(record_id)))
+        else:
+            self.ids = []
+            self._source = iter(ids)
+        self.loaded = 0
+        self._rows_by_url = {}
+        self.endResetModel()
+
+    # -------------------------------------------------------------------------
+    def record(self, row):
+        """ Return the record shown in row or None """
+        if 0 <= row < self.loaded:
+            return self.lookup(self.ids[row])
+        return None
+
+    # -------------------------------------------------------------------------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+
+    # -------------------------------------------------------------------------
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and (self.loaded < len(self.ids) or self._source is not None)
+
+    # -------------------------------------------------------------------------
+    def _pull(self):
+        """ Read up to a batch of ids from the source iterator """
+        try:
+            while self._source is not None and len(self.ids) - self.loaded < self.batch_size:
+                self.ids.append(next(self._source))
+        except StopIteration:
+            self._source = None
+        except Exception as e:
+            sys.stderr.write("ERROR -- Unable to read more list records\n")
+            sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
+            sys.stderr.flush()
+            self._source = None
+
+    # -------------------------------------------------------------------------
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        self._pull()
+        count = min(self.batch_size, len(self.ids) - self.loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        for row in range(self.loaded, self.loaded + count):
+            self._rows_by_url.setdefault(self.image_url(self.lookup(self.ids[row])), []).append(row)
+        self.loaded += count
+        self.endInsertRows()
+
+    # -------------------------------------------------------------------------
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self.loaded:
+            return QVariant()
+        if role == Qt.UserRole:
+            return self.ids[index.row()]
+        record = self.lookup(self.ids[index.row()])
+        if record is None:
+            return QVariant()
+        if role == Qt.DisplayRole:
+            return self.display_text(record)
+        if role == Qt.DecorationRole:
+            return self.artwork.icon(self.image_url(record))
+        if role == Qt.ToolTipRole:
+            return self.display_text(record)
+        return QVariant()
+
+    # -------------------------------------------------------------------------
+    @pyqtSlot(str)
+    def _on_icon_ready(self, url):
+        rows = self._rows_by_url.get(url)
+        if rows:
+            self.dataChanged.emit(self.index(min(rows)), self.index(max(rows)), [Qt.DecorationRole])
+
+
+# ----------------------------------------------------------------------------- PodcastListModel
+class PodcastListModel(RecordListModel):
+    """ Podcasts sorted by title, each with its own artwork """
+
+    is_sorted = True
+
+    def lookup(self, record_id):
+        return self.catalog.podcast(record_id)
+
+    def display_text(self, record):
+        return "Podcast ID: %s\n%s" % (str(record["id"]), str(record["title"]))
+
+    def image_url(self, record):
+        return record.get("image", "") if record is not None else ""
+
+    def sort_key(self, record):
+        return (str(record["title"]).casefold(), str(record["id"]))
+
+
+# ----------------------------------------------------------------------------- EpisodeListModel
+class EpisodeListModel(RecordListModel):
+    """ Episodes in api order, all sharing the artwork of their podcast """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, artwork, record_catalog=None, batch_size=100, parent=None):
+        super().__init__(artwork, record_catalog, batch_size, parent)
+        self.podcast_image_url = ""
+
+    # -------------------------------------------------------------------------
+    def set_ids(self, ids, podcast_image_url=""):
+        self.podcast_image_url = podcast_image_url
+        super().set_ids(ids)
+
+    def lookup(self, record_id):
+        return self.catalog.episode(record_id)
+
+    def display_text(self, record):
+        return "Episode ID: %s\n%s\nPublished: %s" % (str(record["id"])             ,
+                                                      str(record["title"])          ,
+                                                      str(record["published_date"]) )
+
+    def image_url(self, record):
+        return self.podcast_image_url
+
+
+# =============================================================================
+# Unit tests, because Jon asked and he is right
+def _podcast(podcast_id, title):
+    return {"id": podcast_id, "title": title, "image": ""}
+
+def test_rows_are_fetched_in_batches():
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    model = PodcastListModel(ArtworkCache(), batch_size=2)
+    model.set_ids(model.catalog.set_station_podcasts(3, [_podcast(1, "c"), _podcast(2, "A"), _podcast(3, "b")]))
+    assert model.rowCount() == 0 and model.canFetchMore()
+    model.fetchMore()
+    assert model.rowCount() == 2
+    model.fetchMore()
+    assert model.rowCount() == 3 and not model.canFetchMore()
+    assert [model.record(row)["id"] for row in range(3)] == [2, 3, 1]
+    assert model.index(0).data(Qt.UserRole) == "2"
+
+def test_rows_are_streamed_from_an_iterator():
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    pulled = []
+    def episodes():
+        for episode_id in range(5):
+            pulled.append(episode_id)
+            yield {"id": episode_id, "title": "", "published_date": ""}
+    model = EpisodeListModel(ArtworkCache(), batch_size=2)
+    model.set_ids(model.catalog.stream_podcast_episodes(7, episodes()))
+    model.fetchMore()
+    assert model.rowCount() == 2 and len(pulled) == 2 and model.canFetchMore()
+    assert model.catalog.episode("1")["id"] == 1
@@ -0,0 +1,180 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+import threading
+from collections import OrderedDict
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+CONFIG_PATH   = os.path.join(MY_PATH, "../config")
+CONFIG_FILE   = os.path.join(CONFIG_PATH, "podcast_player.conf")
+LIBRARY_PATH  = MY_PATH
+
+# import custom libraries
+sys.path.append(LIBRARY_PATH)
+try:
+    import podcast_player_utils
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'podcast_player_utils' library\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+CONFIGS          = podcast_player_utils.config_2_dictionary(CONFIG_FILE)
+VLC_OPTIONS      = CONFIGS.get("vlc_options", "--no-video --quiet").split()
+PARSE_TIMEOUT_MS = int(CONFIGS.get("vlc_parse_timeout_ms", "5000"))
+MAX_PRELOADED    = int(CONFIGS.get("vlc_preloaded_media", "4"))
+
+vlc            = None   # Imported by import_vlc() when a player is first needed
+_instance      = None
+_instance_lock = threading.Lock()
+
+
+# ----------------------------------------------------------------------------- import_vlc()
+def import_vlc():
+    """ Import the vlc library the first time something needs it and return
+        it. Loading libvlc is a good part of starting the program and most
+        sessions browse for a while before anything is played. """
+    global vlc
+    if vlc is None:
+        try:
+            import vlc
+        except ModuleNotFoundError:
+            sys.stderr.write("ERROR -- Unable to import the 'vlc' library\n")
+            sys.stderr.write("         try: pip3 install python-vlc --user\n")
+            sys.stderr.flush()
+            sys.exit(99)
+    return vlc
+
+
+# ----------------------------------------------------------------------------- get_instance()
+def get_instance():
+    """ Return the one vlc.Instance shared by every player, creating it on
+        first use. Starting libvlc is slow so it is only ever done once. """
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            _instance = import_vlc().Instance(VLC_OPTIONS)
+        return _instance
+
+
+# ----------------------------------------------------------------------------- release_instance()
+def release_instance():
+    """ Release the shared vlc.Instance, call once every player is released """
+    global _instance
+    with _instance_lock:
+        if _instance is not None:
+            _instance.release()
+            _instance = None
+
+
+# ----------------------------------------------------------------------------- PreloadingPlayer
+class PreloadingPlayer(object):
+    """ A long lived vlc.MediaPlayer on the shared instance. prepare(url) is
+        called when an item is selected: it builds the vlc.Media and starts
+        libvlc parsing it on its own threads, so by the time play() is
+        pressed the stream has already been opened and probed. The last few
+        media are kept parsed so going back to an item is instant, older
+        ones are released so a long session does not leak libvlc media.
+
+        Nothing of libvlc is touched until the first prepare(), on_player
+        is then called with the new vlc.MediaPlayer, e.g. to follow its
+        events. """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, max_preloaded=MAX_PRELOADED, on_player=None):
+        self.player        = None
+        self.on_player     = on_player
+        self.max_preloaded = max(1, max_preloaded)
+        self.url           = ""
+        self._media        = OrderedDict()   # url --> parsed vlc.Media, oldest first
+
+    # -------------------------------------------------------------------------
+    def prepare(self, url):
+        """ Make url the media to play next and start parsing it in the
+            background. Does not start playing. """
+        if self.player is None:
+            self.player = get_instance().media_player_new()
+            if self.on_player is not None:
+                self.on_player(self.player)
+        media = self._media.pop(url, None)
+        if media is None:
+            media = get_instance().media_new(url)
+            try:
+                media.parse_with_options(import_vlc().MediaParseFlag.network, PARSE_TIMEOUT_MS)
+            except Exception as e:
+                sys.stderr.write("ERROR -- Unable to start parsing %s\n" % url)
+                sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
+                sys.stderr.flush()
+        self._media[url] = media
+        self.url = url
+        self.player.set_media(media)
+
+        # The player holds its own reference to the media it has, so ours
+        # can go for anything past the preload limit
+        while len(self._media) > self.max_preloaded:
+            old_url, old_media = self._media.popitem(last=False)
+            old_media.release()
+
+    # -------------------------------------------------------------------------
+    def play(self):
+        if self.player is None:
+            return -1
+        return self.player.play()
+
+    # -------------------------------------------------------------------------
+    def stop(self):
+        if self.player is not None:
+            self.player.stop()
+
+    # -------------------------------------------------------------------------
+    def release(self):
+        """ Stop and release the player and every media it has preloaded """
+        if self.player is None:
+            return
+        self.player.stop()
+        for media in self._media.values():
+            media.release()
+        self._media.clear()
+        self.player.release()
+        self.player = None
+
+
+# =============================================================================
+# Unit tests, because Jon asked and he is right
+class _FakeMedia(object):
+    def __init__(self, url):
+        self.url      = url
+        self.released = False
+    def parse_with_options(self, flags, timeout):
+        return 0
+    def release(self):
+        self.released = True
+
+class _FakeInstance(object):
+    def __init__(self):
+        self.created = []
+    def media_player_new(self):
+        return type("FakePlayer", (object,), {"set_media": lambda self, media: None})()
+    def media_new(self, url):
+        self.created.append(_FakeMedia(url))
+        return self.created[LAST]
+
+def test_old_media_is_released(monkeypatch):
+    instance = _FakeInstance()
+    monkeypatch.setattr(sys.modules[__name__], "get_instance", lambda: instance)
+    created = []
+    player  = PreloadingPlayer(max_preloaded=2, on_player=created.append)
+    assert player.player is None
+    for url in ("a", "b", "a", "c"):
+        player.prepare(url)
+    assert [media.url for media in instance.created] == ["a", "b", "c"]
+    assert [media.released for media in instance.created] == [False, True, False]
+    assert player.url == "c" and created == [player.player]
@@ -0,0 +1,337 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+import re
+import socket
+import threading
+from urllib.parse import urlsplit
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+CONFIG_PATH   = os.path.join(MY_PATH, "../config")
+CONFIG_FILE   = os.path.join(CONFIG_PATH, "podcast_player.conf")
+LIBRARY_PATH  = MY_PATH
+
+# import custom libraries
+sys.path.append(LIBRARY_PATH)
+try:
+    import podcast_player_utils
+    import api_client
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'podcast_player_utils' and 'api_client' libraries\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+CONFIGS = podcast_player_utils.config_2_dictionary(CONFIG_FILE)
+
+# Upper bounds (milliseconds) of the latency histogram buckets
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# A path segment that is an id, e.g. the 3 of /v1/stations/3
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F-]{32,36})$")
+
+
+# ----------------------------------------------------------------------------- endpoint_of()
+def endpoint_of(path):
+    """ Split the path of an api call, without the host, into (api version,
+        endpoint), with ids taken out so every station is one endpoint,
+        e.g. "/v1/stations/3?x=1" --> ("v1", "stations/{id}") """
+    segments = [segment for segment in urlsplit(path).path.split("/") if segment]
+    if not segments:
+        return ("", "")
+    endpoint = "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in segments[1:])
+    return (segments[FIRST], endpoint)
+
+
+# ----------------------------------------------------------------------------- _labels()
+def _labels(names, values, extra=""):
+    pairs = ['%s="%s"' % (name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+             for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{%s}" % ",".join(pairs) if pairs else ""
+
+
+# ----------------------------------------------------------------------------- Counter
+class Counter(object):
+    """ A Prometheus counter, one running total per set of label values """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, name, help_text, label_names):
+        self.name        = name
+        self.help_text   = help_text
+        self.label_names = tuple(label_names)
+        self.values      = {}
+
+    # -------------------------------------------------------------------------
+    def inc(self, labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    # -------------------------------------------------------------------------
+    def render(self):
+        lines = ["# HELP %s %s" % (self.name, self.help_text), "# TYPE %s counter" % self.name]
+        for labels in sorted(self.values):
+            lines.append("%s%s %s" % (self.name, _labels(self.label_names, labels), self.values[labels]))
+        return lines
+
+
+# ----------------------------------------------------------------------------- Histogram
+class Histogram(object):
+    """ A Prometheus histogram, bucket counts, sum and count per set of
+        label values """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, name, help_text, label_names, buckets=LATENCY_BUCKETS_MS):
+        self.name        = name
+        self.help_text   = help_text
+        self.label_names = tuple(label_names)
+        self.buckets     = tuple(buckets)
+        self.values      = {}   # labels --> [count per bucket..., +Inf count, sum]
+
+    # -------------------------------------------------------------------------
+    def observe(self, labels, value):
+        counts = self.values.get(labels)
+        if counts is None:
+            counts = self.values[labels] = [0] * (len(self.buckets) + 2)
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+        counts[-2] += 1
+        counts[-1] += value
+
+    # -------------------------------------------------------------------------
+    def count(self, labels):
+        counts = self.values.get(labels)
+        return counts[-2] if counts else 0
+
+    # -------------------------------------------------------------------------
+    def render(self):
+        lines = ["# HELP %s %s" % (self.name, self.help_text), "# TYPE %s histogram" % self.name]
+        for labels in sorted(self.values):
+            counts = self.values[labels]
+            for bound, count in zip(self.buckets, counts):
+                lines.append("%s_bucket%s %d" % (self.name, _labels(self.label_names, labels, 'le="%g"' % bound), count))
+            lines.append("%s_bucket%s %d" % (self.name, _labels(self.label_names, labels, 'le="+Inf"'), counts[-2]))
+            lines.append("%s_sum%s %.3f" % (self.name, _labels(self.label_names, labels), counts[-1]))
+            lines.append("%s_count%s %d" % (self.name, _labels(self.label_names, labels), counts[-2]))
+        return lines
+
+
+# ----------------------------------------------------------------------------- Metrics
+class Metrics(object):
+    """ Request level metrics for the api calls and stream probes of one
+        run, labelled by environment and api version, kept as Prometheus
+        counters and histograms. install() hangs it off api_client so
+        every call made by anything is counted. render() is the Prometheus
+        text format, for MetricsServer and for dumping to a file. """
+
+    API_LABELS   = ("environment", "api_version", "endpoint")
+    PROBE_LABELS = ("environment", "kind")
+
+    # -------------------------------------------------------------------------
+    def __init__(self):
+        self._lock     = threading.Lock()
+        self.latency   = Histogram("podcast_api_request_duration_ms", "Time taken by api calls in milliseconds",
+                                   self.API_LABELS)
+        self.requests  = Counter("podcast_api_requests_total", "Api calls by status", self.API_LABELS + ("status",))
+        self.errors    = Counter("podcast_api_errors_total", "Api calls that did not answer with a 2xx or 304",
+                                 self.API_LABELS)
+        self.bytes     = Counter("podcast_api_response_bytes_total", "Bytes of api response bodies", self.API_LABELS)
+        self.cache     = Counter("podcast_api_cache_total", "Api calls by how the response cache answered them",
+                                 self.API_LABELS + ("result",))
+        self.probe_ttfb    = Histogram("podcast_stream_probe_ttfb_ms", "Stream probe time to first byte in milliseconds",
+                                       self.PROBE_LABELS)
+        self.probe_startup = Histogram("podcast_stream_probe_startup_ms",
+                                       "Stream probe start to first body byte, redirects included, in milliseconds",
+                                       self.PROBE_LABELS)
+        self.probe_kbps    = Histogram("podcast_stream_probe_kbps", "Stream probe sustained read rate in kb/s",
+                                       self.PROBE_LABELS, (32, 64, 96, 128, 192, 256, 320, 512, 1024, 4096))
+        self.probes        = Counter("podcast_stream_probes_total", "Stream probes by outcome",
+                                     self.PROBE_LABELS + ("ok",))
+
+    # -------------------------------------------------------------------------
+    def observe_api(self, environment, api_version, endpoint, status, size, elapsed_ms, cache="miss"):
+        labels = (environment, api_version, endpoint)
+        with self._lock:
+            self.latency.observe(labels, elapsed_ms)
+            self.requests.inc(labels + (str(status),))
+            self.bytes.inc(labels, size)
+            self.cache.inc(labels + (cache,))
+            if not (200 <= status < 300 or status == 304):
+                self.errors.inc(labels)
+
+    # -------------------------------------------------------------------------
+    def api_call(self, client, response):
+        """ api_client listener """
+        base_url = client.base_url
+        path     = response.url[len(base_url):] if response.url.startswith(base_url) else urlsplit(response.url).path
+        api_version, endpoint = endpoint_of(path)
+        if getattr(response, "revalidated", False):
+            cache = "revalidated"
+        else:
+            cache = "hit" if getattr(response, "from_cache", False) else "miss"
+        self.observe_api(client.environment, api_version, endpoint, response.status_code,
+                         len(response.content), getattr(response, "elapsed_ms", 0.0), cache)
+
+    # -------------------------------------------------------------------------
+    def observe_probe(self, environment, kind, result):
+        """ Count one stream_probe.probe_url() result """
+        labels = (environment, kind)
+        with self._lock:
+            self.probes.inc(labels + ("true" if result["ok"] else "false",))
+            if result.get("ttfb_ms") is not None:
+                self.probe_ttfb.observe(labels, result["ttfb_ms"])
+            if result.get("startup_ms") is not None:
+                self.probe_startup.observe(labels, result["startup_ms"])
+            if result.get("kbps") is not None:
+                self.probe_kbps.observe(labels, result["kbps"])
+
+    # -------------------------------------------------------------------------
+    def cache_hit_ratio(self, labels):
+        """ Share of the calls of an endpoint answered without a download """
+        total = self.latency.count(labels)
+        if not total:
+            return 0.0
+        hits = sum(count for key, count in self.cache.values.items() if key[:3] == labels and key[3] != "miss")
+        return hits / float(total)
+
+    # -------------------------------------------------------------------------
+    def render(self):
+        """ Every metric in the Prometheus text format """
+        with self._lock:
+            lines = []
+            for metric in (self.latency, self.requests, self.errors, self.bytes, self.cache):
+                lines.extend(metric.render())
+            lines.append("# HELP podcast_api_cache_hit_ratio Share of api calls answered from the response cache")
+            lines.append("# TYPE podcast_api_cache_hit_ratio gauge")
+            for labels in sorted(self.latency.values):
+                lines.append("podcast_api_cache_hit_ratio%s %.4f" % (_labels(self.API_LABELS, labels),
+                                                                     self.cache_hit_ratio(labels)))
+            for metric in (self.probes, self.probe_ttfb, self.probe_startup, self.probe_kbps):
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    # -------------------------------------------------------------------------
+    def install(self):
+        api_client.add_listener(self.api_call)
+        return self
+
+    # -------------------------------------------------------------------------
+    def uninstall(self):
+        api_client.remove_listener(self.api_call)
+
+
+# ----------------------------------------------------------------------------- _MetricsHandler
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """ Answers GET /metrics with the metrics of the server """
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_GET(self):
+        if urlsplit(self.path).path != "/metrics":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = self.server.metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+# ----------------------------------------------------------------------------- MetricsServer
+class MetricsServer(object):
+    """ A local HTTP endpoint for Prometheus to scrape, e.g.
+        http://127.0.0.1:9464/metrics """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, metrics, port=0, host="127.0.0.1"):
+        self.metrics = metrics
+        self._server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self._server.daemon_threads = True
+        self._server.metrics = metrics
+
+    # -------------------------------------------------------------------------
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True).start()
+        return self
+
+    # -------------------------------------------------------------------------
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return "http://%s:%d/metrics" % (host, port)
+
+    # -------------------------------------------------------------------------
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# ----------------------------------------------------------------------------- start_from_config()
+def start_from_config(metrics, configs=CONFIGS):
+    """ Serve metrics on the port named by metrics_port in the config
+        file. Returns the MetricsServer, or None if there is no port or it
+        can not be opened. """
+    if not configs.get("metrics_port"):
+        return None
+    try:
+        return MetricsServer(metrics, int(configs["metrics_port"]), configs.get("metrics_host", "127.0.0.1")).start()
+    except (OSError, ValueError) as e:
+        sys.stderr.write("ERROR -- Unable to serve metrics on port %s\n" % configs["metrics_port"])
+        sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
+        sys.stderr.flush()
+    return None
+
+
+# =============================================================================
+# Unit tests, because Jon asked and he is right
+def test_endpoint_of():
+    assert endpoint_of("/v1/stations/3?page[size]=1") == ("v1", "stations/{id}")
+    assert endpoint_of("/v1/episodes?filter[podcast_id]=9") == ("v1", "episodes")
+    assert endpoint_of("") == ("", "")
+
+def test_histograms_and_counters_render():
+    metrics = Metrics()
+    metrics.observe_api("staging", "v1", "stations", 200, 1000, 42.0)
+    metrics.observe_api("staging", "v1", "stations", 200, 1000, 3.0, "hit")
+    metrics.observe_api("staging", "v1", "stations", 500, 10, 700.0)
+    metrics.observe_probe("staging", "station_stream", {"ok": True, "ttfb_ms": 80.0, "startup_ms": 90.0, "kbps": 128.0})
+    text   = metrics.render()
+    labels = 'environment="staging",api_version="v1",endpoint="stations"'
+    assert 'podcast_api_request_duration_ms_bucket{%s,le="50"} 2' % labels in text
+    assert 'podcast_api_request_duration_ms_count{%s} 3' % labels in text
+    assert 'podcast_api_requests_total{%s,status="500"} 1' % labels in text
+    assert 'podcast_api_errors_total{%s} 1' % labels in text
+    assert 'podcast_api_response_bytes_total{%s} 2010' % labels in text
+    assert 'podcast_api_cache_hit_ratio{%s} 0.3333' % labels in text
+    assert 'podcast_stream_probes_total{environment="staging",kind="station_stream",ok="true"} 1' in text
+
+def test_metrics_server():
+    import requests
+    metrics = Metrics()
+    metrics.observe_api("production", "v2", "stations", 200, 5, 1.0)
+    server = MetricsServer(metrics).start()
+    try:
+        r = requests.get(server.url())
+        assert r.status_code == 200 and 'environment="production",api_version="v2"' in r.text
+        assert requests.get(server.url().replace("/metrics", "/other")).status_code == 404
+    finally:
+        server.stop()
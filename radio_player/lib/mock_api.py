@@ -0,0 +1,251 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+import json
+import time
+import socket
+import hashlib
+import threading
+from urllib.parse import urlsplit, parse_qs, urlencode
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+RESOURCE_PATH = os.path.join(MY_PATH, "../res")
+LIBRARY_PATH  = MY_PATH
+
+# import custom libraries
+sys.path.append(LIBRARY_PATH)
+try:
+    import api_client
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'api_client' library\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+STATION_ATTRIBUTES = 60   # About as many as a real v1 station has
+UPDATED_AT         = "2019-04-01T00:00:00Z"
+
+
+# ----------------------------------------------------------------------------- SyntheticCatalog
+class SyntheticCatalog(object):
+    """ A made up catalog of stations, podcasts and episodes in the shape
+        of the v1 api. Nothing is stored, every record is worked out from
+        its id when it is asked for, so 400 x 100 x 1,000 costs nothing
+        until it is fetched. Ids:
+
+            station  1 .. stations
+            podcast  station * 1000 + 1 .. station * 1000 + podcasts
+            episode  podcast * 10000 + 1 .. podcast * 10000 + episodes
+
+        touch() moves the updated_at of a record on, which is all that ever
+        changes, for tests of anything that looks for changes. """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, stations=400, podcasts=100, episodes=1000, base_url=""):
+        self.stations = stations
+        self.podcasts = podcasts
+        self.episodes = episodes
+        self.base_url = base_url   # For the image and audio urls in the records
+        self.updated  = {}         # id --> updated_at of the records touch()ed
+        self.ignore_page_number = False  # Answer every page with the first, without links.next
+
+    # -------------------------------------------------------------------------
+    def touch(self, record_id, updated_at="2019-05-01T00:00:00Z"):
+        self.updated[record_id] = updated_at
+
+    # -------------------------------------------------------------------------
+    def station(self, station_id):
+        attributes = {"id"                : station_id                         ,
+                      "callsign"          : "K%04d" % station_id               ,
+                      "name"              : "Synthetic Station %d" % station_id ,
+                      "station_stream"    : [{"type": "mp3", "url": "%s/stream/%d" % (self.base_url, station_id)}],
+                      "square_logo_small" : "%s/images/station/%d.png" % (self.base_url, station_id) ,
+                      "updated_at"        : self.updated.get(station_id, UPDATED_AT) }
+        for number in range(len(attributes), STATION_ATTRIBUTES):
+            attributes["attribute_%02d" % number] = "value %d of station %d" % (number, station_id)
+        return attributes
+
+    # -------------------------------------------------------------------------
+    def podcast(self, podcast_id):
+        return {"id"          : podcast_id                                        ,
+                "title"       : "Synthetic Podcast %d" % podcast_id               ,
+                "description" : "Podcast %d of station %d" % (podcast_id % 1000, podcast_id // 1000),
+                "image"       : "%s/images/podcast/%d.png" % (self.base_url, podcast_id) ,
+                "station_id"  : podcast_id // 1000                                ,
+                "updated_at"  : self.updated.get(podcast_id, UPDATED_AT)          }
+
+    # -------------------------------------------------------------------------
+    def episode(self, episode_id):
+        return {"id"               : episode_id                                   ,
+                "title"            : "Synthetic Episode %d" % (episode_id % 10000) ,
+                "published_date"   : "2019-%02d-%02d" % (episode_id % 12 + 1, episode_id % 28 + 1),
+                "duration_seconds" : 1800                                         ,
+                "audio_url"        : "%s/audio/%d.mp3" % (self.base_url, episode_id) ,
+                "podcast_id"       : episode_id // 10000                          ,
+                "updated_at"       : self.updated.get(episode_id, UPDATED_AT)     }
+
+    # -------------------------------------------------------------------------
+    def station_ids(self):
+        return range(1, self.stations + 1)
+
+    def podcast_ids(self, station_id):
+        if not 1 <= station_id <= self.stations:
+            return range(0)
+        return range(station_id * 1000 + 1, station_id * 1000 + self.podcasts + 1)
+
+    def episode_ids(self, podcast_id):
+        if not 1 <= podcast_id % 1000 <= self.podcasts or not 1 <= podcast_id // 1000 <= self.stations:
+            return range(0)
+        return range(podcast_id * 10000 + 1, podcast_id * 10000 + self.episodes + 1)
+
+
+# ----------------------------------------------------------------------------- _MockHandler
+class _MockHandler(BaseHTTPRequestHandler):
+    """ Answers the v1 and v2 calls api_utils makes, plus images, from the
+        SyntheticCatalog of the server """
+
+    protocol_version = "HTTP/1.1"   # Keep alive, like the real api
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_GET(self):
+        mock  = self.server.mock
+        parts = urlsplit(self.path)
+        query = {key: values[FIRST] for key, values in parse_qs(parts.query).items()}
+        path  = [part for part in parts.path.split("/") if part]
+        if mock.latency_ms:
+            time.sleep(mock.latency_ms / 1000.0)
+        try:
+            if path[:1] == ["images"]:
+                return self.send(200, mock.image, "image/png")
+            catalog = mock.catalog
+            if path[:2] == ["v1", "stations"] and len(path) == 3 and int(path[2]) in catalog.station_ids():
+                return self.send_json({"data": self.item("stations", catalog.station(int(path[2])))})
+            if path[:2] == ["v1", "podcasts"] and len(path) == 3 and int(path[2]) in catalog.podcast_ids(int(path[2]) // 1000):
+                return self.send_json({"data": self.item("podcasts", catalog.podcast(int(path[2])))})
+            if path == ["v1", "stations"]:
+                return self.send_page(parts.path, query, "stations", catalog.station_ids(), catalog.station)
+            if path == ["v1", "podcasts"]:
+                podcast_ids = catalog.podcast_ids(int(query["filter[station_id]"]))
+                return self.send_page(parts.path, query, "podcasts", podcast_ids, catalog.podcast)
+            if path == ["v1", "episodes"]:
+                episode_ids = catalog.episode_ids(int(query["filter[podcast_id]"]))
+                return self.send_page(parts.path, query, "episodes", episode_ids, catalog.episode)
+
+            # v2 hands back flat objects and lists in one go
+            if path[:2] == ["v2", "stations"] and len(path) == 3 and int(path[2]) in catalog.station_ids():
+                return self.send_json({"station": catalog.station(int(path[2]))})
+            if path[:2] == ["v2", "podcasts"] and len(path) == 3 and int(path[2]) in catalog.podcast_ids(int(path[2]) // 1000):
+                return self.send_json({"podcast": catalog.podcast(int(path[2]))})
+            if path == ["v2", "stations"]:
+                return self.send_json({"stations": [catalog.station(station_id) for station_id in catalog.station_ids()]})
+        except (KeyError, ValueError):
+            pass
+        self.send_json({"errors": [{"status": "404"}]}, 404)
+
+    def item(self, kind, record):
+        return {"id": record["id"], "type": kind, "attributes": record}
+
+    def send_page(self, path, query, kind, ids, make):
+        size   = int(query.get("page[size]", "100"))
+        number = int(query.get("page[number]", "1"))
+        if self.server.mock.catalog.ignore_page_number:
+            number = 1
+        page   = ids[(number - 1) * size:number * size]
+        body   = {"data": [self.item(kind, make(record_id)) for record_id in page], "links": {}}
+        if number * size < len(ids) and not self.server.mock.catalog.ignore_page_number:
+            body["links"]["next"] = path + "?" + urlencode(dict(query, **{"page[number]": number + 1}))
+        self.send_json(body)
+
+    def send_json(self, body, status=200):
+        self.send(status, json.dumps(body).encode("utf-8"), "application/json")
+
+    def send(self, status, body, content_type):
+        # Strong ETags off the body, so an unchanged answer to a
+        # conditional request is a 304 like the real api
+        etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            status, body = 304, b""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if status in (200, 304):
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+# ----------------------------------------------------------------------------- MockApi
+class MockApi(object):
+    """ A local stand-in for the api serving a SyntheticCatalog, for
+        benchmarks and tests that must not depend on the real hosts.
+        latency_ms is added to every answer. install() points api_client
+        at it. """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, stations=400, podcasts=100, episodes=1000, latency_ms=0, host="127.0.0.1", port=0):
+        self.latency_ms = latency_ms
+        self._server    = ThreadingHTTPServer((host, port), _MockHandler)
+        self._server.daemon_threads = True
+        self._server.mock = self
+        self.catalog    = SyntheticCatalog(stations, podcasts, episodes, self.base_url())
+        with open(os.path.join(RESOURCE_PATH, "play.png"), "rb") as f:
+            self.image = f.read()
+
+    # -------------------------------------------------------------------------
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return "http://%s:%d" % (host, port)
+
+    # -------------------------------------------------------------------------
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, name="mock_api", daemon=True).start()
+        return self
+
+    # -------------------------------------------------------------------------
+    def install(self, environments=(api_client.STAGING,)):
+        for environment in environments:
+            api_client.set_base_url(environment, self.base_url())
+        return self
+
+    # -------------------------------------------------------------------------
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# =============================================================================
+# Unit tests, because Jon asked and he is right
+def test_mock_api_pages():
+    import requests
+    mock = MockApi(stations=3, podcasts=2, episodes=250).start()
+    try:
+        first  = requests.get(mock.base_url() + "/v1/episodes?filter[podcast_id]=2001&page[size]=100").json()
+        last   = requests.get(mock.base_url() + "/v1/episodes?filter[podcast_id]=2001&page[size]=100&page[number]=3").json()
+        assert len(first["data"]) == 100 and first["links"]["next"].startswith("/v1/episodes?") and "page%5Bnumber%5D=2" in first["links"]["next"]
+        assert len(last["data"]) == 50 and "next" not in last["links"]
+        station = requests.get(mock.base_url() + "/v1/stations/2").json()["data"]["attributes"]
+        assert station["callsign"] == "K0002" and len(station) == STATION_ATTRIBUTES
+        assert requests.get(mock.base_url() + "/v1/podcasts/9999").status_code == 404
+        assert requests.get(mock.base_url() + "/v2/stations/2").json()["station"] == station
+        assert len(requests.get(mock.base_url() + "/v2/stations").json()["stations"]) == 3
+        etag = requests.get(mock.base_url() + "/v1/stations/2").headers["ETag"]
+        assert requests.get(mock.base_url() + "/v1/stations/2", headers={"If-None-Match": etag}).status_code == 304
+        mock.catalog.touch(2)
+        assert requests.get(mock.base_url() + "/v1/stations/2", headers={"If-None-Match": etag}).status_code == 200
+    finally:
+        mock.stop()
@@ -0,0 +1,328 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+import json
+import time
+from datetime import datetime, timezone
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+LIBRARY_PATH  = MY_PATH
+
+STATS_INTERVAL_MS = 1000   # How often the media statistics are read while playing
+
+# import third-party libraries
+try:
+    from PyQt5.QtCore import (QObject, QTimer, pyqtSignal, pyqtSlot)
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'PyQt5' library\n")
+    sys.stderr.write("         try: pip3 install pyqt5 --user\n")
+    sys.stderr.flush()
+    sys.exit(99)
+
+# import custom libraries
+sys.path.append(LIBRARY_PATH)
+try:
+    import media_players
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'media_players' library\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+# The player events we follow
+OPENING   = "opening"
+BUFFERING = "buffering"
+PLAYING   = "playing"
+PAUSED    = "paused"
+STOPPED   = "stopped"
+ENDED     = "ended"
+ERROR     = "error"
+
+
+# ----------------------------------------------------------------------------- _ms()
+def _ms(seconds):
+    return round(seconds * 1000.0, 1)
+
+
+# ----------------------------------------------------------------------------- PlaySession
+class PlaySession(object):
+    """ What happened between one press of play and the player stopping.
+        Audio is taken to have started once the player is playing and its
+        buffer is full. After that any drop of the buffer below 100% is a
+        stall until it fills again. Times are time.perf_counter() values. """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, player_name, url, now=None):
+        self.player_name   = player_name
+        self.url           = url
+        self.started       = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        self.start_time    = time.perf_counter() if now is None else now
+        self.opening_time  = None
+        self.playing_time  = None
+        self.audio_time    = None
+        self.end_time      = None
+        self.end_reason    = ""
+        self.buffer_full   = True
+        self.stall_start   = None
+        self.stalls        = []      # Duration of each stall in seconds
+        self.errors        = 0
+        self.input_kbps    = []      # One sample per stats read
+        self.lost_buffers  = 0
+        self.corrupted     = 0
+
+    # -------------------------------------------------------------------------
+    def opening(self, now):
+        if self.opening_time is None:
+            self.opening_time = now
+
+    # -------------------------------------------------------------------------
+    def buffering(self, cache, now):
+        """ cache is how full the buffer is, 0 to 100 """
+        if cache < 100.0:
+            self.buffer_full = False
+            if self.audio_time is not None and self.stall_start is None:
+                self.stall_start = now
+            return
+        self.buffer_full = True
+        if self.audio_time is None and self.playing_time is not None:
+            self.audio_time = now
+        if self.stall_start is not None:
+            self.stalls.append(now - self.stall_start)
+            self.stall_start = None
+
+    # -------------------------------------------------------------------------
+    def playing(self, now):
+        if self.playing_time is None:
+            self.playing_time = now
+        if self.audio_time is None and self.buffer_full:
+            self.audio_time = now
+
+    # -------------------------------------------------------------------------
+    def error(self, now):
+        self.errors += 1
+
+    # -------------------------------------------------------------------------
+    def stats(self, input_kbps, lost_buffers, corrupted):
+        """ Take a reading of the media statistics, the counts are totals """
+        if input_kbps > 0:
+            self.input_kbps.append(input_kbps)
+        self.lost_buffers = lost_buffers
+        self.corrupted    = corrupted
+
+    # -------------------------------------------------------------------------
+    def finish(self, now, reason):
+        if self.end_time is None:
+            if self.stall_start is not None:
+                self.stalls.append(now - self.stall_start)
+                self.stall_start = None
+            self.end_time   = now
+            self.end_reason = reason
+
+    # -------------------------------------------------------------------------
+    def to_dict(self):
+        """ The session as a flat dictionary, times in milliseconds """
+        end = self.end_time if self.end_time is not None else time.perf_counter()
+        return {"player"             : self.player_name ,
+                "url"                : self.url         ,
+                "started"            : self.started     ,
+                "time_to_open_ms"    : _ms(self.opening_time - self.start_time) if self.opening_time is not None else None,
+                "time_to_audio_ms"   : _ms(self.audio_time - self.start_time) if self.audio_time is not None else None,
+                "stalls"             : len(self.stalls) ,
+                "stall_ms"           : _ms(sum(self.stalls)) ,
+                "longest_stall_ms"   : _ms(max(self.stalls)) if self.stalls else 0.0,
+                "input_kbps_average" : round(sum(self.input_kbps) / len(self.input_kbps), 1) if self.input_kbps else None,
+                "input_kbps_lowest"  : round(min(self.input_kbps), 1) if self.input_kbps else None,
+                "lost_buffers"       : self.lost_buffers ,
+                "corrupted"          : self.corrupted    ,
+                "errors"             : self.errors       ,
+                "played_ms"          : _ms(end - self.audio_time) if self.audio_time is not None else 0.0,
+                "end_reason"         : self.end_reason   }
+
+
+# ----------------------------------------------------------------------------- PlaybackMonitor
+class PlaybackMonitor(QObject):
+    """ Follows the libvlc events of one vlc.MediaPlayer and keeps a
+        PlaySession for each time it is played. libvlc calls back on its
+        own threads, so the events are only stamped with the time there
+        and handed to the GUI thread with a signal, where the session is
+        updated. Media statistics are read once a second while playing.
+
+        session_finished(dict) is emitted as each session ends, with its
+        timings, and message(str) for anything worth a line in the Comm
+        Log while it plays. Finished sessions are kept in self.sessions. """
+
+    session_finished = pyqtSignal(dict)
+    message          = pyqtSignal(str)
+    _vlc_event       = pyqtSignal(str, float, float)
+
+    _EVENTS = ((OPENING,   "MediaPlayerOpening")          ,
+               (BUFFERING, "MediaPlayerBuffering")        ,
+               (PLAYING,   "MediaPlayerPlaying")          ,
+               (PAUSED,    "MediaPlayerPaused")           ,
+               (STOPPED,   "MediaPlayerStopped")          ,
+               (ENDED,     "MediaPlayerEndReached")       ,
+               (ERROR,     "MediaPlayerEncounteredError") )
+
+    # -------------------------------------------------------------------------
+    def __init__(self, player_name, parent=None):
+        super().__init__(parent)
+        self.player_name = player_name
+        self.player      = None
+        self.session     = None
+        self.sessions    = []
+        self._callbacks  = []   # (event type, callback) pairs to detach later
+        self._timer      = QTimer(self)
+        self._timer.setInterval(STATS_INTERVAL_MS)
+        self._timer.timeout.connect(self._read_stats)
+        self._vlc_event.connect(self._on_vlc_event)
+
+    # -------------------------------------------------------------------------
+    def attach(self, player):
+        """ Follow the events of player instead of the one before """
+        self.detach()
+        self.player = player
+        try:
+            vlc = media_players.import_vlc()
+            event_manager = player.event_manager()
+            for name, event_type in self._EVENTS:
+                callback = self._make_callback(name)
+                event_manager.event_attach(getattr(vlc.EventType, event_type), callback)
+                self._callbacks.append((getattr(vlc.EventType, event_type), callback))
+        except Exception as e:
+            sys.stderr.write("ERROR -- Unable to follow the %s player events\n" % self.player_name)
+            sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
+            sys.stderr.flush()
+
+    # -------------------------------------------------------------------------
+    def detach(self):
+        """ Stop following the player, ending any session in progress """
+        self.stop("detached")
+        if self.player is not None:
+            try:
+                event_manager = self.player.event_manager()
+                for event_type, callback in self._callbacks:
+                    event_manager.event_detach(event_type)
+            except Exception:
+                pass
+        self._callbacks = []
+        self.player     = None
+
+    # -------------------------------------------------------------------------
+    def _make_callback(self, name):
+        def callback(event, *args):
+            # On a libvlc thread, do nothing here but pass it on
+            value = 0.0
+            if name == BUFFERING:
+                value = float(event.u.new_cache)
+            self._vlc_event.emit(name, value, time.perf_counter())
+        return callback
+
+    # -------------------------------------------------------------------------
+    def start(self, url):
+        """ Call just before player.play() """
+        self.stop("replaced")
+        self.session = PlaySession(self.player_name, url)
+        self.message.emit("Playback (%s): play %s" % (self.player_name, url))
+        self._timer.start()
+
+    # -------------------------------------------------------------------------
+    def stop(self, reason="stopped"):
+        """ Call as the player is stopped, ends the current session """
+        if self.session is None:
+            return
+        self._read_stats()
+        self._timer.stop()
+        session, self.session = self.session, None
+        session.finish(time.perf_counter(), reason)
+        self.sessions.append(session)
+        self.session_finished.emit(session.to_dict())
+
+    # -------------------------------------------------------------------------
+    @pyqtSlot(str, float, float)
+    def _on_vlc_event(self, name, value, now):
+        session = self.session
+        if session is None:
+            return
+        had_audio = session.audio_time is not None
+        stalled   = session.stall_start is not None
+        if name == OPENING:
+            session.opening(now)
+        elif name == BUFFERING:
+            session.buffering(value, now)
+        elif name == PLAYING:
+            session.playing(now)
+        if session.audio_time is not None and not had_audio:
+            self.message.emit("Playback (%s): audio after %s ms"
+                              % (self.player_name, _ms(session.audio_time - session.start_time)))
+        if session.stall_start is not None and not stalled:
+            self.message.emit("Playback (%s): stalled, rebuffering" % self.player_name)
+
+        if name == ERROR:
+            session.error(now)
+            self.message.emit("Playback (%s): player reported an error" % self.player_name)
+            self.stop("error")
+        elif name == ENDED:
+            self.stop("ended")
+        elif name == STOPPED:
+            self.stop("stopped by the player")
+
+    # -------------------------------------------------------------------------
+    @pyqtSlot()
+    def _read_stats(self):
+        if self.session is None or self.player is None:
+            return
+        try:
+            media = self.player.get_media()
+            if media is None:
+                return
+            stats = media_players.import_vlc().MediaStats()
+            if media.get_stats(stats):
+                # libvlc reports the bitrate in bytes per microsecond
+                self.session.stats(stats.input_bitrate * 8000.0, stats.lost_abuffers, stats.demux_corrupted)
+            media.release()  # get_media() hands us a reference of our own
+        except Exception:
+            pass
+
+
+# ----------------------------------------------------------------------------- export_jsonl()
+def export_jsonl(file_name, sessions):
+    """ Append the sessions to file_name as JSON lines, oldest first.
+        Returns the number of sessions written. """
+    sessions = sorted(sessions, key=lambda session: session.started)
+    with open(file_name, "a") as f:
+        for session in sessions:
+            f.write(json.dumps(session.to_dict()) + "\n")
+    return len(sessions)
+
+
+# =============================================================================
+# Unit tests, because Jon asked and he is right
+def test_time_to_audio_waits_for_a_full_buffer():
+    session = PlaySession("episode", "http://localhost/a.mp3", now=0.0)
+    session.opening(0.1)
+    session.buffering(10.0, 0.2)
+    session.playing(0.3)
+    assert session.audio_time is None
+    session.buffering(100.0, 0.5)
+    assert session.to_dict()["time_to_audio_ms"] == 500.0
+
+def test_stalls_are_counted_after_audio_starts():
+    session = PlaySession("station", "http://localhost/stream", now=0.0)
+    session.playing(0.1)
+    session.buffering(50.0, 1.0)
+    session.buffering(100.0, 1.5)
+    session.buffering(20.0, 2.0)
+    session.stats(128.0, 3, 0)
+    session.finish(3.0, "stopped")
+    d = session.to_dict()
+    assert d["time_to_audio_ms"] == 100.0 and d["stalls"] == 2
+    assert d["stall_ms"] == 1500.0 and d["longest_stall_ms"] == 1000.0
+    assert d["lost_buffers"] == 3 and d["input_kbps_average"] == 128.0
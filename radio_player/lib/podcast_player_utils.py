@@ -2,6 +2,8 @@
 
 import sys
 import os
+import time
+import threading
 
 # Some useful variables
 VERSION    = "1.0.0"
@@ -10,16 +12,22 @@ LAST       = -1
 ME         = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
 MY_PATH    = os.path.dirname(os.path.realpath(__file__))  # Path for this file
 CACHE_PATH = os.path.join("/tmp")
+CONFIG_FILE = os.path.join(MY_PATH, "../config/podcast_player.conf")
 
 
-# Third-part library imports
-try:       
-   import requests
+# Custom library imports
+sys.path.append(MY_PATH)
+try:
+    import image_cache
 except ModuleNotFoundError:
-   sys.stderr.wite("ERROR -- Unable to import the 'vlc' library\n")
-   sys.stderr.wite("         try: pip3 install requests --user\n")
-   sys.stderr.flush()
-   sys.exit(99)
+    sys.stderr.write("ERROR -- Unable to import the 'image_cache' library\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+# The shared image cache, created on first use
+_image_cache      = None
+_image_cache_lock = threading.Lock()
    
 # -----------------------------------------------------------------------------   
 def config_2_dictionary(config_file_name):
@@ -53,23 +61,30 @@ def config_2_dictionary(config_file_name):
         return configurations     
 
     
+def get_image_cache():
+    """ Return the shared image cache, creating it from the settings in
+        the configuration file on first use. """
+    global _image_cache
+    with _image_cache_lock:
+        if _image_cache is None:
+            configs    = config_2_dictionary(CONFIG_FILE)
+            cache_path = os.path.join(configs.get("cache_path", os.path.join(CACHE_PATH, "podcast_player")), "images")
+            max_bytes  = int(configs.get("image_cache_mb", "256")) * 1024 * 1024
+            revalidate = int(configs.get("image_revalidate_seconds", "86400"))
+            _image_cache = image_cache.ImageCache(cache_path, max_bytes, revalidate)
+        return _image_cache
+
+
 def download_station_logo(url):
     """ Using the url provided, downlod the station logo image to the cache folder.
         If successful rhetun the name of hte downloaded file. If anything goes 
-        wrong and empty string will be returned. """
+        wrong and empty string will be returned. Images are kept in a content
+        addressed cache so a logo is only downloaded again when it changes. """
         
     downloaded_file_name = ""
     
     try:
-        downloaded_file_name = os.path.join(CACHE_PATH, url.split("/")[LAST] ) 
-        response = "NO DATA" 
-        response = requests.get(url)
-        if response == "NO DATA":
-           raise ValueError("No data from %s" %url)
-        else:   
-            if response.status_code == 200:
-                with open(downloaded_file_name, 'wb') as f:
-                    f.write(response.content)
+        downloaded_file_name = get_image_cache().fetch(url)
         if os.path.isfile(downloaded_file_name):
             pass
         else:
@@ -86,7 +101,23 @@ def download_station_logo(url):
     
     
     
-        
+
+def report_cold_start(start_time, budget_ms, log=None):
+    """ Work out how long it has been since start_time, a time.perf_counter()
+        value taken as the program started, and hand a line saying so to
+        log, e.g. the Comm Log. Going over budget_ms is also written to
+        stderr so it shows up wherever the program was started from.
+        Returns the cold start time in milliseconds. """
+    elapsed_ms = (time.perf_counter() - start_time) * 1000.0
+    line = "Cold start: %.0f ms to the first paint (budget %.0f ms)" % (elapsed_ms, budget_ms)
+    if elapsed_ms > budget_ms:
+        sys.stderr.write("WARNING -- %s\n" % line)
+        sys.stderr.flush()
+    if log is not None:
+        log(line + "\n----------------\n")
+    return elapsed_ms
+
+
 # =============================================================================    
 # Unit tests, because Jon asked and he is right    
 def test_bad_config_file_name():
@@ -97,3 +128,8 @@ def test_known_good_file():
     
 def test_background_color():
    assert config_2_dictionary(     os.path.join(MY_PATH, "../config/podcast_player.conf")   )["bg_color"] == "1F055E"
+
+def test_cold_start_over_budget(capsys):
+   lines = []
+   assert report_cold_start(time.perf_counter() - 2.0, 1000, lines.append) >= 2000
+   assert lines[FIRST].startswith("Cold start: ") and "WARNING" in capsys.readouterr().err
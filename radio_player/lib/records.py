@@ -0,0 +1,174 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+from collections.abc import Mapping
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+CONFIG_PATH   = os.path.join(MY_PATH, "../config")
+CONFIG_FILE   = os.path.join(CONFIG_PATH, "podcast_player.conf")
+LIBRARY_PATH  = MY_PATH
+
+# import custom libraries
+sys.path.append(LIBRARY_PATH)
+try:
+    import podcast_player_utils
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'podcast_player_utils' library\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+CONFIGS = podcast_player_utils.config_2_dictionary(CONFIG_FILE)
+
+
+# ----------------------------------------------------------------------------- config_fields()
+def config_fields(key):
+    """ Return the tuple of field names listed (comma separated) for key in
+        the config file, or None to keep every field the api sends """
+    fields = tuple(field.strip() for field in CONFIGS.get(key, "").split(",") if field.strip())
+    if fields and "id" not in fields:
+        fields = ("id",) + fields
+    return fields or None
+
+
+# ----------------------------------------------------------------------------- Schema
+class Schema(object):
+    """ The field names of a kind of record, in order, and where each one is
+        in the value tuple. Every record with the same fields shares one
+        Schema so a record only costs its tuple of values. """
+
+    __slots__ = ("fields", "index")
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.index  = {field: position for position, field in enumerate(fields)}
+
+
+_schemas = {}  # tuple of field names --> Schema
+
+
+# ----------------------------------------------------------------------------- schema_for()
+def schema_for(fields):
+    """ Return the shared Schema for a tuple of field names """
+    schema = _schemas.get(fields)
+    if schema is None:
+        schema = _schemas.setdefault(fields, Schema(fields))
+    return schema
+
+
+# ----------------------------------------------------------------------------- Record
+class Record(Mapping):
+    """ A read only api record: a shared Schema and a tuple of values. It
+        behaves like the dictionary it was built from, so record["title"],
+        record.get("image", ""), keys(), values() and items() all work, at a
+        fraction of the memory of a dict per item. """
+
+    __slots__ = ("_schema", "_values")
+    fields    = None   # The fields kept by from_items(), None for all of them
+
+    # -------------------------------------------------------------------------
+    def __init__(self, schema, values):
+        self._schema = schema
+        self._values = values
+
+    # -------------------------------------------------------------------------
+    @classmethod
+    def from_dict(cls, attributes, fields=None):
+        """ Build a record from a dictionary of attributes. With fields only
+            those fields are kept, in that order, missing ones are None. """
+        if fields is None:
+            return cls(schema_for(tuple(attributes)), tuple(attributes.values()))
+        return cls(schema_for(fields), tuple(attributes.get(field) for field in fields))
+
+    # -------------------------------------------------------------------------
+    def __getitem__(self, key):
+        return self._values[self._schema.index[key]]
+
+    def get(self, key, default=None):
+        position = self._schema.index.get(key)
+        return default if position is None else self._values[position]
+
+    def __contains__(self, key):
+        return key in self._schema.index
+
+    def __iter__(self):
+        return iter(self._schema.fields)
+
+    def __len__(self):
+        return len(self._values)
+
+    def keys(self):
+        return self._schema.fields
+
+    def values(self):
+        return self._values
+
+    def items(self):
+        return zip(self._schema.fields, self._values)
+
+    # -------------------------------------------------------------------------
+    def to_dict(self):
+        """ A plain dictionary copy, e.g. for json.dumps() """
+        return dict(zip(self._schema.fields, self._values))
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, self.to_dict())
+
+
+class Station(Record):
+    __slots__ = ()
+    fields    = config_fields("station_fields")
+
+class Podcast(Record):
+    __slots__ = ()
+    fields    = config_fields("podcast_fields")
+
+class Episode(Record):
+    __slots__ = ()
+    fields    = config_fields("episode_fields")
+
+
+# ----------------------------------------------------------------------------- from_items()
+def from_items(cls, items, unwrap=False):
+    """ Generator of records of class cls built straight from the parsed
+        items of an api response. unwrap is for JSON:API items whose fields
+        are under "attributes", the item id is then added if the attributes
+        do not have one. Items with the same fields share one schema. """
+    fields = cls.fields
+    for item in items:
+        attributes = item
+        if unwrap:
+            attributes = item.get("attributes") or {}
+            if "id" not in attributes:
+                attributes = dict(attributes, id=item["id"])
+        yield cls.from_dict(attributes, fields)
+
+
+# =============================================================================
+# Unit tests, because Jon asked and he is right
+def test_record_behaves_like_a_dict():
+    podcast = Podcast.from_dict({"id": 7, "title": "Pod", "image": ""})
+    assert podcast["title"] == "Pod" and podcast.get("missing", "x") == "x"
+    assert "image" in podcast and list(podcast) == ["id", "title", "image"]
+    assert dict(podcast) == {"id": 7, "title": "Pod", "image": ""}
+    assert not hasattr(podcast, "__dict__")
+
+def test_items_share_a_schema(monkeypatch):
+    monkeypatch.setattr(Episode, "fields", None)  # Keep every field, whatever the config file says
+    items = [{"id": 1, "type": "episodes", "attributes": {"title": "a"}},
+             {"id": 2, "type": "episodes", "attributes": {"title": "b"}}]
+    first, second = from_items(Episode, items, unwrap=True)
+    assert first._schema is second._schema
+    assert second.to_dict() == {"title": "b", "id": 2}
+
+def test_fields_are_projected():
+    station = Station.from_dict({"id": 3, "callsign": "WXYZ", "unused": 1}, fields=("id", "callsign", "name"))
+    assert station.to_dict() == {"id": 3, "callsign": "WXYZ", "name": None}
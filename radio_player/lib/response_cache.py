@@ -0,0 +1,243 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+CACHE_PATH    = os.path.join("/tmp", "podcast_player", "api")
+
+# Endpoint names used for the time-to-live table
+STATION_LIST  = "stations"
+STATION       = "station"
+PODCASTS      = "podcasts"
+EPISODES      = "episodes"
+OTHER         = "other"
+
+# Default time-to-live in seconds for each endpoint
+DEFAULT_TTLS  = {STATION_LIST : 3600 ,
+                 STATION      : 600  ,
+                 PODCASTS     : 600  ,
+                 EPISODES     : 300  ,
+                 OTHER        : 60   }
+
+
+# ----------------------------------------------------------------------------- endpoint_of()
+def endpoint_of(url):
+    """ Given an api url return a tuple of (api_version, endpoint name)
+        e.g. http://api.radio.com/v1/stations/3 --> ("v1", "station") """
+    parts = [part for part in urlsplit(url).path.split("/") if part]
+    if len(parts) < 2:
+        return ("", OTHER)
+    api_version = parts[FIRST]
+    resource    = parts[1]
+    if resource == "stations":
+        endpoint = STATION if len(parts) > 2 else STATION_LIST
+    elif resource == "podcasts":
+        endpoint = PODCASTS
+    elif resource == "episodes":
+        endpoint = EPISODES
+    else:
+        endpoint = OTHER
+    return (api_version, endpoint)
+
+
+# ----------------------------------------------------------------------------- cache_key()
+def cache_key(environment, url):
+    """ Cache entries are keyed by environment, api version and url """
+    api_version = endpoint_of(url)[FIRST]
+    return "%s|%s|%s" % (environment, api_version, url)
+
+
+# ----------------------------------------------------------------------------- CacheEntry
+class CacheEntry(object):
+    """ One cached response body along with the validators needed to
+        revalidate it with a conditional request. """
+
+    __slots__ = ("url", "body", "content_type", "etag", "last_modified", "fetched_at")
+
+    # -------------------------------------------------------------------------
+    def __init__(self, url, body, content_type="", etag="", last_modified="", fetched_at=None):
+        self.url           = url
+        self.body          = body
+        self.content_type  = content_type
+        self.etag          = etag
+        self.last_modified = last_modified
+        self.fetched_at    = time.time() if fetched_at is None else fetched_at
+
+    # -------------------------------------------------------------------------
+    def age(self):
+        return time.time() - self.fetched_at
+
+    # -------------------------------------------------------------------------
+    def conditional_headers(self):
+        """ Return the If-None-Match / If-Modified-Since headers for this entry """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    # -------------------------------------------------------------------------
+    def to_bytes(self):
+        """ Serialize as one line of JSON metadata followed by the raw body """
+        meta = {"url"           : self.url           ,
+                "content_type"  : self.content_type  ,
+                "etag"          : self.etag          ,
+                "last_modified" : self.last_modified ,
+                "fetched_at"    : self.fetched_at    }
+        return json.dumps(meta).encode("utf-8") + b"\n" + self.body
+
+    # -------------------------------------------------------------------------
+    @classmethod
+    def from_bytes(cls, data):
+        meta, body = data.split(b"\n", 1)
+        meta = json.loads(meta)
+        return cls(meta["url"], body, meta["content_type"], meta["etag"],
+                   meta["last_modified"], meta["fetched_at"])
+
+
+# ----------------------------------------------------------------------------- ResponseCache
+class ResponseCache(object):
+    """ Two tier cache of api response bodies. The first tier is an in-memory
+        LRU bounded by the total size of the cached bodies, the second is a
+        directory of files, one per key, that survives between runs. Entries
+        older than the time-to-live of their endpoint are stale and should be
+        revalidated with a conditional request. """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, cache_path=CACHE_PATH, max_memory_bytes=32 * 1024 * 1024, ttls=None):
+        self.cache_path       = cache_path
+        self.max_memory_bytes = max_memory_bytes
+        self.ttls             = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.memory_bytes     = 0
+        self._memory          = OrderedDict()
+        self._lock            = threading.Lock()
+        try:
+            if self.cache_path:
+                os.makedirs(self.cache_path, exist_ok=True)
+        except OSError as e:
+            sys.stderr.write("ERROR -- Unable to create the api cache folder %s\n" % self.cache_path)
+            sys.stderr.write("%s\n" % str(e))
+            sys.stderr.flush()
+            self.cache_path = ""  # Memory only
+
+    # -------------------------------------------------------------------------
+    def _file_name(self, key):
+        return os.path.join(self.cache_path, hashlib.sha256(key.encode("utf-8")).hexdigest())
+
+    # -------------------------------------------------------------------------
+    def _remember(self, key, entry):
+        """ Put an entry at the front of the memory LRU and evict from the back
+            until we are within the memory bound. Caller holds the lock. """
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self.memory_bytes -= len(old.body)
+        self._memory[key] = entry
+        self.memory_bytes += len(entry.body)
+        while self.memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            evicted_key, evicted = self._memory.popitem(last=False)
+            self.memory_bytes -= len(evicted.body)
+
+    # -------------------------------------------------------------------------
+    def is_fresh(self, entry):
+        """ True if the entry is younger than the time-to-live of its endpoint """
+        return entry.age() < self.ttls.get(endpoint_of(entry.url)[LAST], self.ttls[OTHER])
+
+    # -------------------------------------------------------------------------
+    def lookup(self, key):
+        """ Return the CacheEntry for a key or None. Disk hits are promoted
+            into the memory tier. """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+
+        if not self.cache_path:
+            return None
+        try:
+            with open(self._file_name(key), "rb") as f:
+                entry = CacheEntry.from_bytes(f.read())
+        except (OSError, ValueError, KeyError):
+            return None
+
+        with self._lock:
+            self._remember(key, entry)
+        return entry
+
+    # -------------------------------------------------------------------------
+    def store(self, key, entry):
+        """ Save an entry in both tiers. The file is written to a temporary
+            name and renamed so that readers never see a partial entry. """
+        with self._lock:
+            self._remember(key, entry)
+
+        if not self.cache_path:
+            return
+        try:
+            fd, temp_name = tempfile.mkstemp(dir=self.cache_path, prefix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(entry.to_bytes())
+            os.replace(temp_name, self._file_name(key))
+        except OSError as e:
+            sys.stderr.write("ERROR -- Unable to write api cache entry for %s\n" % entry.url)
+            sys.stderr.write("%s\n" % str(e))
+            sys.stderr.flush()
+
+    # -------------------------------------------------------------------------
+    def revalidated(self, key, entry):
+        """ The server answered 304 Not Modified, restart the entry's clock """
+        entry.fetched_at = time.time()
+        self.store(key, entry)
+
+    # -------------------------------------------------------------------------
+    def clear(self):
+        """ Empty both tiers """
+        with self._lock:
+            self._memory.clear()
+            self.memory_bytes = 0
+        if self.cache_path:
+            for file_name in os.listdir(self.cache_path):
+                try:
+                    os.remove(os.path.join(self.cache_path, file_name))
+                except OSError:
+                    pass
+
+
+# =============================================================================
+# Unit tests, because Jon asked and he is right
+def test_endpoint_of():
+    assert endpoint_of("http://api.radio.com/v1/stations?page[size]=400") == ("v1", STATION_LIST)
+    assert endpoint_of("http://api.radio.com/v2/stations/3") == ("v2", STATION)
+    assert endpoint_of("http://api.radio.com/v1/episodes?filter[podcast_id]=1") == ("v1", EPISODES)
+
+def test_store_and_lookup_from_disk():
+    cache_path = tempfile.mkdtemp()
+    key = cache_key("staging", "http://localhost/v1/stations/3")
+    ResponseCache(cache_path).store(key, CacheEntry("http://localhost/v1/stations/3", b'{"a": 1}', etag='"x"'))
+    entry = ResponseCache(cache_path).lookup(key)
+    assert entry.body == b'{"a": 1}'
+    assert entry.conditional_headers() == {"If-None-Match": '"x"'}
+
+def test_memory_bound():
+    cache = ResponseCache("", max_memory_bytes=10)
+    cache.store("a", CacheEntry("http://localhost/v1/stations/1", b"123456"))
+    cache.store("b", CacheEntry("http://localhost/v1/stations/2", b"123456"))
+    assert cache.lookup("a") is None
+    assert cache.lookup("b").body == b"123456"
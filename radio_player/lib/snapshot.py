@@ -0,0 +1,309 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+import gzip
+import json
+import time
+import base64
+import socket
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+CONFIG_PATH   = os.path.join(MY_PATH, "../config")
+CONFIG_FILE   = os.path.join(CONFIG_PATH, "podcast_player.conf")
+LIBRARY_PATH  = MY_PATH
+
+# import custom libraries
+sys.path.append(LIBRARY_PATH)
+try:
+    import podcast_player_utils
+    import api_client
+    import image_cache
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'podcast_player_utils', 'api_client' and 'image_cache' libraries\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+CONFIGS = podcast_player_utils.config_2_dictionary(CONFIG_FILE)
+
+
+# ----------------------------------------------------------------------------- Snapshot
+class Snapshot(object):
+    """ Recorded api responses keyed by environment and the url of the call
+        without the host, e.g. ("staging", "/v1/stations/3"). Saved as gzip
+        compressed JSON lines, one response per line, so a snapshot of a
+        whole sweep is a few megabytes and easy to look inside with zcat. """
+
+    # -------------------------------------------------------------------------
+    def __init__(self):
+        self.entries = {}
+        self._lock   = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    def add(self, environment, url, status, body, content_type="", etag="", elapsed_ms=0.0):
+        """ Keep one response, a later response for the same call wins """
+        with self._lock:
+            self.entries[(environment, url)] = {"environment"  : environment ,
+                                                "url"          : url         ,
+                                                "status"       : status      ,
+                                                "content_type" : content_type,
+                                                "etag"         : etag        ,
+                                                "elapsed_ms"   : round(elapsed_ms, 3),
+                                                "body"         : body        }
+
+    # -------------------------------------------------------------------------
+    def lookup(self, environment, url):
+        return self.entries.get((environment, url))
+
+    # -------------------------------------------------------------------------
+    def environments(self):
+        return sorted(set(environment for environment, url in self.entries))
+
+    # -------------------------------------------------------------------------
+    def __len__(self):
+        return len(self.entries)
+
+    # -------------------------------------------------------------------------
+    def save(self, file_name):
+        """ Write the snapshot to file_name, replacing what was there """
+        lines = []
+        with self._lock:
+            entries = sorted(self.entries.values(), key=lambda entry: (entry["environment"], entry["url"]))
+        for entry in entries:
+            line = dict(entry)
+            try:
+                line["body"] = entry["body"].decode("utf-8")
+            except UnicodeDecodeError:
+                line["body"]   = base64.b64encode(entry["body"]).decode("ascii")
+                line["base64"] = True
+            lines.append(json.dumps(line))
+        folder = os.path.dirname(os.path.abspath(file_name))
+        os.makedirs(folder, exist_ok=True)
+        image_cache.atomic_write(file_name, gzip.compress(("\n".join(lines) + "\n").encode("utf-8")))
+
+    # -------------------------------------------------------------------------
+    @classmethod
+    def load(cls, file_name):
+        """ Read a snapshot saved by save(). Raises OSError or ValueError if
+            the file is missing or is not a snapshot. """
+        snapshot = cls()
+        with gzip.open(file_name, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                body  = entry.pop("body")
+                body  = base64.b64decode(body) if entry.pop("base64", False) else body.encode("utf-8")
+                snapshot.add(body=body, **entry)
+        return snapshot
+
+
+# ----------------------------------------------------------------------------- Recorder
+class Recorder(object):
+    """ Records every api call made through api_client into a Snapshot, as
+        an api_client listener. Only real round trips, and how long they
+        took, end up in the snapshot, so the response cache should be
+        turned off while recording or its hits are missing. A 304 is only
+        kept if there is no full answer for the call, the replay then
+        answers the same conditional request with a 304 too. stop()
+        writes the snapshot to snapshot_file. """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, snapshot_file, snapshot=None):
+        self.snapshot_file = snapshot_file
+        self.snapshot      = snapshot if snapshot is not None else Snapshot()
+
+    # -------------------------------------------------------------------------
+    def start(self):
+        api_client.add_listener(self._heard)
+        return self
+
+    # -------------------------------------------------------------------------
+    def _heard(self, client, r):
+        if getattr(r, "from_cache", False) or not r.url.startswith(client.base_url):
+            return
+        url = r.url[len(client.base_url):]
+        if r.status_code == 304 and self.snapshot.lookup(client.environment, url) is not None:
+            return
+        self.snapshot.add(client.environment, url, r.status_code, r.content,
+                          r.headers.get("Content-Type", ""), r.headers.get("ETag", ""),
+                          getattr(r, "elapsed_ms", 0.0))
+
+    # -------------------------------------------------------------------------
+    def stop(self):
+        """ Stop recording and save, returns the number of responses saved """
+        api_client.remove_listener(self._heard)
+        self.snapshot.save(self.snapshot_file)
+        return len(self.snapshot)
+
+
+# ----------------------------------------------------------------------------- _ReplayHandler
+class _ReplayHandler(BaseHTTPRequestHandler):
+    """ Answers /<environment>/<url> from the snapshot of the server """
+
+    protocol_version = "HTTP/1.1"   # Keep alive, like the real api
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes, without this a kept
+        # alive connection waits on delayed ACKs between them
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_GET(self):
+        server = self.server.replay
+        environment, _, url = self.path.lstrip("/").partition("/")
+        entry = server.snapshot.lookup(environment, "/" + url)
+        server.count(entry is not None)
+        if entry is None:
+            body = json.dumps({"errors": [{"status": "404", "title": "Not in the snapshot"}]}).encode("utf-8")
+            self.send_response(404)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if server.latency_scale > 0:
+            time.sleep(entry["elapsed_ms"] * server.latency_scale / 1000.0)
+        if entry["etag"] and self.headers.get("If-None-Match") == entry["etag"]:
+            self.send_response(304)
+            self.send_header("ETag", entry["etag"])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(entry["status"])
+        if entry["content_type"]: self.send_header("Content-Type", entry["content_type"])
+        if entry["etag"]:         self.send_header("ETag",         entry["etag"])
+        self.send_header("Content-Length", str(len(entry["body"])))
+        self.end_headers()
+        self.wfile.write(entry["body"])
+
+    def log_message(self, *args):
+        pass
+
+
+# ----------------------------------------------------------------------------- ReplayServer
+class ReplayServer(object):
+    """ A local stand-in for the api that serves a Snapshot back. With a
+        latency_scale of 0 every answer is immediate, 1.0 waits as long as
+        the recorded call took, 0.5 half as long and so on. install() points
+        api_client at it so the GUI, the sweep and the tests run the same
+        calls as they would against the real hosts. Calls that are not in
+        the snapshot get a 404 and are counted in misses. """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, snapshot, latency_scale=0.0, host="127.0.0.1", port=0):
+        self.snapshot      = snapshot
+        self.latency_scale = latency_scale
+        self.hits          = 0
+        self.misses        = 0
+        self._lock         = threading.Lock()
+        self._server       = ThreadingHTTPServer((host, port), _ReplayHandler)
+        self._server.daemon_threads = True
+        self._server.replay = self
+
+    # -------------------------------------------------------------------------
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, name="snapshot_replay", daemon=True).start()
+        return self
+
+    # -------------------------------------------------------------------------
+    def base_url(self, environment):
+        host, port = self._server.server_address[:2]
+        return "http://%s:%d/%s" % (host, port, environment)
+
+    # -------------------------------------------------------------------------
+    def install(self, environments=None):
+        """ Send the api calls for every environment in the snapshot, or
+            just those given, to this server """
+        for environment in environments or self.snapshot.environments():
+            api_client.set_base_url(environment, self.base_url(environment))
+        return self
+
+    # -------------------------------------------------------------------------
+    def count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    # -------------------------------------------------------------------------
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# ----------------------------------------------------------------------------- start_from_config()
+def start_from_config(configs=CONFIGS):
+    """ Start recording or replaying as the config file says, see the
+        snapshot_ settings in podcast_player.conf. Returns the Recorder or
+        ReplayServer, which has a stop(), or None if neither is asked for.
+        The response cache is turned off for either, a recording has to
+        see every call and the replay server's port is new every run so
+        its answers would only fill the cache. """
+    if configs.get("snapshot_replay") or configs.get("snapshot_record"):
+        api_client.CACHE_ENABLED = False
+    try:
+        if configs.get("snapshot_replay"):
+            snapshot = Snapshot.load(configs["snapshot_replay"])
+            return ReplayServer(snapshot, float(configs.get("snapshot_latency", "0"))).start().install()
+        if configs.get("snapshot_record"):
+            return Recorder(configs["snapshot_record"]).start()
+    except Exception as e:
+        sys.stderr.write("ERROR -- Unable to start the api snapshot\n")
+        sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
+        sys.stderr.flush()
+    return None
+
+
+# =============================================================================
+# Unit tests, because Jon asked and he is right
+def test_snapshot_round_trip(tmp_path):
+    snapshot = Snapshot()
+    snapshot.add("staging", "/v1/stations/3", 200, b'{"data": {"id": 3}}', "application/json", '"e1"', 12.5)
+    snapshot.add("staging", "/img/logo.png", 200, b"\x89PNG\xff", "image/png")
+    snapshot.save(str(tmp_path / "snap.jsonl.gz"))
+    loaded = Snapshot.load(str(tmp_path / "snap.jsonl.gz"))
+    assert loaded.entries == snapshot.entries and loaded.environments() == ["staging"]
+
+def test_record_and_replay():
+    snapshot = Snapshot()
+    snapshot.add("staging", "/v1/stations/3", 200, b'{"data": {"id": 3}}', "application/json", '"e1"', 5.0)
+    server = ReplayServer(snapshot).start()
+    try:
+        client = api_client.ApiClient(api_client.STAGING, base_url=server.base_url("staging"))
+        recorder = Recorder("unused", Snapshot()).start()
+        try:
+            first   = client.get(client.api_url("v1", "stations/3"))
+            missing = client.get(client.api_url("v1", "stations/4"))
+            again   = client.get(client.api_url("v1", "stations/3"), headers={"If-None-Match": '"e1"'})
+        finally:
+            api_client.remove_listener(recorder._heard)
+        assert first.status_code == 200 and first.content == b'{"data": {"id": 3}}'
+        assert missing.status_code == 404 and (server.hits, server.misses) == (2, 1)
+        assert again.status_code == 304  # and the full answer is kept
+        assert recorder.snapshot.lookup("staging", "/v1/stations/3")["body"] == first.content
+        client.close()
+    finally:
+        server.stop()
+
+def test_recording_turns_the_cache_off(tmp_path):
+    cache_enabled = api_client.CACHE_ENABLED
+    try:
+        api_client.CACHE_ENABLED = True
+        recorder = start_from_config({"snapshot_record": str(tmp_path / "snap.jsonl.gz")})
+        api_client.remove_listener(recorder._heard)
+        assert not api_client.CACHE_ENABLED and api_client.get_response_cache() is None
+    finally:
+        api_client.CACHE_ENABLED = cache_enabled
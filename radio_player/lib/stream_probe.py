@@ -0,0 +1,274 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+import ssl
+import time
+import socket
+import statistics
+from urllib.parse import urlsplit, urljoin
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+CONFIG_PATH   = os.path.join(MY_PATH, "../config")
+CONFIG_FILE   = os.path.join(CONFIG_PATH, "podcast_player.conf")
+LIBRARY_PATH  = MY_PATH
+
+# import custom libraries
+sys.path.append(LIBRARY_PATH)
+try:
+    import podcast_player_utils
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'podcast_player_utils' library\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+CONFIGS        = podcast_player_utils.config_2_dictionary(CONFIG_FILE)
+PROBE_BYTES    = int(CONFIGS.get("probe_kb", "64")) * 1024
+PROBE_TIMEOUT  = float(CONFIGS.get("probe_timeout", "10"))
+PROBE_WORKERS  = int(CONFIGS.get("probe_workers", "16"))
+MAX_REDIRECTS  = 5
+MAX_HEADER     = 64 * 1024
+USER_AGENT     = "podcast_player-stream_probe/%s" % VERSION
+
+# The kinds of url we probe
+STATION_STREAM = "station_stream"
+EPISODE_AUDIO  = "episode_audio"
+
+
+# ----------------------------------------------------------------------------- _ms()
+def _ms(seconds):
+    return round(seconds * 1000.0, 3)
+
+
+# ----------------------------------------------------------------------------- probe_url()
+def probe_url(url, max_bytes=PROBE_BYTES, timeout=PROBE_TIMEOUT):
+    """ Open a stream or audio url, read the first max_bytes of the body
+        and return a dictionary of how long each step took:
+
+            dns_ms, connect_ms, tls_ms  -- for the last hop
+            ttfb_ms                     -- request sent to first response byte
+            startup_ms                  -- probe start to first body byte,
+                                           redirects included
+            kbps                        -- sustained rate of the body read
+
+        Redirects are followed and Shoutcast "ICY 200 OK" replies are
+        accepted. Nothing is decoded, bytes are only counted. Never raises,
+        ok is False and error says why if the probe failed. """
+    result = {"url"          : url   ,
+              "final_url"    : url   ,
+              "ok"           : False ,
+              "status"       : 0     ,
+              "content_type" : ""    ,
+              "redirects"    : 0     ,
+              "dns_ms"       : None  ,
+              "connect_ms"   : None  ,
+              "tls_ms"       : None  ,
+              "ttfb_ms"      : None  ,
+              "startup_ms"   : None  ,
+              "bytes"        : 0     ,
+              "read_ms"      : None  ,
+              "kbps"         : None  ,
+              "error"        : ""    }
+    start = time.perf_counter()
+    sock  = None
+    try:
+        for hop in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            if parts.scheme not in ("http", "https"):
+                raise ValueError("Can not probe a %s url" % (parts.scheme or "relative"))
+            port = parts.port or (443 if parts.scheme == "https" else 80)
+            path = parts.path or "/"
+            if parts.query:
+                path += "?" + parts.query
+
+            t0 = time.perf_counter()
+            family, kind, proto, _, address = socket.getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM)[FIRST]
+            t1 = time.perf_counter()
+            sock = socket.socket(family, kind, proto)
+            sock.settimeout(timeout)
+            sock.connect(address)
+            t2 = time.perf_counter()
+            if parts.scheme == "https":
+                sock = ssl.create_default_context().wrap_socket(sock, server_hostname=parts.hostname)
+            t3 = time.perf_counter()
+            result.update(dns_ms=_ms(t1 - t0), connect_ms=_ms(t2 - t1),
+                          tls_ms=_ms(t3 - t2) if parts.scheme == "https" else None)
+
+            host = parts.hostname if parts.port is None else "%s:%d" % (parts.hostname, parts.port)
+            sock.sendall(("GET %s HTTP/1.1\r\nHost: %s\r\nUser-Agent: %s\r\n"
+                          "Accept: */*\r\nIcy-MetaData: 0\r\nConnection: close\r\n\r\n"
+                          % (path, host, USER_AGENT)).encode("latin-1"))
+
+            # Read up to the end of the headers
+            data = sock.recv(16384)
+            result["ttfb_ms"] = _ms(time.perf_counter() - t3)
+            while b"\r\n\r\n" not in data:
+                if not data or len(data) > MAX_HEADER:
+                    raise ValueError("No response headers from %s" % url)
+                more = sock.recv(16384)
+                if not more:
+                    raise ValueError("Connection closed in the response headers from %s" % url)
+                data += more
+            header, body = data.split(b"\r\n\r\n", 1)
+            lines   = header.decode("latin-1").split("\r\n")
+            status  = int(lines[FIRST].split()[1])
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            result.update(status=status, final_url=url, redirects=hop,
+                          content_type=headers.get("content-type", ""))
+
+            if status in (301, 302, 303, 307, 308) and "location" in headers:
+                sock.close()
+                sock = None
+                url  = urljoin(url, headers["location"])
+                continue
+            if status != 200:
+                raise ValueError("Bad Response (%d) from %s" % (status, url))
+
+            # Count the body until we have enough. The clock for the rate
+            # starts at the first body byte so connection setup is left out
+            while not body:
+                body = sock.recv(16384)
+                if not body:
+                    raise ValueError("Empty body from %s" % url)
+            first_byte = time.perf_counter()
+            result["startup_ms"] = _ms(first_byte - start)
+            count = len(body)
+            while count < max_bytes:
+                chunk = sock.recv(min(65536, max_bytes - count))
+                if not chunk:
+                    break
+                count += len(chunk)
+            elapsed = time.perf_counter() - first_byte
+            timed   = count - len(body)  # The first chunk arrived as the clock started
+            result.update(bytes=count, read_ms=_ms(elapsed),
+                          kbps=round(timed * 8 / elapsed / 1000.0, 1) if elapsed > 0 and timed > 0 else None,
+                          ok=True)
+            break
+        else:
+            raise ValueError("More than %d redirects from %s" % (MAX_REDIRECTS, result["url"]))
+
+    except Exception as e:
+        result["error"] = str(e) or e.__class__.__name__
+    finally:
+        if sock is not None:
+            sock.close()
+    return result
+
+
+# ----------------------------------------------------------------------------- probe_many()
+def probe_many(targets, workers=PROBE_WORKERS, max_bytes=PROBE_BYTES, timeout=PROBE_TIMEOUT):
+    """ Probe every (key, url) in targets at the same time, at most workers
+        at once. Generator of (key, result) in the order they finish. """
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="probe") as executor:
+        futures = {executor.submit(probe_url, url, max_bytes, timeout): key for key, url in targets}
+        for future in as_completed(futures):
+            yield (futures[future], future.result())
+
+
+# ----------------------------------------------------------------------------- station_targets()
+def station_targets(station_id, station_attributes, episodes=()):
+    """ Return the probe targets for a station: every one of its
+        station_stream urls and the audio_url of each episode given.
+        Keys are (station_id, kind). """
+    targets = []
+    for stream in station_attributes.get("station_stream") or []:
+        if stream.get("url"):
+            targets.append(((station_id, STATION_STREAM), stream["url"]))
+    for episode in episodes:
+        audio_url = episode.get("audio_url")
+        if audio_url:
+            targets.append(((station_id, EPISODE_AUDIO), audio_url))
+    return targets
+
+
+# ----------------------------------------------------------------------------- aggregate()
+def aggregate(probes):
+    """ Roll (key, result) pairs from probe_many() up into one dictionary per
+        station and kind of url, keyed by (station_id, kind), holding how many
+        probes were made and failed along with the median and worst time to
+        first byte, startup time and bitrate of those that worked. """
+    groups = {}
+    for key, result in probes:
+        groups.setdefault(key, []).append(result)
+
+    summary = {}
+    for (station_id, kind), results in groups.items():
+        good = [result for result in results if result["ok"]]
+        row  = {"station_id" : station_id   ,
+                "kind"       : kind         ,
+                "probes"     : len(results) ,
+                "failed"     : len(results) - len(good),
+                "errors"     : sorted(set(result["error"] for result in results if not result["ok"]))}
+        for field, worst in (("ttfb_ms", max), ("startup_ms", max), ("kbps", min)):
+            values = [result[field] for result in good if result[field] is not None]
+            row[field + "_median"] = round(statistics.median(values), 3) if values else None
+            row[field + "_worst"]  = worst(values) if values else None
+        summary[(station_id, kind)] = row
+    return summary
+
+
+# =============================================================================
+# Unit tests, because Jon asked and he is right
+def _stand_in_server():
+    """ A local stand in for a stream server: /stream sends 256KB of audio
+        in small writes, /redirect points at /stream and anything else
+        is a 404 """
+    import threading
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/redirect":
+                self.send_response(302)
+                self.send_header("Location", "/stream")
+                self.end_headers()
+            elif self.path == "/stream":
+                self.send_response(200)
+                self.send_header("Content-Type", "audio/mpeg")
+                self.end_headers()
+                for _ in range(64):
+                    self.wfile.write(b"\xff" * 4096)
+            else:
+                self.send_error(404)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, "http://127.0.0.1:%d" % server.server_address[1]
+
+def test_probe_reads_the_first_bytes():
+    server, base_url = _stand_in_server()
+    try:
+        result = probe_url(base_url + "/redirect", max_bytes=32 * 1024)
+        assert result["ok"] and result["status"] == 200 and result["redirects"] == 1
+        assert 32 * 1024 <= result["bytes"] < 256 * 1024
+        assert result["content_type"] == "audio/mpeg" and result["kbps"] > 0
+        assert result["ttfb_ms"] is not None and result["startup_ms"] >= result["ttfb_ms"]
+    finally:
+        server.shutdown()
+
+def test_probes_are_aggregated_per_station():
+    server, base_url = _stand_in_server()
+    try:
+        targets = station_targets(3, {"station_stream": [{"url": base_url + "/stream"}]},
+                                  [{"audio_url": base_url + "/missing.mp3"}])
+        summary = aggregate(probe_many(targets, workers=2, max_bytes=8192))
+        assert summary[(3, STATION_STREAM)]["failed"] == 0
+        assert summary[(3, EPISODE_AUDIO)]["failed"] == 1
+        assert summary[(3, EPISODE_AUDIO)]["ttfb_ms_median"] is None
+    finally:
+        server.shutdown()
@@ -0,0 +1,220 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+import json
+import time
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+CONFIG_PATH   = os.path.join(MY_PATH, "../config")
+CONFIG_FILE   = os.path.join(CONFIG_PATH, "podcast_player.conf")
+LIBRARY_PATH  = MY_PATH
+STAGING       = "staging"
+
+# import custom libraries
+sys.path.append(LIBRARY_PATH)
+try:
+    import podcast_player_utils
+    import api_utils
+    import catalog
+    import stream_probe
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'podcast_player_utils', 'api_utils', 'catalog' and 'stream_probe' libraries\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+CONFIGS       = podcast_player_utils.config_2_dictionary(CONFIG_FILE)
+SWEEP_WORKERS = int(CONFIGS.get("sweep_workers", "8"))
+
+
+# ----------------------------------------------------------------------------- Sweep
+class Sweep(object):
+    """ Walk every station, its podcasts and their episodes for one
+        environment and api version on a pool of worker threads. Every api
+        call is written to out as one JSON line as soon as it finishes:
+
+            {"time": ..., "environment": ..., "api_version": ..., "call": ...,
+             "station_id": ..., "podcast_id": ..., "ok": ..., "count": ...,
+             "elapsed_ms": ..., "error": ...}
+
+        Stations are walked first, then every podcast they have, so the
+        pool is never blocked waiting on work it has queued itself. The
+        stations and podcasts found are kept in a catalog.Catalog.
+
+        With probe on, every station_stream url and the audio_url of the
+        first episode of each podcast are probed with stream_probe as they
+        are found, one "stream_probe" line each, and a "stream_summary"
+        line per station and kind of url is written at the end. Probe
+        timings are also counted in metrics, a metrics.Metrics, if given. """
+
+    # -------------------------------------------------------------------------
+    def __init__(self,
+                 environment  = STAGING       ,
+                 api_version  = "v1"          ,
+                 workers      = SWEEP_WORKERS ,
+                 out          = sys.stdout    ,
+                 max_stations = 0             ,
+                 episodes     = True          ,
+                 probe        = False         ,
+                 metrics      = None          ):
+        self.environment  = environment
+        self.api_version  = api_version
+        self.workers      = max(1, workers)
+        self.out          = out
+        self.max_stations = max_stations
+        self.episodes     = episodes
+        self.probe        = probe
+        self.metrics      = metrics
+        self.probes       = []
+        self.catalog      = catalog.Catalog()
+        self.counts       = {"calls": 0, "errors": 0, "stations": 0, "podcasts": 0, "episodes": 0}
+        self._lock        = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    def emit(self, result):
+        """ Write one result as a JSON line and count it """
+        result = dict({"time"        : datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+                       "environment" : self.environment,
+                       "api_version" : self.api_version}, **result)
+        line = json.dumps(result, sort_keys=False)
+        with self._lock:
+            self.counts["calls"] += 1
+            if not result.get("ok", True):
+                self.counts["errors"] += 1
+            self.out.write(line + "\n")
+            self.out.flush()
+
+    # -------------------------------------------------------------------------
+    def timed(self, call, function, *args, **ids):
+        """ Run one api call, emit its result with how long it took and
+            return what it returned, or None if it blew up. An empty result
+            counts as a failure for the station calls, which only come back
+            empty when something went wrong. """
+        error  = ""
+        value  = None
+        start  = time.perf_counter()
+        try:
+            value = function(*args)
+        except Exception as e:
+            error = str(e)
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        ok = not error and (value or call not in ("station_ids", "station_attributes"))
+        if not error and not ok:
+            error = "Empty response"
+        self.emit(dict(ids, call=call, ok=bool(ok), count=len(value) if value is not None else 0,
+                       elapsed_ms=round(elapsed_ms, 3), error=error))
+        return value
+
+    # -------------------------------------------------------------------------
+    def probe_streams(self, targets):
+        """ Probe each ((station_id, kind), url) target and emit the result """
+        for (station_id, kind), url in targets:
+            start  = time.perf_counter()
+            result = stream_probe.probe_url(url)
+            self.emit(dict(result, call="stream_probe", station_id=station_id, kind=kind,
+                           elapsed_ms=round((time.perf_counter() - start) * 1000.0, 3)))
+            with self._lock:
+                self.probes.append(((station_id, kind), result))
+            if self.metrics is not None:
+                self.metrics.observe_probe(self.environment, kind, result)
+
+    # -------------------------------------------------------------------------
+    def _station_ids(self):
+        """ The ids of every station, raises on error so the cause of a
+            failure is in the error of the result line """
+        return [station["id"] for station in api_utils.iter_stations(self.api_version, self.environment)]
+
+    # -------------------------------------------------------------------------
+    def _station_attributes(self, station_id):
+        return api_utils.get_adapter(self.api_version).station(self.environment, station_id)
+
+    # -------------------------------------------------------------------------
+    def _station(self, station_id):
+        attributes = self.timed("station_attributes", self._station_attributes, station_id, station_id=station_id)
+        if attributes:
+            self.catalog.add_station(attributes)
+            if self.probe:
+                self.probe_streams(stream_probe.station_targets(station_id, attributes))
+        podcasts = self.timed("station_podcasts", self._list, api_utils.iter_station_podcasts,
+                              station_id, station_id=station_id)
+        return self.catalog.set_station_podcasts(station_id, podcasts or [])
+
+    # -------------------------------------------------------------------------
+    def _podcast(self, station_id, podcast_id):
+        episodes = self.timed("podcast_episodes", self._list, api_utils.iter_podcast_episodes,
+                              podcast_id, station_id=station_id, podcast_id=podcast_id)
+        if self.probe and episodes:
+            self.probe_streams(stream_probe.station_targets(station_id, {}, episodes[:1]))
+        return len(episodes or [])
+
+    # -------------------------------------------------------------------------
+    def _list(self, iterator, record_id):
+        """ Read every page of one of the api_utils generators. Unlike the
+            list functions these raise on error, so failures are reported. """
+        return list(iterator(record_id, self.api_version, self.environment))
+
+    # -------------------------------------------------------------------------
+    def run(self):
+        """ Run the sweep and return a summary dictionary, which is also
+            written out as the last line with "call": "summary" """
+        start = time.perf_counter()
+        station_ids = list(dict.fromkeys(self.timed("station_ids", self._station_ids) or []))
+        if self.max_stations > 0:
+            station_ids = station_ids[:self.max_stations]
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sweep") as executor:
+            podcasts_by_station = dict(zip(station_ids, executor.map(self._station, station_ids)))
+            self.counts["stations"] = len(station_ids)
+            self.counts["podcasts"] = sum(len(podcast_ids) for podcast_ids in podcasts_by_station.values())
+
+            if self.episodes:
+                jobs = [(station_id, podcast_id) for station_id, podcast_ids in podcasts_by_station.items()
+                                                 for podcast_id in podcast_ids]
+                self.counts["episodes"] = sum(executor.map(lambda job: self._podcast(*job), jobs))
+
+        for row in stream_probe.aggregate(self.probes).values():
+            self.emit(dict(row, call="stream_summary", ok=row["failed"] == 0, elapsed_ms=None))
+
+        summary = dict(self.counts, elapsed_ms=round((time.perf_counter() - start) * 1000.0, 3))
+        self.emit(dict(summary, call="summary", ok=self.counts["errors"] == 0))
+        return summary
+
+
+# =============================================================================
+# Unit tests, because Jon asked and he is right
+def test_sweep_walks_stations_podcasts_and_episodes(monkeypatch):
+    import io
+    class Adapter(object):
+        def station(self, e, s):
+            if s == 3:
+                raise ValueError("Bad Response (503)")
+            return {"id": s, "callsign": str(s)}
+    monkeypatch.setattr(api_utils, "iter_stations",          lambda v, e: iter([{"id": 1}, {"id": 2}, {"id": 3}]))
+    monkeypatch.setattr(api_utils, "get_adapter",            lambda v: Adapter())
+    monkeypatch.setattr(api_utils, "iter_station_podcasts",  lambda s, v, e: iter([{"id": s * 10}, {"id": s * 10 + 1}]))
+    def episodes(podcast_id, v, e):
+        if str(podcast_id) == "21":
+            raise ValueError("Bad Response (500)")
+        return iter([{"id": 1}, {"id": 2}, {"id": 3}])
+    monkeypatch.setattr(api_utils, "iter_podcast_episodes", episodes)
+
+    out = io.StringIO()
+    summary = Sweep(workers=4, out=out).run()
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert summary["stations"] == 3 and summary["podcasts"] == 6 and summary["episodes"] == 15
+    assert summary["errors"] == 2 and summary["calls"] == 13
+    assert [line["error"] for line in lines if line["call"] == "station_attributes" and not line["ok"]] == \
+           ["Bad Response (503)"]
+    assert lines[LAST]["call"] == "summary" and not lines[LAST]["ok"]
+    assert all("elapsed_ms" in line for line in lines)
@@ -0,0 +1,219 @@
+#/usr/local/bin/python3
+
+import sys
+import os
+import hashlib
+import tempfile
+import threading
+
+
+VERSION       = "1.0.0"
+DEBUG         = False
+VERBOSE       = False
+FIRST         = 0
+LAST          = -1
+ME            = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH       = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+CONFIG_PATH   = os.path.join(MY_PATH, "../config")
+CONFIG_FILE   = os.path.join(CONFIG_PATH, "podcast_player.conf")
+LIBRARY_PATH  = MY_PATH
+
+# The sizes we show images at
+ICON_SIZE     = 100   # Podcast and episode list icons
+LOGO_SIZE     = 150   # Station logo and the play/pause buttons
+NO_IMAGE_SIZE = 200   # The "no image" place holder
+
+# import third-party libraries
+try:
+    from PyQt5.QtGui import (QImage, QImageReader, QPixmap, QPixmapCache, QIcon)
+    from PyQt5.QtCore import (Qt, QSize)
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'PyQt5' library\n")
+    sys.stderr.write("         try: pip3 install pyqt5 --user\n")
+    sys.stderr.flush()
+    sys.exit(99)
+
+# import custom libraries
+sys.path.append(LIBRARY_PATH)
+try:
+    import podcast_player_utils
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'podcast_player_utils' library\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+# read configs
+CONFIGS = podcast_player_utils.config_2_dictionary(CONFIG_FILE)
+
+THUMBNAIL_PATH      = os.path.join(CONFIGS.get("cache_path", os.path.join("/tmp", "podcast_player")), "thumbnails")
+THUMBNAIL_MAX_BYTES = int(CONFIGS.get("thumbnail_cache_mb", "64")) * 1024 * 1024
+PIXMAP_CACHE_KB     = int(CONFIGS.get("pixmap_cache_kb", "20480"))
+_pixmap_cache_ready = False
+_makedirs_lock      = threading.Lock()
+_size_lock          = threading.Lock()
+_total_bytes        = None  # Of the thumbnail folder, counted on the first write
+
+
+# ----------------------------------------------------------------------------- thumbnail_file()
+def thumbnail_file(source_file, width, height):
+    """ Return the name of a copy of source_file scaled to fit width x height.
+        The scaled copy is made the first time it is asked for and kept on
+        disk, named after the content of the source, so an image is only
+        decoded and scaled once. Safe to call from worker threads as only
+        QImage is used. If anything goes wrong return an empty string. """
+    try:
+        with open(source_file, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        scaled_file = os.path.join(THUMBNAIL_PATH, "%s_%dx%d.png" % (digest, width, height))
+        if os.path.isfile(scaled_file):
+            _touch(scaled_file)
+            return scaled_file
+
+        # Let the reader decode straight to the smaller size, for JPEGs
+        # this skips most of the work of decoding the full image
+        reader = QImageReader(source_file)
+        reader.setAutoTransform(True)
+        size = reader.size()
+        if size.isValid() and (size.width() > width or size.height() > height):
+            reader.setScaledSize(size.scaled(width, height, Qt.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            raise ValueError("Unable to read image %s (%s)" % (source_file, reader.errorString()))
+        if image.width() > width or image.height() > height:
+            image = image.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+        with _makedirs_lock:
+            os.makedirs(THUMBNAIL_PATH, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=THUMBNAIL_PATH, prefix=".tmp", suffix=".png")
+        os.close(fd)
+        if not image.save(temp_name, "PNG"):
+            os.remove(temp_name)
+            raise ValueError("Unable to write thumbnail %s" % scaled_file)
+        os.replace(temp_name, scaled_file)
+        _grew(os.path.getsize(scaled_file))
+        return scaled_file
+
+    except Exception as e:
+        sys.stderr.write("ERROR -- Unable to make a %dx%d thumbnail of %s\n" % (width, height, source_file))
+        sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
+        sys.stderr.flush()
+        return ""
+
+
+# ----------------------------------------------------------------------------- _touch()
+def _touch(scaled_file):
+    """ Mark a thumbnail as recently used, the modification time is the LRU
+        clock as it is for image_cache.ImageCache """
+    try:
+        os.utime(scaled_file)
+    except OSError:
+        pass
+
+
+# ----------------------------------------------------------------------------- _grew()
+def _grew(delta):
+    """ Keep a running total of the size of the thumbnail folder and evict
+        when it goes over THUMBNAIL_MAX_BYTES. The folder is only scanned on
+        the first write and when evicting. """
+    global _total_bytes
+    with _size_lock:
+        if _total_bytes is None:
+            _total_bytes = sum(size for name, size, used in _entries())
+        else:
+            _total_bytes += delta
+        if _total_bytes > THUMBNAIL_MAX_BYTES:
+            _evict()
+
+
+# ----------------------------------------------------------------------------- _entries()
+def _entries():
+    """ Yield (file name, size, last used) for every thumbnail """
+    for entry in os.scandir(THUMBNAIL_PATH):
+        if entry.name.startswith("."):
+            continue
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        yield (entry.path, stat.st_size, stat.st_mtime)
+
+
+# ----------------------------------------------------------------------------- _evict()
+def _evict():
+    """ Delete the least recently used thumbnails until the folder is back
+        under 90% of its limit. Caller holds _size_lock. """
+    global _total_bytes
+    entries = sorted(_entries(), key=lambda entry: entry[LAST])
+    total   = sum(entry[1] for entry in entries)
+    target  = THUMBNAIL_MAX_BYTES * 0.9
+    for scaled_file, size, used in entries:
+        if total <= target:
+            break
+        try:
+            os.remove(scaled_file)
+        except OSError:
+            pass
+        total -= size
+    _total_bytes = total
+
+
+# ----------------------------------------------------------------------------- thumbnail_pixmap()
+def thumbnail_pixmap(source_file, width, height):
+    """ Return a QPixmap of source_file scaled to fit width x height. Pixmaps
+        are kept in the QPixmapCache so showing the same image again costs
+        nothing. Must be called from the GUI thread. Returns a null pixmap
+        if the image can not be read. """
+    global _pixmap_cache_ready
+    if not _pixmap_cache_ready:
+        QPixmapCache.setCacheLimit(PIXMAP_CACHE_KB)
+        _pixmap_cache_ready = True
+
+    try:
+        stat = os.stat(source_file)
+    except OSError:
+        return QPixmap()
+    key = "%s:%d:%d:%dx%d" % (source_file, stat.st_size, stat.st_ino, width, height)
+
+    pixmap = QPixmapCache.find(key)
+    if pixmap is not None and not pixmap.isNull():
+        return pixmap
+
+    scaled_file = thumbnail_file(source_file, width, height)
+    pixmap = QPixmap(scaled_file) if scaled_file else QPixmap()
+    if not pixmap.isNull():
+        QPixmapCache.insert(key, pixmap)
+    return pixmap
+
+
+# ----------------------------------------------------------------------------- thumbnail_icon()
+def thumbnail_icon(source_file, width=ICON_SIZE, height=ICON_SIZE):
+    """ Return a QIcon built from the width x height thumbnail of source_file.
+        Must be called from the GUI thread. """
+    return QIcon(thumbnail_pixmap(source_file, width, height))
+
+
+# =============================================================================
+# Unit tests, because Jon asked and he is right
+def test_thumbnail_file_is_scaled_once(monkeypatch):
+    monkeypatch.setattr(sys.modules[__name__], "THUMBNAIL_PATH", tempfile.mkdtemp())
+    monkeypatch.setattr(sys.modules[__name__], "_total_bytes", None)
+    source_file = os.path.join(MY_PATH, "../res/play.png")
+    first = thumbnail_file(source_file, 20, 20)
+    assert QImage(first).width() <= 20 and QImage(first).height() <= 20
+    assert thumbnail_file(source_file, 20, 20) == first
+
+def test_thumbnail_file_bad_file():
+    assert thumbnail_file("bad_file_name", 20, 20) == ""
+
+def test_evict_least_recently_used(monkeypatch):
+    monkeypatch.setattr(sys.modules[__name__], "THUMBNAIL_PATH", tempfile.mkdtemp())
+    monkeypatch.setattr(sys.modules[__name__], "THUMBNAIL_MAX_BYTES", 10)
+    monkeypatch.setattr(sys.modules[__name__], "_total_bytes", None)
+    for index, name in enumerate(["old", "new"]):
+        file_name = os.path.join(THUMBNAIL_PATH, name)
+        with open(file_name, "wb") as f:
+            f.write(b"1234567")
+        os.utime(file_name, (index, index))
+    _grew(0)
+    assert sorted(os.listdir(THUMBNAIL_PATH)) == ["new"]
@@ -17,7 +17,7 @@ LIBRARY_PATH  = MY_PATH
 
 # import third-party libraries
 try:
-    from PyQt5.QtWidgets import (QListWidget, QListWidgetItem)
+    from PyQt5.QtWidgets import (QListView)
     from PyQt5.QtGui import (QPixmap, QFont, QIcon)
     from PyQt5.QtCore import (Qt, pyqtSignal, QSize)
 
@@ -46,18 +46,34 @@ except ModuleNotFoundError:
     sys.stderr.flush()
     sys.exit(98)
 
+try:
+    import list_models
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'list_models' library\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
 
-class EpisodesListWidget(QListWidget):
+
+class EpisodesListWidget(QListView):
+    """ A list of episodes backed by an EpisodeListModel. Rows are created
+        as they are scrolled into view so a podcast with thousands of
+        episodes costs no more to show than one with ten. """
 
     # -------------------------------------------------------------------------
     def __init__(self, parent=None):
-        super().__init__()
-        # self = QListWidget()
+        super().__init__(parent)
+        self.artwork = list_models.ArtworkCache(parent=self)
+        self.episode_model = list_models.EpisodeListModel(self.artwork, parent=self)
+        self.setModel(self.episode_model)
+        self.setUniformItemSizes(True)
+        self.setWordWrap(True)
 
     # -------------------------------------------------------------------------
     def clear_episodes_list(self):
         """ Clear the Episodes list of all entries"""
-        self.clear()
+        self.artwork.cancel()
+        self.episode_model.set_ids([])
     # -------------------------------------------------------------------------
     def populate_list_items(self               ,
                             podcast_id         ,
@@ -66,50 +82,36 @@ class EpisodesListWidget(QListWidget):
                             icon_width  = 100  ):
         """ Given a podcast_id ,
             populate the episodes list with an Episode ID,
-            Episode Title, Episode Published Date, Duration, and podcast image."""
+            Episode Title, Episode Published Date and podcast image."""
 
         # Start with a clean list
         self.clear_episodes_list()
 
-        # We use the same image for every episode in the list so we really only
-        # need to download the one image and use it for every list item
-        # TODO: Come up with a cool caching mechanism for this and all image downloads
-
+        # We use the same image for every episode in the list so the model
+        # only needs the one url. Images come from the image cache so it is
+        # only downloaded when it changes.
         if api_version == "v1":
             episode_image_url = api_utils.podcast_id_2_image_url(podcast_id, api_version="v1")
         elif api_version == "v2":
             episode_image_url = api_utils.podcast_id_2_image_url(podcast_id, api_version="v2")
         else:
-            pass
-
-        # Download the image file to be used for all episodes in the list
-        episode_image_file = podcast_player_utils.download_station_logo(episode_image_url)
+            episode_image_url = ""
 
-        # Call out to the api and get a list episode attributes
-        episode_attributes = api_utils.podcast_id_2_episodes(podcast_id)
-
-        for item in episode_attributes:
-
-            # Create new list item for the list widget
-            list_item = QListWidgetItem(self)
-
-            # Add episode data to the newly created list item
-            if api_version == "v1":
+        if api_version == "v1":
 
-                # TODO: Make this a parallel call with QThread
-                # Download the image for the podcast and add it to the list item
-                episode_icon = QIcon(episode_image_file)
-                list_item.setIcon(episode_icon)
-                self.setIconSize(QSize(icon_width, icon_height))
+            # Stream the episodes from the api, the model pulls another
+            # page of them as the list is scrolled down
+            episodes = api_utils.iter_podcast_episodes(podcast_id, api_version="v1")
 
-                # Populate the podcastListWidget
-                # Populate the podcastListWidget
-                list_item.setText("Episode ID: %s\n%s\n%s\n%s" % (str(item["id"])                            ,
-                                                                  str(item["attributes"]["title"])           ,
-                                                                  str(item["attributes"]["published_date"])  ,
-                                                                  str(item["attributes"]["duration_seconds"])))
+            # Images are scaled to the icon size as they are loaded
+            self.artwork.loader.size = max(icon_width, icon_height)
+            self.setIconSize(QSize(icon_width, icon_height))
+            self.episode_model.set_ids(self.episode_model.catalog.stream_podcast_episodes(podcast_id, episodes),
+                                       episode_image_url)
+            self.episode_model.fetchMore()
+            self.episode_model.catalog.drop_other_podcasts(podcast_id)
 
-            elif api_version == "v2":
-                pass
-            else:
-                pass
+        elif api_version == "v2":
+            pass
+        else:
+            pass
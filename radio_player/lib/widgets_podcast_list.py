@@ -18,7 +18,7 @@ LIBRARY_PATH  = MY_PATH
 
 # import third-party libraries
 try:
-    from PyQt5.QtWidgets import (QListWidget, QListWidgetItem)
+    from PyQt5.QtWidgets import (QListView)
     from PyQt5.QtGui import (QPixmap, QFont, QIcon)
     from PyQt5.QtCore import (Qt, pyqtSignal, QSize)
 
@@ -47,18 +47,34 @@ except ModuleNotFoundError:
     sys.stderr.flush()
     sys.exit(98)
 
+try:
+    import list_models
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'list_models' library\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
 
-class PodcastListWidget(QListWidget):
+class PodcastListWidget(QListView):
+    """ A list of podcasts backed by a PodcastListModel. Rows are created
+        as they are scrolled into view and podcast images are only loaded
+        for the rows that are shown. """
 
     # -------------------------------------------------------------------------
     def __init__(self, parent=None):
-        super().__init__()
-        # self = QListWidget()
+        super().__init__(parent)
+        self.artwork = list_models.ArtworkCache(parent=self)
+        self.podcast_model = list_models.PodcastListModel(self.artwork, parent=self)
+        self.setModel(self.podcast_model)
+        self.setUniformItemSizes(True)
+        self.setWordWrap(True)
 
     # -------------------------------------------------------------------------
     def clear_podcast_list(self):
         """ Clear the podcast player list of all entries"""
-        self.clear()
+        self.artwork.cancel()
+        self.podcast_model.set_ids([])
 
     # -------------------------------------------------------------------------
     def populate_list_items(self,
@@ -70,28 +86,20 @@ class PodcastListWidget(QListWidget):
             populate the podcast list with a podcast ID,
             podcast title and podcast image for each podcast in the list."""
 
-        # Call out to the api and get a list podcast attributes
-        podcast_attributes = api_utils.station_id_2_podcast_list(station_id)
-
-        for item in podcast_attributes:
-
-            # Create  new list item for the list widget
-            list_item = QListWidgetItem(self)
+        # Start with a clean list
+        self.clear_podcast_list()
 
-            if api_version == "v1":
+        if api_version == "v1":
 
-                # TODO: Make this a parallel call with QThread
-                # Download the image for the podcast and add it to the list item
-                podcast_image_file = podcast_player_utils.download_station_logo(item["attributes"]["image"])
-                podcast_icon = QIcon(podcast_image_file)
-                list_item.setIcon(podcast_icon)
-                self.setIconSize(QSize(icon_width, icon_height))
+            # Call out to the api and get a list podcast attributes
+            podcast_attributes = api_utils.station_id_2_podcast_list(station_id)
 
-                # Populate the podcastListWidget
-                list_item.setText("Podcast ID: %s\n%s" % (str(item["id"]),
-                                                          str(item["attributes"]["title"])))
+            # Images are scaled to the icon size as they are loaded
+            self.artwork.loader.size = max(icon_width, icon_height)
+            self.setIconSize(QSize(icon_width, icon_height))
+            self.podcast_model.set_ids(self.podcast_model.catalog.set_station_podcasts(station_id, podcast_attributes))
 
-            elif api_version == "v2":
-                pass
-            else:
-                pass
+        elif api_version == "v2":
+            pass
+        else:
+            pass
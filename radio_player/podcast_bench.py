@@ -0,0 +1,211 @@
+#!/usr/local/bin/python3
+
+# RADIO.COM	Benchmarks for the hot paths of the podcast player: the api
+# fetches, the image pipeline and filling the podcast and episode lists.
+# Runs against a local mock api serving a made up catalog, 400 stations
+# with 100 podcasts each and 1,000 episodes per podcast by default, so the
+# numbers only change when the code does. The lists are filled in a real
+# main window drawn offscreen. Reports p50 and p95 times and the peak
+# memory of each hot path, e.g.
+#
+#     podcast_bench.py --repeat 10 --save-baseline bench_baseline.json
+#     podcast_bench.py --repeat 10 --baseline bench_baseline.json
+#
+# Special notes:
+#    1.) Requires Python 3, PyQt5 and the Requests library
+#    2.) Return codes:
+#           0 --> Done, and no hot path is slower than the baseline
+#           1 --> One or more hot paths regressed against the baseline
+#           2 --> Unable to read the baseline
+#          99 --> Unable to import third party libraries
+#          98 --> Unable to import custom libraries
+
+# Standard Library imports
+import sys
+import os
+import json
+import argparse
+import tempfile
+
+# Dictionary of variables
+VERSION        = "1.0.0"
+VERBOSE        = False
+DEBUG          = False
+FIRST          = 0
+LAST           = -1
+ME             = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH        = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+LIBRARY_PATH   = os.path.join(MY_PATH, "./lib")
+
+# The lists are filled in a window nobody has to see
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# Third party library imports
+try:
+    from PyQt5.QtCore import QThreadPool
+    from PyQt5.QtWidgets import QApplication
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'PyQt5' library\n")
+    sys.stderr.write("         try: pip3 install pyqt5 --user\n")
+    sys.stderr.flush()
+    sys.exit(99)
+
+# Custom library imports
+sys.path.append(LIBRARY_PATH)
+try:
+    import api_client
+    import api_utils
+    import image_cache
+    import catalog_store
+    import podcast_player_utils
+    import mock_api
+    import bench
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'api_client', 'api_utils', 'image_cache', "
+                     "'catalog_store', 'podcast_player_utils', 'mock_api' and 'bench' libraries\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+
+# ----------------------------------------------------------------------------- parse_arguments()
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(prog=ME, description="Benchmark the api, image and list hot paths "
+                                                          "against a local mock api")
+    parser.add_argument("--stations",       type=int, default=400,
+                        help="stations in the mock catalog (default %(default)s)")
+    parser.add_argument("--podcasts",       type=int, default=100,
+                        help="podcasts per station (default %(default)s)")
+    parser.add_argument("--episodes",       type=int, default=1000,
+                        help="episodes per podcast (default %(default)s)")
+    parser.add_argument("-r", "--repeat",   type=int, default=5,
+                        help="timed runs of each hot path (default %(default)s)")
+    parser.add_argument("--latency-ms",     type=float, default=0.0,
+                        help="added to every answer of the mock api (default %(default)s)")
+    parser.add_argument("--json",           action="store_true",
+                        help="print one JSON line per hot path instead of a table")
+    parser.add_argument("--baseline",       metavar="FILE",
+                        help="flag hot paths that got slower or bigger than in FILE")
+    parser.add_argument("--tolerance",      type=float, default=0.25,
+                        help="with --baseline, how much worse counts as a regression "
+                             "(default %(default)s, i.e. 25%%)")
+    parser.add_argument("--save-baseline",  metavar="FILE",
+                        help="save the results to FILE for later runs to compare against")
+    return parser.parse_args(argv)
+
+
+# ----------------------------------------------------------------------------- run_benchmarks()
+def run_benchmarks(args, mock):
+    """ Time each hot path against the running mock api, returns the list
+        of bench results """
+    import podcast_player  # Reads the config and builds nothing until asked
+
+    app    = QApplication.instance() or QApplication([ME])
+    window = podcast_player.mainWindow()
+    stations = args.stations
+    results  = []
+
+    # --- The window syncs the stations in the background as it opens, let
+    #     that finish so the api paths have the mock api to themselves
+    QThreadPool.globalInstance().waitForDone()
+    app.processEvents()
+
+    # --- The first station every run asks for is one it has not asked
+    #     for before, so nothing is answered from memory
+    results.append(bench.measure("get_station_ids",
+                                 lambda run: api_utils.get_station_ids(),
+                                 args.repeat))
+    results.append(bench.measure("station_id_2_podcast_list",
+                                 lambda run: api_utils.station_id_2_podcast_list(run % stations + 1),
+                                 args.repeat))
+    # A new query string makes a new url for the image cache to download
+    logo_url = "%s/images/station/1.png?run=%%d" % mock.base_url()
+    results.append(bench.measure("download_station_logo",
+                                 lambda run: podcast_player_utils.download_station_logo(logo_url % run),
+                                 args.repeat))
+
+    # --- Filling the podcast list also selects the top podcast, which
+    #     fills the first page of its episodes, as it does for the user.
+    #     The store has not seen the station, so the podcasts come in with
+    #     the sync in the background
+    def populate_podcasts(run):
+        window.selected_station_id = (run + args.repeat) % stations + 1
+        window.populate_podcasts()
+        while window.podcasts_sync_call.running:
+            app.processEvents()
+        app.processEvents()
+    # The window's background calls and image loads run on Qt's pool
+    # threads, so the list paths are timed without tracing memory
+    results.append(bench.measure("populate_podcasts", populate_podcasts, args.repeat, trace_memory=False))
+
+    podcast_ids = [str(podcast["id"]) for podcast in window.catalog.station_podcasts(window.selected_station_id)]
+
+    def populate_episodes(run):
+        window.populate_episodes(podcast_ids[run % len(podcast_ids)])
+        app.processEvents()
+    results.append(bench.measure("populate_episodes", populate_episodes, args.repeat, trace_memory=False))
+
+    # --- Scrolling to the bottom pulls every page of episodes in
+    def scroll_episodes(run):
+        populate_episodes(run)
+        while window.episode_model.canFetchMore():
+            window.episode_model.fetchMore()
+        app.processEvents()
+    results.append(bench.measure("populate_episodes_all", scroll_episodes, args.repeat, trace_memory=False))
+
+    # --- Let what the window still does in the background finish before
+    #     the mock api goes away
+    QThreadPool.globalInstance().waitForDone()
+    app.processEvents()
+    window.close()
+    return results
+
+
+# === MAIN ====================================================================
+def main(argv=None):
+    args = parse_arguments(argv)
+
+    baseline = None
+    if args.baseline:
+        try:
+            baseline = bench.load_baseline(args.baseline)
+        except (OSError, ValueError) as e:
+            sys.stderr.write("ERROR -- Unable to read the benchmark baseline %s\n" % args.baseline)
+            sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
+            sys.stderr.flush()
+            return 2
+
+    # Time the code, not the cache, and keep the images we download and
+    # the catalog we see out of the caches and the store the player uses
+    api_client.CACHE_ENABLED = False
+    images = tempfile.TemporaryDirectory(prefix="podcast_bench")
+    podcast_player_utils._image_cache = image_cache.ImageCache(images.name)
+    catalog_store.STORE_PATH = os.path.join(images.name, "catalog.sqlite")
+
+    mock = mock_api.MockApi(args.stations, args.podcasts, args.episodes, args.latency_ms).start()
+    mock.install()
+    try:
+        results = run_benchmarks(args, mock)
+    finally:
+        api_client.close_clients()
+        mock.stop()
+        images.cleanup()
+
+    if args.json:
+        for result in results:
+            print(json.dumps(result))
+    else:
+        print(bench.report(results))
+
+    if args.save_baseline:
+        bench.save_baseline(results, args.save_baseline)
+
+    regressions = bench.compare(results, baseline, args.tolerance) if baseline else []
+    for line in regressions:
+        sys.stderr.write("REGRESSION -- %s\n" % line)
+    sys.stderr.flush()
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
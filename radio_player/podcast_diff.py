@@ -0,0 +1,143 @@
+#!/usr/local/bin/python3
+
+# RADIO.COM	Compare the station, podcast and episode catalogs of the
+# development, staging and production apis. All of them are fetched at
+# the same time, every record is fingerprinted once and the catalogs are
+# compared by id, writing one JSON line per record added, removed or
+# changed going from one environment to the next, then a summary line per
+# pair, e.g.
+#
+#     podcast_diff.py --output diff.jsonl
+#     podcast_diff.py --from staging --to production --episodes
+#     podcast_diff.py --use-store
+#
+# By default data is followed the way it is promoted, development to
+# staging and staging to production. Fields that always differ between
+# environments, diff_ignore_fields in the config file, are left out.
+# With --use-store each catalog is synced into the local catalog store and
+# read from there, so after the first run only what changed is fetched.
+#
+# Special notes:
+#    1.) Requires Python 3 and the Requests library
+#    2.) Return codes:
+#           0 --> The catalogs are the same
+#           1 --> There are differences
+#           2 --> One or more api calls failed, the differences may be incomplete
+#          99 --> Unable to import third party libraries
+#          98 --> Unable to import custom libraries
+
+# Standard Library imports
+import sys
+import os
+import json
+import argparse
+
+# Dictionary of variables
+VERSION        = "1.0.0"
+VERBOSE        = False
+DEBUG          = False
+FIRST          = 0
+LAST           = -1
+ME             = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH        = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+LIBRARY_PATH   = os.path.join(MY_PATH, "./lib")
+PRODUCTION     = "production"
+STAGING        = "staging"
+DEVELOPMENT    = "development"
+
+# Custom library imports
+sys.path.append(LIBRARY_PATH)
+try:
+    import api_client
+    import catalog_diff
+    import catalog_store
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'api_client', 'catalog_diff' and 'catalog_store' libraries\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+
+# ----------------------------------------------------------------------------- parse_arguments()
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(prog=ME, description="Compare the catalogs of the development, staging "
+                                                          "and production apis")
+    parser.add_argument("--from",               dest="from_environment", choices=[DEVELOPMENT, STAGING, PRODUCTION],
+                        help="compare just this environment ...")
+    parser.add_argument("--to",                 dest="to_environment", choices=[DEVELOPMENT, STAGING, PRODUCTION],
+                        help="... with this one (default development to staging and staging to production)")
+    parser.add_argument("-a", "--api-version",  choices=["v1", "v2"], default="v1")
+    parser.add_argument("-w", "--workers",      type=int, default=catalog_diff.DIFF_WORKERS,
+                        help="api calls to run at once per environment (default %(default)s)")
+    parser.add_argument("--episodes",           action="store_true",
+                        help="compare the episodes of every podcast too")
+    parser.add_argument("--max-stations",       type=int, default=0,
+                        help="only compare the first N stations")
+    parser.add_argument("--ignore-fields",      default=",".join(catalog_diff.IGNORE_FIELDS),
+                        help="comma separated fields left out of the compare (default %(default)s)")
+    parser.add_argument("--use-cache",          action="store_true",
+                        help="answer from the response cache where it is fresh")
+    parser.add_argument("--use-store",          action="store_true",
+                        help="sync the local catalog store and compare from it, only fetching what changed")
+    parser.add_argument("--store",              default=catalog_store.STORE_PATH,
+                        help="the local catalog store (default %(default)s)")
+    parser.add_argument("-o", "--output",       default="-",
+                        help="file to write the JSON lines to (default stdout)")
+    args = parser.parse_args(argv)
+    if bool(args.from_environment) != bool(args.to_environment):
+        parser.error("--from and --to go together")
+    return args
+
+
+# === MAIN ====================================================================
+def main(argv=None):
+    args = parse_arguments(argv)
+
+    api_client.CACHE_ENABLED = api_client.CACHE_ENABLED and args.use_cache
+
+    if args.from_environment:
+        pairs = [(args.from_environment, args.to_environment)]
+    else:
+        pairs = list(catalog_diff.PROMOTIONS)
+    ignore = tuple(field for field in args.ignore_fields.split(",") if field)
+
+    store = catalog_store.CatalogStore(args.store) if args.use_store else None
+    catalogs = catalog_diff.fetch_environments([environment for pair in pairs for environment in pair],
+                                               args.api_version, args.episodes, args.workers,
+                                               args.max_stations, ignore, store)
+    api_client.close_clients()
+    if store is not None:
+        store.close()
+
+    found  = 0
+    errors = 0
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        for environment_catalog in catalogs.values():
+            for error in environment_catalog.errors:
+                sys.stderr.write("ERROR -- %s\n" % error)
+            errors += len(environment_catalog.errors)
+            out.write(json.dumps({"call"        : "fetch"                                 ,
+                                  "environment" : environment_catalog.environment         ,
+                                  "counts"      : environment_catalog.counts()            ,
+                                  "errors"      : len(environment_catalog.errors)         ,
+                                  "elapsed_ms"  : round(environment_catalog.elapsed_ms, 3) }) + "\n")
+        for from_environment, to_environment in pairs:
+            old, new    = catalogs[from_environment], catalogs[to_environment]
+            differences = catalog_diff.diff_catalogs(old, new, ignore)
+            for difference in differences:
+                out.write(json.dumps(dict({"call": "difference"}, **difference)) + "\n")
+            out.write(json.dumps(dict({"call": "summary"}, **catalog_diff.summarize(old, new, differences))) + "\n")
+            found += len(differences)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        sys.stderr.flush()
+
+    if errors:
+        return 2
+    return 1 if found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
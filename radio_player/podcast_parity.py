@@ -0,0 +1,110 @@
+#!/usr/local/bin/python3
+
+# RADIO.COM	Check that the v2 api gives the same stations as v1, and
+# whether it is any faster, before we move to it. Both station lists are
+# fetched at the same time, then every station from either list is fetched
+# from both versions at once, a batch of stations at a time. The two
+# responses, data[].attributes for v1 and stations[] for v2, are turned
+# into the same records and compared field by field. One JSON line is
+# written per station with the time each version took and the fields that
+# differ, then a summary line with the latency of each version side by
+# side, e.g.
+#
+#     podcast_parity.py --output parity.jsonl
+#     podcast_parity.py --environment production --max-stations 50
+#
+# The response cache is not used so every call is timed off the wire.
+#
+# Special notes:
+#    1.) Requires Python 3 and the Requests library
+#    2.) Return codes:
+#           0 --> v1 and v2 agree
+#           1 --> There are differences
+#           2 --> One or more api calls failed, the differences may be incomplete
+#          99 --> Unable to import third party libraries
+#          98 --> Unable to import custom libraries
+
+# Standard Library imports
+import sys
+import os
+import json
+import argparse
+
+# Dictionary of variables
+VERSION        = "1.0.0"
+VERBOSE        = False
+DEBUG          = False
+FIRST          = 0
+LAST           = -1
+ME             = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH        = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+LIBRARY_PATH   = os.path.join(MY_PATH, "./lib")
+PRODUCTION     = "production"
+STAGING        = "staging"
+DEVELOPMENT    = "development"
+
+# Custom library imports
+sys.path.append(LIBRARY_PATH)
+try:
+    import api_client
+    import api_parity
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'api_client' and 'api_parity' libraries\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+
+# ----------------------------------------------------------------------------- parse_arguments()
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(prog=ME, description="Compare the v1 and v2 apis, station by station")
+    parser.add_argument("-e", "--environment",  choices=[DEVELOPMENT, STAGING, PRODUCTION], default=STAGING)
+    parser.add_argument("-w", "--workers",      type=int, default=api_parity.PARITY_WORKERS,
+                        help="api calls to run at once (default %(default)s)")
+    parser.add_argument("-b", "--batch-size",   type=int, default=api_parity.BATCH_SIZE,
+                        help="stations to ask for at a time (default %(default)s)")
+    parser.add_argument("--max-stations",       type=int, default=0,
+                        help="only compare the first N stations")
+    parser.add_argument("-o", "--output",       default="-",
+                        help="file to write the JSON lines to (default stdout)")
+    return parser.parse_args(argv)
+
+
+# === MAIN ====================================================================
+def main(argv=None):
+    args = parse_arguments(argv)
+
+    api_client.CACHE_ENABLED = False
+
+    results = []
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        for result in api_parity.check_parity(args.environment, args.workers, args.max_stations, args.batch_size):
+            results.append(result)
+            out.write(json.dumps(dict({"call": "parity", "environment": args.environment}, **result)) + "\n")
+        summary = api_parity.summarize(results)
+        out.write(json.dumps(dict({"call": "summary", "environment": args.environment}, **summary)) + "\n")
+    finally:
+        api_client.close_clients()
+        if out is not sys.stdout:
+            out.close()
+
+    errors = 0
+    for result in results:
+        for version in api_parity.VERSIONS:
+            if result["%s_error" % version]:
+                sys.stderr.write("ERROR -- %s %s station %s: %s\n" % (args.environment, version, result["id"],
+                                                                     result["%s_error" % version]))
+                errors += 1
+    sys.stderr.write(api_parity.report(summary) + "\n")
+    sys.stderr.flush()
+
+    if errors:
+        return 2
+    station_list = results[FIRST]
+    differ = station_list["only_%s" % api_parity.OLD_VERSION] or station_list["only_%s" % api_parity.NEW_VERSION]
+    return 1 if differ or summary["mismatched"] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -15,9 +15,9 @@
 import sys
 import time
 import os
-import json
-import pprint
-from threading import (Thread)
+
+# Cold start is timed from here to the first paint of the main window
+START_TIME     = time.perf_counter()
 
 # Dictionary of variables
 VERSION        = "1.4.0"
@@ -32,36 +32,21 @@ LIBRARY_PATH   = os.path.join(MY_PATH, "./lib")
 CONFIG_PATH    = os.path.join(MY_PATH, "./config")
 CACHE_PATH     = os.path.join("/tmp")
 CONFIG_FILE    = os.path.join(CONFIG_PATH, "podcast_player.conf")
-THREAD_MONITOR = []
 PRODUCTION     = "production"
 STAGING        = "staging"
 DEVELOPMENT    = "development"
 
 
-# Third party library imports
-try:
-    import vlc
-except ModuleNotFoundError:
-    sys.stderr.write("ERROR -- Unable to import the 'vlc' library\n")
-    sys.stderr.write("         try: pip3 install python-vlc --user\n")
-    sys.stderr.flush()
-    sys.exit(99)
-
-try:
-    import requests
-except ModuleNotFoundError:
-    sys.stderr.write("ERROR -- Unable to import the 'requests' library\n")
-    sys.stderr.write("         try: pip3 install requests --user\n")
-    sys.stderr.flush()
-    sys.exit(99)
-
+# Third party library imports. The vlc library is only imported, by
+# media_players, once the first station or episode is selected
 try:
     from PyQt5.QtWidgets import (QApplication, QWidget)
     from PyQt5.QtWidgets import (QGridLayout, QVBoxLayout, QHBoxLayout, QBoxLayout)
-    from PyQt5.QtWidgets import (QLabel, QComboBox, QTabWidget, QTextEdit, QLineEdit)
-    from PyQt5.QtWidgets import (QSlider, QDial, QScrollBar, QListWidget, QListWidgetItem)
+    from PyQt5.QtWidgets import (QLabel, QComboBox, QTabWidget, QLineEdit)
+    from PyQt5.QtWidgets import (QSlider, QDial, QScrollBar, QListView, QPushButton, QFileDialog)
+    from PyQt5.QtWidgets import (QTableView, QHeaderView, QAbstractItemView)
     from PyQt5.QtGui import (QPixmap, QFont, QIcon)
-    from PyQt5.QtCore import (Qt, pyqtSignal, QSize)
+    from PyQt5.QtCore import (Qt, pyqtSignal, QSize, QTimer)
 
 except ModuleNotFoundError:
     sys.stderr.write("ERROR -- Unable to import the 'PyQt5' library\n")
@@ -79,21 +64,80 @@ except ModuleNotFoundError:
     sys.stderr.flush()
     sys.exit(98)
 
+try:
+    import api_client
+    import api_utils
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'api_client' and 'api_utils' libraries\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+try:
+    import thumbnails
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'thumbnails' library\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+try:
+    import list_models
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'list_models' library\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+try:
+    import catalog
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'catalog' library\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+try:
+    import playback_metrics
+    import media_players
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'playback_metrics' and 'media_players' libraries\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+try:
+    import field_schema
+    import background_call
+    import snapshot
+    import comm_log
+    import image_cache
+    import metrics
+    import catalog_store
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'field_schema', 'background_call', 'snapshot', "
+                     "'comm_log', 'image_cache', 'metrics' and 'catalog_store' libraries\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
 # Read configurations from the configuration file
 CONFIGS = podcast_player_utils.config_2_dictionary(CONFIG_FILE)
 
-# Assign base urls for different environments from config file
-CONFIG_PATH   = os.path.join(MY_PATH, "../config")
-api_base_urls = {}
-api_base_urls[PRODUCTION]  = CONFIGS["prod_base_url"]
-api_base_urls[STAGING]     = CONFIGS["stg_base_url"]
-api_base_urls[DEVELOPMENT] = CONFIGS["dev_base_url"]
+# How long (milliseconds) from starting the program to the first paint of
+# the main window we are prepared to put up with
+STARTUP_BUDGET_MS = float(CONFIGS.get("startup_budget_ms", "1500"))
+
+# How many events the Comm Log keeps before dropping the oldest
+COMM_LOG_EVENTS = int(CONFIGS.get("comm_log_events", str(comm_log.MAX_EVENTS)))
+
+# Where the fields of each details tab go: the first row, the column of the
+# labels, how many rows before starting a new pair of columns further right
+# and the most fields shown. The station tab has room for three pairs.
+DETAIL_LAYOUTS = {field_schema.STATION : (2, 0, 18, 54)    ,
+                  field_schema.PODCAST : (1, 3, None, None) ,
+                  field_schema.EPISODE : (1, 3, None, None) }
 
-# Get the v2 api auth token from the config file
-# and use it to define a header dictionary for
-# v2 requests.get() calls
-v2_api_auth_token = CONFIGS["v2_api_auth_token"]
-api_header = {"Authorization": v2_api_auth_token}
 
 
 # This is total BS! I have to make QLabel clickable with my bare hands
@@ -128,14 +172,27 @@ class mainWindow(QWidget):
         self.api_version               = ""
         self.selected_station_id       = 0
         self.selected_station_callsign = ""
-        self.list_of_podcasts          = []
+        self.catalog                   = catalog.Catalog()
+        self.catalog_store             = catalog_store.CatalogStore()
         self.selected_podcast_id       = 0
-        self.list_of_episodes          = []
         self.selected_episode_id       = 0
         self.player_states             = ["Not Ready", "Media Ready", "Playing"]
         self.station_player_state      = self.player_states[0]
         self.episode_player_state      = self.player_states[0]
         self.station_ids               = {}
+        self.episodes_from_store       = False
+        self.closing                   = False
+        self.field_schema              = field_schema.FieldSchema()
+        self.detail_fields             = {}
+
+        # --- Record the api responses to a snapshot, or answer from one, if
+        #     the config file says so. Has to be in place before any api call
+        self.api_snapshot = snapshot.start_from_config()
+
+        # --- Latency, status, bytes and cache metrics of every api call,
+        #     served on /metrics if the config file gives a metrics_port
+        self.api_metrics    = metrics.Metrics().install()
+        self.metrics_server = metrics.start_from_config(self.api_metrics)
 
         # --- Define the logo for the application
         #
@@ -152,13 +209,10 @@ class mainWindow(QWidget):
         self.api_version_selector_label = QLabel("API Version")
         self.environment_selector_label = QLabel("Environment")
 
-        # --- Define the Comm Log text area
-
-
         # --- Define the station logo widget and associated callsign label
         self.station_logo_image = QLabel()
-        pixmap = QPixmap(os.path.join(RESOURCE_PATH, "no_image.jpg"))
-        pixmap_resized = pixmap.scaled(200, 200, Qt.KeepAspectRatio)
+        pixmap_resized = thumbnails.thumbnail_pixmap(os.path.join(RESOURCE_PATH, "no_image.jpg"),
+                                                     thumbnails.NO_IMAGE_SIZE, thumbnails.NO_IMAGE_SIZE)
         self.station_logo_image.setPixmap(pixmap_resized)
         self.staton_callsign_label = QLabel("No Station Selected")
 
@@ -167,21 +221,56 @@ class mainWindow(QWidget):
         self.station_details_labels = []
         self.station_details_values = []
 
-        # --- Define the Podcast List Widget
-        self.PodcastListWidget = QListWidget()
-        self.PodcastListWidget.setSelectionMode(1) # 1 = SingleSelection, 2 = MultiSelection
+        # --- Podcast artwork is shared by the podcast and episode lists. It is
+        #     only loaded for rows that are on screen, on a bounded thread pool
+        self.podcast_artwork = list_models.ArtworkCache(parent=self)
+
+        # --- Define the Podcast List View and its model. Rows are handed
+        #     to the view a batch at a time as the user scrolls
+        self.podcast_model = list_models.PodcastListModel(self.podcast_artwork, self.catalog, parent=self)
+        self.PodcastListView = QListView()
+        self.PodcastListView.setModel(self.podcast_model)
+        self.PodcastListView.setSelectionMode(1) # 1 = SingleSelection, 2 = MultiSelection
+        self.PodcastListView.setIconSize(QSize(thumbnails.ICON_SIZE, thumbnails.ICON_SIZE))
+        self.PodcastListView.setUniformItemSizes(True)
+        self.PodcastListView.setWordWrap(True)
         self.podcast_details_labels = []
         self.podcast_details_values = []
 
-        # --- Define the Episodes List Widget
-        self.EpisodesListWidget = QListWidget()
-        self.EpisodesListWidget.setSelectionMode(1) # 1 = SingleSelection, 2 = MultiSelection
+        # --- Define the Episodes List View and its model
+        self.episode_model = list_models.EpisodeListModel(self.podcast_artwork, self.catalog, parent=self)
+        self.EpisodesListView = QListView()
+        self.EpisodesListView.setModel(self.episode_model)
+        self.EpisodesListView.setSelectionMode(1) # 1 = SingleSelection, 2 = MultiSelection
+        self.EpisodesListView.setIconSize(QSize(thumbnails.ICON_SIZE, thumbnails.ICON_SIZE))
+        self.EpisodesListView.setUniformItemSizes(True)
+        self.EpisodesListView.setWordWrap(True)
         self.episode_details_labels = []
         self.episode_details_values = []
 
-        # --- Define the Communication Log text area
-        self.commLogTextArea = QTextEdit()
-        self.commLogTextArea.setFont(QFont('SansSerif', 10))
+        # --- Define the Communication Log, a ring buffer of the last
+        #     COMM_LOG_EVENTS api calls, image downloads and player events
+        #     shown in a table that only adds the new rows as they come,
+        #     and the buttons to export it and the playback metrics
+        self.comm_log = comm_log.CommLog(COMM_LOG_EVENTS)
+        self.comm_log_model = comm_log.CommLogModel(self.comm_log, parent=self)
+        self.commLogView = QTableView()
+        self.commLogView.setModel(self.comm_log_model)
+        self.commLogView.setFont(QFont('SansSerif', 10))
+        self.commLogView.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.commLogView.setWordWrap(False)
+        self.commLogView.verticalHeader().setVisible(False)
+        self.commLogView.verticalHeader().setDefaultSectionSize(18)
+        self.commLogView.horizontalHeader().setStretchLastSection(True)
+        self.commLogView.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.comm_log_model.rowsInserted.connect(self.follow_comm_log)
+        self.export_comm_log_button = QPushButton("Export Comm Log")
+        self.export_metrics_button  = QPushButton("Export Playback Metrics")
+
+        # --- Every api call and image download made by anything in the
+        #     program is logged
+        api_client.add_listener(self.comm_log.api_call)
+        image_cache.add_listener(self.comm_log.image_fetch)
 
         # --------------------------------------------------------------------- ------------ TAB AREA
         # --- Define the Tab Area of the window
@@ -200,17 +289,32 @@ class mainWindow(QWidget):
         self.tabArea.resize(300, 200)
         self.tabArea.setTabShape(8)
 
-        # --- Define the station player widget
-        self.StationPlayer = vlc.MediaPlayer()
+        # --- Follow the player events to time each play session, the
+        #     results are written to the Comm Log as sessions end
+        self.station_monitor = playback_metrics.PlaybackMonitor("station", self)
+        self.station_monitor.message.connect(self.log_player_message)
+        self.station_monitor.session_finished.connect(self.comm_log.play_session)
+        self.episode_monitor = playback_metrics.PlaybackMonitor("episode", self)
+        self.episode_monitor.message.connect(self.log_player_message)
+        self.episode_monitor.session_finished.connect(self.comm_log.play_session)
+
+        # --- Define the station player widget. Both players live as long
+        #     as the window, share one vlc.Instance and are handed new
+        #     media as stations and episodes are selected. libvlc is not
+        #     started until the first one is, which is when the monitors
+        #     start following them
+        self.StationPlayer = media_players.PreloadingPlayer(on_player=self.station_monitor.attach)
         self.station_player_label  = QLabel("Media Not Loaded")
         self.station_player_button = ExtendedQLabel()  # Because QLabel is not clickable
         self.station_player_state  = self.player_states[0] # Not Ready
+        self.station_stream_url    = ""
 
         # --- Define the episode player widget
-        self.EpisodePlayer = vlc.MediaPlayer()
+        self.EpisodePlayer = media_players.PreloadingPlayer(on_player=self.episode_monitor.attach)
         self.episode_player_label  = QLabel("Media Not Loaded")
         self.episode_player_button = ExtendedQLabel()  # Because QLabel is not clickable
         self.episode_player_state  = self.player_states[0] # Not Ready
+        self.episode_stream_url    = ""
 
         # --------------------------------------------------------------------- ------------ STATIONS TAB
         # --- Add widgets to the Stations tab
@@ -219,46 +323,9 @@ class mainWindow(QWidget):
         self.station_tab.layout.addWidget(self.station_logo_image,    1, 0, 1, 3)
         self.station_tab.layout.addWidget(self.station_player_label,  1, 3, 1, 1)
         self.station_tab.layout.addWidget(self.station_player_button, 1, 4, 1, 1)
-        # Get a realtime list of station attributes for the station detail labels
-        # All stations return the same attributes with different values so we just
-        # pick a station more or less at random to get a list of attributes
-        station_attributes = self.get_station_attributes(3)
-
-                                                              # api_version=self.api_version_selector.currentText(),
-                                                              # environment=self.environment_selector.currentText())
-        if len(station_attributes) < 60:
-            sys.exit(1)
-
-        for item in station_attributes.keys():
-            station_detail_label = QLabel(item)
-            station_detail_label.setAlignment(Qt.AlignRight)
-            self.station_details_labels.append(station_detail_label)
-
-        # TODO: Change this to one nested loop
-        row = 2
-        counter = 0
-        for item in self.station_details_labels[0:18]:
-            self.station_tab.layout.addWidget(item, row, 0, 1, 1)
-            self.station_details_values.append(QLineEdit())
-            self.station_tab.layout.addWidget(self.station_details_values[counter], row, 1, 1, 1)
-            row += 1
-            counter += 1
-
-        row = 2
-        for item in self.station_details_labels[18:36]:
-            self.station_tab.layout.addWidget(item, row, 3, 1, 1)
-            self.station_details_values.append(QLineEdit())
-            self.station_tab.layout.addWidget(self.station_details_values[counter], row, 4, 1, 1)
-            row += 1
-            counter += 1
-
-        row = 2
-        for item in self.station_details_labels[36:54]:
-            self.station_tab.layout.addWidget(item, row, 6, 1, 1)
-            self.station_details_values.append(QLineEdit())
-            self.station_tab.layout.addWidget(self.station_details_values[counter], row, 7, 1, 1)
-            row += 1
-            counter += 1
+        # The detail labels are named from the fields of the last station seen,
+        # or a static list the first time, and are renamed as stations load
+        self.set_detail_fields(field_schema.STATION, self.field_schema.fields(field_schema.STATION))
 
         # --- Set the layout for the stations tab area
         self.station_tab.setLayout(self.station_tab.layout)
@@ -270,38 +337,11 @@ class mainWindow(QWidget):
         self.podcasts_tab.layout = QGridLayout(self)
 
         # --- Place the Podcast List Widget in the grid
-        self.podcasts_tab.layout.addWidget(self.PodcastListWidget, 0, 0, 15, 1)
-
-        # --- Get a list of realtime podcast attributes from the api to use for
-        #     creating the labels for the podcast details. As all podcasts have the
-        #     same attributes we select a station more or less at random and
-        #     get the attributes from the first podcasts of that stations
-        self.podcast_attributes = self.station_id_2_podcast_list(1157)[0]["attributes"]
-
-        # --- Create a list of both Labels and Text boxes for the podcast details
-        for item in self.podcast_attributes:
-            podcast_label = QLabel(str(item))
-            podcast_label.setAlignment(Qt.AlignRight)
-            self.podcast_details_labels.append(podcast_label)
-            lineEdit = QLineEdit()
-            font = lineEdit.font()
-            font.setPointSize(10)  # set Font size
-            lineEdit.setFont(font)
-            self.podcast_details_values.append(lineEdit)
-
-        # --- Add the Labels to the grid for the podcast tab
-        row = 1
-        labelColumn = 3
-        for item in self.podcast_details_labels:
-            self.podcasts_tab.layout.addWidget(item, row, labelColumn, 1, 1)
-            row += 1
-
-        # --- Add the text boxes to the grid for the podcast tab
-        row = 1
-        textDetailsColumn = 4
-        for item in self.podcast_details_values:
-            self.podcasts_tab.layout.addWidget(item, row, textDetailsColumn, 1, 1)
-            row += 1
+        self.podcasts_tab.layout.addWidget(self.PodcastListView, 0, 0, 15, 1)
+
+        # --- Labels and text boxes for the podcast details, named like the
+        #     station details
+        self.set_detail_fields(field_schema.PODCAST, self.field_schema.fields(field_schema.PODCAST))
 
         # --- Set the layout for the podcasts tab area
         self.podcasts_tab.setLayout(self.podcasts_tab.layout)
@@ -313,42 +353,11 @@ class mainWindow(QWidget):
         self.episodes_tab.layout = QGridLayout(self)
 
         # --- Place the Podcast List Widget in the grid
-        self.episodes_tab.layout.addWidget(self.EpisodesListWidget, 0, 0, 15, 1)
-
-        # --- Get a list of realtime episode attributes from the api to use for
-        #     creating the labels for the episode details. As all episodes have the
-        #     same attributes we select a podcast more or less at random and
-        #     get the attributes from the first episode of that podcast
-        self.episodes_attributes = self.podcast_id_2_episodes(22334)[0]["attributes"]
-
-        # --- Create a list of both Labels and Text boxes for the Episode details
-        for item in self.episodes_attributes:
-            episode_label = QLabel(item)
-            episode_label.setAlignment(Qt.AlignRight)
-            self.episode_details_labels.append(episode_label)
-            lineEdit = QLineEdit()
-            font = lineEdit.font()
-            font.setPointSize(10)  # set Font size
-            lineEdit.setFont(font)
-            self.episode_details_values.append(lineEdit)
-
-        # --- Add the Labels to the grid for the episodes tab
-        row = 1
-        labelColumn = 3
-        for item in self.episode_details_labels:
-            self.episodes_tab.layout.addWidget(item, row, labelColumn, 1, 1)
-            row += 1
-
-        # --- Add the text boxes to the grid for the episodes tab
-        row = 1
-        textDetailsColumn = 4
-        for item in self.episode_details_values:
-            self.episodes_tab.layout.addWidget(item, row, textDetailsColumn, 1, 1)
-            row += 1
-
-        # --- Place the episode player in the grid and set the initial state
-        self.episodes_tab.layout.addWidget(self.episode_player_label, row, 4, 1, 1)
-        self.episodes_tab.layout.addWidget(self.episode_player_button, row + 1, 4, 1, 1)
+        self.episodes_tab.layout.addWidget(self.EpisodesListView, 0, 0, 15, 1)
+
+        # --- Labels and text boxes for the episode details, the episode
+        #     player goes under them
+        self.set_detail_fields(field_schema.EPISODE, self.field_schema.fields(field_schema.EPISODE))
 
         # --- Set the layout for the episodes tab area
         self.episodes_tab.setLayout(self.episodes_tab.layout)
@@ -359,10 +368,9 @@ class mainWindow(QWidget):
         # --- Specify a Vertical Box layout for the tab
         self.commLog_tab.layout = QVBoxLayout(self)
 
-        self.commLog_tab.layout.addWidget(self.commLogTextArea)
-
-        # define the font for the self.commLogTextArea widget
-
+        self.commLog_tab.layout.addWidget(self.commLogView)
+        self.commLog_tab.layout.addWidget(self.export_comm_log_button)
+        self.commLog_tab.layout.addWidget(self.export_metrics_button)
 
         # --- Set the Layout for the Comm Log tab area
         self.commLog_tab.setLayout(self.commLog_tab.layout)
@@ -393,14 +401,21 @@ class mainWindow(QWidget):
         self.environment_selector.setCurrentText(self.environment_list[1]) # Staging
         self.api_version_selector.addItems(self.api_version_list)
         self.api_version_selector.setCurrentText(self.api_version_list[0]) # v1
-        self.station_ids = self.get_station_ids()
 
-
-        callsigns = list(self.station_ids.keys())
-        callsigns.sort()
-        callsigns[0:0] = [""] # Add an empty entry to the beginning of the list
-        self.station_selector.addItems(callsigns)
-        self.station_selector.setCurrentIndex(0) # Empty selection
+        # --- The station list comes from the local catalog store and is
+        #     synced with the api in the background so the window can be
+        #     painted straight away. Podcasts and episodes held in the store
+        #     are synced the same way and the episodes streamed in are
+        #     stored in the background too.
+        self.station_ids_call = background_call.BackgroundCall(self)
+        self.station_ids_call.finished.connect(self.station_ids_loaded)
+        self.podcasts_sync_call = background_call.BackgroundCall(self)
+        self.podcasts_sync_call.finished.connect(self.podcasts_synced)
+        self.episodes_sync_call = background_call.BackgroundCall(self)
+        self.episodes_sync_call.finished.connect(self.episodes_synced)
+        self.store_call = background_call.BackgroundCall(self)
+        QApplication.instance().aboutToQuit.connect(self.quitting)
+        self.load_station_ids()
 
         # --- Place the tab area in the main window grid
         self.grid_layout.addWidget(self.tabArea, 1, 0, 1, 11)
@@ -428,12 +443,148 @@ class mainWindow(QWidget):
         # --------------------------------------------------------------------- ------------ CONNECTIONS
         # --- Connect the stations_selector change item to the populate
         self.station_selector.activated.connect(self.populate_station_details)
-        self.PodcastListWidget.currentItemChanged.connect(self.podcast_selected)
-        self.EpisodesListWidget.currentItemChanged.connect(self.episode_selected)
+        self.PodcastListView.selectionModel().currentChanged.connect(self.podcast_selected)
+        self.EpisodesListView.selectionModel().currentChanged.connect(self.episode_selected)
         self.station_player_button.clicked.connect(self.station_player_controller)
         self.episode_player_button.clicked.connect(self.episode_player_controller)
-
-
+        self.export_metrics_button.clicked.connect(self.export_playback_metrics)
+        self.export_comm_log_button.clicked.connect(self.export_comm_log)
+        self.environment_selector.activated.connect(self.load_station_ids)
+        self.api_version_selector.activated.connect(self.load_station_ids)
+
+
+
+    # ------------------------------------------------------------------------- load_station_ids()
+    def load_station_ids(self):
+        """ Fill the selector with the stations held in the catalog store
+            for the selected environment and api version, then start
+            syncing them with the api, station_ids_loaded() fills the
+            selector again if they changed """
+        api_version = self.api_version_selector.currentText()
+        environment = self.environment_selector.currentText()
+        self.station_ids = {}
+        station_ids = self.catalog_store.station_ids(api_version, environment)
+        if station_ids:
+            self.station_ids_loaded(station_ids)
+        else:
+            self.station_selector.clear()
+            self.station_selector.addItem("Loading stations...")
+            self.station_selector.setEnabled(False)
+        self.station_ids_call.start(self.catalog_store.sync_stations,
+                                    api_version=api_version,
+                                    environment=environment)
+
+    # ------------------------------------------------------------------------- station_ids_loaded()
+    def station_ids_loaded(self, station_ids):
+        """ Populate the station selector, also as a nice side effect
+            populate the self.station_ids dictionary. The station picked
+            stays picked if it is still there. """
+        if station_ids and station_ids == self.station_ids:
+            return # The sync found nothing new
+        selected = self.station_selector.currentText() if self.station_ids else ""
+        self.station_ids = station_ids or {}
+        callsigns = list(self.station_ids.keys())
+        callsigns.sort()
+        callsigns[0:0] = [""] # Add an empty entry to the beginning of the list
+        self.station_selector.clear()
+        self.station_selector.addItems(callsigns)
+        self.station_selector.setCurrentIndex(callsigns.index(selected) if selected in callsigns else 0)
+        self.station_selector.setEnabled(True)
+        if len(self.station_ids) == 0:
+            self.comm_log.note("No stations came back from the api")
+
+    # ------------------------------------------------------------------------- set_detail_fields()
+    def set_detail_fields(self, kind, fields):
+        """ Name the detail labels of a tab after fields, adding a label and
+            text box for any field there is not one for yet. Labels left
+            over from a record with more fields are blanked. """
+        first_row, column, rows_per_column, most = DETAIL_LAYOUTS[kind]
+        fields = list(fields)[:most]
+        labels = getattr(self, "%s_details_labels" % kind)
+        values = getattr(self, "%s_details_values" % kind)
+        layout = {field_schema.STATION : self.station_tab  ,
+                  field_schema.PODCAST : self.podcasts_tab ,
+                  field_schema.EPISODE : self.episodes_tab }[kind].layout
+
+        while len(labels) < len(fields):
+            index = len(labels)
+            label = QLabel()
+            label.setAlignment(Qt.AlignRight)
+            text_box = QLineEdit()
+            if kind != field_schema.STATION:
+                font = text_box.font()
+                font.setPointSize(10)  # set Font size
+                text_box.setFont(font)
+            labels.append(label)
+            values.append(text_box)
+            row, label_column = first_row + index, column
+            if rows_per_column:
+                row, label_column = first_row + index % rows_per_column, column + 3 * (index // rows_per_column)
+            layout.addWidget(label,    row, label_column,     1, 1)
+            layout.addWidget(text_box, row, label_column + 1, 1, 1)
+
+        for index, label in enumerate(labels):
+            label.setText(fields[index] if index < len(fields) else "")
+        self.detail_fields[kind] = fields
+
+        # --- The episode player sits under the episode details
+        if kind == field_schema.EPISODE:
+            row = first_row + len(labels)
+            for widget in (self.episode_player_label, self.episode_player_button):
+                layout.removeWidget(widget)
+                layout.addWidget(widget, row, 4, 1, 1)
+                row += 1
+
+    # ------------------------------------------------------------------------- show_details()
+    def show_details(self, kind, record):
+        """ Fill the text boxes of a tab from a record, by field name """
+        if self.field_schema.remember(kind, record):
+            self.set_detail_fields(kind, record.keys())
+        values = getattr(self, "%s_details_values" % kind)
+        for text_box in values: text_box.setText("")
+        for field, text_box in zip(self.detail_fields[kind], values):
+            text_box.setText(str(record.get(field, "")))
+            text_box.setCursorPosition(0)
+
+    # ------------------------------------------------------------------------- log_player_message()
+    def log_player_message(self, message):
+        self.comm_log.note(message, comm_log.PLAYER)
+
+    # ------------------------------------------------------------------------- follow_comm_log()
+    def follow_comm_log(self):
+        """ Keep the newest row in sight, unless the user has scrolled up
+            to look at an older one """
+        scroll_bar = self.commLogView.verticalScrollBar()
+        if scroll_bar.value() >= scroll_bar.maximum() - 2 * self.commLogView.verticalHeader().defaultSectionSize():
+            QTimer.singleShot(0, self.commLogView.scrollToBottom)
+
+    # ------------------------------------------------------------------------- closeEvent()
+    def closeEvent(self, event):
+        """ Stop the players and give libvlc back everything it allocated """
+        api_client.remove_listener(self.comm_log.api_call)
+        image_cache.remove_listener(self.comm_log.image_fetch)
+        self.station_monitor.detach()
+        self.episode_monitor.detach()
+        self.StationPlayer.release()
+        self.EpisodePlayer.release()
+        media_players.release_instance()
+        if self.api_snapshot is not None:
+            self.api_snapshot.stop()
+        self.api_metrics.uninstall()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        self.closing = True  # Episodes still streaming are not put in the store
+        if not any(call.running for call in (self.station_ids_call, self.podcasts_sync_call, self.episodes_sync_call,
+                                           self.store_call)):
+            self.catalog_store.close()
+        super().closeEvent(event)
+
+    # ------------------------------------------------------------------------- quitting()
+    def quitting(self):
+        """ The application quits, maybe with no closeEvent(). Episodes
+            still streaming are not put in the store, the thread pool may
+            be gone by the time they are let go of """
+        self.closing = True
 
     # ------------------------------------------------------------------------- ----- populate_station_details()
     def populate_station_details(self):
@@ -445,38 +596,42 @@ class mainWindow(QWidget):
         if self.station_player_state == self.player_states[2]: self.station_player_controller()
 
 
-        # --- Call out to the api and get the station attributes for the selected station
-        result = self.get_station_attributes(self.station_ids[self.station_selector.currentText()],
-                                                  api_version=self.api_version_selector.currentText(),
-                                                  environment=self.environment_selector.currentText())
+        # --- Nothing to do for the empty entry or while the stations are loading
+        station_id = self.station_ids.get(self.station_selector.currentText())
+        if station_id is None: return
+
+        # --- Take the station attributes from the catalog store, the api
+        #     only has to be asked if the station is not held
+        result = (self.catalog_store.station(station_id,
+                                             api_version=self.api_version_selector.currentText(),
+                                             environment=self.environment_selector.currentText()) or
+                  api_utils.get_station_attributes(station_id,
+                                                   api_version=self.api_version_selector.currentText(),
+                                                   environment=self.environment_selector.currentText()))
 
         if len(result) == 0: return # If we got nothing back from get_statoion_attributes() then quit
 
         stream_url = result["station_stream"][FIRST]["url"]
 
         # --- set the station_id and callsign for the selected station
+        self.catalog.add_station(result)
         self.selected_station_id = result["id"]
         self.selected_station_callsign = result["callsign"]
 
         # --- Populate the station details text boxes
-        station_attributes = list(result.values())
-        # TODO: find a cool "index into a list with anther list"" solution
-        counter = 0
-        for item in station_attributes[0:len(self.station_details_values)]:
-            font = self.station_details_values[counter].font()
+        self.show_details(field_schema.STATION, result)
+        for text_box in self.station_details_values:
+            font = text_box.font()
             font.setPointSize(11)
             font.setBold(True)
-            self.station_details_values[counter].setFont(font)
-            self.station_details_values[counter].setText(str(item))
-            self.station_details_values[counter].setCursorPosition(0)
-            counter += 1
+            text_box.setFont(font)
 
 
         # Download and show the image and set the image in the station tab
         station_logo_filename = podcast_player_utils.download_station_logo(result["square_logo_small"])
         if os.path.isfile(station_logo_filename):
-            pixmap = QPixmap(station_logo_filename)
-            pixmap_resized = pixmap.scaled(150, 150, Qt.KeepAspectRatio)
+            pixmap_resized = thumbnails.thumbnail_pixmap(station_logo_filename,
+                                                         thumbnails.LOGO_SIZE, thumbnails.LOGO_SIZE)
             self.station_logo_image.setPixmap(pixmap_resized)
             self.staton_callsign_label.setText("%s %s" %(result["name"], result["callsign"]))
         else:
@@ -484,10 +639,11 @@ class mainWindow(QWidget):
             pass
 
         # Show and load the station player
-        pixmap = QPixmap(os.path.join(RESOURCE_PATH, "play.png"))
-        pixmap_resized = pixmap.scaled(150, 150, Qt.KeepAspectRatio)
+        pixmap_resized = thumbnails.thumbnail_pixmap(os.path.join(RESOURCE_PATH, "play.png"),
+                                                     thumbnails.LOGO_SIZE, thumbnails.LOGO_SIZE)
         self.station_player_button.setPixmap(pixmap_resized)
-        self.StationPlayer = vlc.MediaPlayer(stream_url)
+        self.StationPlayer.prepare(stream_url)
+        self.station_stream_url = stream_url
         self.station_player_state = self.player_states[1]  # Media ready
         self.station_player_label.setText(self.station_player_state)
 
@@ -509,17 +665,19 @@ class mainWindow(QWidget):
         elif self.station_player_state == self.player_states[1]:
 
             if self.episode_player_state == self.player_states[2]: self.episode_player_controller()
+            self.station_monitor.start(self.station_stream_url)
             self.StationPlayer.play()
-            pixmap = QPixmap(os.path.join(RESOURCE_PATH, "pause.png"))
-            pixmap_resized = pixmap.scaled(150, 150, Qt.KeepAspectRatio)
+            pixmap_resized = thumbnails.thumbnail_pixmap(os.path.join(RESOURCE_PATH, "pause.png"),
+                                                         thumbnails.LOGO_SIZE, thumbnails.LOGO_SIZE)
             self.station_player_button.setPixmap(pixmap_resized)
             self.station_player_state = self.player_states[2]
             self.station_player_label.setText(self.player_states[2])
         elif self.station_player_state == self.player_states[2]:
 
+            self.station_monitor.stop()
             self.StationPlayer.stop()
-            pixmap = QPixmap(os.path.join(RESOURCE_PATH, "play.png"))
-            pixmap_resized = pixmap.scaled(150, 150, Qt.KeepAspectRatio)
+            pixmap_resized = thumbnails.thumbnail_pixmap(os.path.join(RESOURCE_PATH, "play.png"),
+                                                         thumbnails.LOGO_SIZE, thumbnails.LOGO_SIZE)
             self.station_player_button.setPixmap(pixmap_resized)
             self.station_player_state = self.player_states[1]
             self.station_player_label.setText(self.player_states[1])
@@ -541,18 +699,20 @@ class mainWindow(QWidget):
         elif self.episode_player_state == self.player_states[1]:
 
             if self.station_player_state == self.player_states[2]: self.station_player_controller()
+            self.episode_monitor.start(self.episode_stream_url)
             self.EpisodePlayer.play()
-            pixmap = QPixmap(os.path.join(RESOURCE_PATH, "pause.png"))
-            pixmap_resized = pixmap.scaled(150, 150, Qt.KeepAspectRatio)
+            pixmap_resized = thumbnails.thumbnail_pixmap(os.path.join(RESOURCE_PATH, "pause.png"),
+                                                         thumbnails.LOGO_SIZE, thumbnails.LOGO_SIZE)
             self.episode_player_button.setPixmap(pixmap_resized)
             self.episode_player_state = self.player_states[2]
             self.episode_player_label.setText(self.player_states[2])
 
         elif self.episode_player_state == self.player_states[2]:
 
+            self.episode_monitor.stop()
             self.EpisodePlayer.stop()
-            pixmap = QPixmap(os.path.join(RESOURCE_PATH, "play.png"))
-            pixmap_resized = pixmap.scaled(150, 150, Qt.KeepAspectRatio)
+            pixmap_resized = thumbnails.thumbnail_pixmap(os.path.join(RESOURCE_PATH, "play.png"),
+                                                         thumbnails.LOGO_SIZE, thumbnails.LOGO_SIZE)
             self.episode_player_button.setPixmap(pixmap_resized)
             self.episode_player_state = self.player_states[1]
             self.episode_player_label.setText(self.player_states[1])
@@ -560,492 +720,262 @@ class mainWindow(QWidget):
 
             pass
 
-    # ------------------------------------------------------------------------- THREAD insert_podcast_list_item()
-    def insert_podcast_list_item(self              ,
-                                 podcast_id        ,
-                                 podcast_image_url ,
-                                 podcast_title     ,
-                                 thread_number     ):
-        """ This is the function that is executed as a thread.
-            Take extra care to hanle andy exceptions a python hates
-            unhandled exceptions in thread"""
-        global  THREAD_MONITOR
-        THREAD_MONITOR[thread_number] = 1
+    # ------------------------------------------------------------------------- export_playback_metrics()
+    def export_playback_metrics(self):
+        """ Append the metrics of every finished play session to a JSON
+            lines file picked by the user """
+        file_name, _ = QFileDialog.getSaveFileName(self, "Export Playback Metrics",
+                                                   os.path.join(CACHE_PATH, "playback_metrics.jsonl"),
+                                                   "JSON Lines (*.jsonl)")
+        if not file_name: return
         try:
-            # --- Download the image for this podcast
-            podcast_image_file = podcast_player_utils.download_station_logo(podcast_image_url)
-
-            # --- Be sure we got an image, if not then use the "image
-            #     not available" image
-            if len(podcast_image_file) == 0:
-                podcast_icon = QIcon(os.path.join(RESOURCE_PATH, "no_image.jpg"))
+            count = playback_metrics.export_jsonl(file_name, self.station_monitor.sessions +
+                                                             self.episode_monitor.sessions)
+            self.comm_log.note("Exported %d play sessions to %s" % (count, file_name))
+        except Exception as e:
+            sys.stderr.write("ERROR -- Unable to export playback metrics to %s\n" % file_name)
+            sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
+            sys.stderr.flush()
+
+    # ------------------------------------------------------------------------- export_comm_log()
+    def export_comm_log(self):
+        """ Save the Comm Log to a file picked by the user, as a HAR archive
+            if the name ends in .har and as JSON lines otherwise """
+        file_name, _ = QFileDialog.getSaveFileName(self, "Export Comm Log",
+                                                   os.path.join(CACHE_PATH, "comm_log.har"),
+                                                   "HAR (*.har);;JSON Lines (*.jsonl)")
+        if not file_name: return
+        try:
+            if file_name.lower().endswith(".har"):
+                count = self.comm_log.export_har(file_name)
             else:
-                podcast_icon = QIcon(podcast_image_file)
-
-            # --- Create the list item as a native object
-            #     To the PodcastListWidget
-            list_item = QListWidgetItem(self.PodcastListWidget)
-
-            # --- Populate the item test and icon/image
-            list_item.setText("Podcast ID: %s\n%s" % (str(podcast_id)    ,
-                                                      str(podcast_title) ) )
-            list_item.setIcon(podcast_icon)
-
+                count = self.comm_log.export_jsonl(file_name)
+            self.comm_log.note("Exported %d Comm Log events to %s" % (count, file_name))
         except Exception as e:
-            pass
-        finally:
-            THREAD_MONITOR[thread_number] = 0
+            sys.stderr.write("ERROR -- Unable to export the Comm Log to %s\n" % file_name)
+            sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
+            sys.stderr.flush()
 
     # ------------------------------------------------------------------------- populate_podcasts()
     def populate_podcasts(self):
-        """ use multi-threading to populate the podcast list """
+        """ Populate the podcast list. The list view only asks the model for
+            the rows it shows, and the podcast images are loaded in the
+            background as those rows are painted. """
+
+        # --- Forget about images still loading for the last station
+        self.podcast_artwork.cancel()
 
         # --- Clear out any existing podcast and or episode values
-        self.PodcastListWidget.clear()
+        self.podcast_model.set_ids([])
         for text_box in self.podcast_details_values: text_box.setText("")
-        self.EpisodesListWidget.clear()
+        self.episode_model.set_ids([])
         for text_box in self.episode_details_values: text_box.setText("")
 
         # --- Stop playing any media players
         if self.station_player_state == self.player_states[2]: self.station_player_controller()
         if self.episode_player_state == self.player_states[2]: self.episode_player_controller()
 
-        # --- Get a list of podcasts for the selected station from the api
-        self.list_of_podcasts = self.station_id_2_podcast_list(self.selected_station_id)
-
-        # --- If there are now podcasts for a given station then we are outta here
-        if len(self.list_of_podcasts) == 0: return
-
-        # ---  Add a list item to the PodcastListWidget for each item
-        #      in the list of podcasts (multi-threaded solution)
-        number_of_podcasts =  len(self.list_of_podcasts)
-
-        # --- initialize the thread monitor
-        for i in range(number_of_podcasts): THREAD_MONITOR.append(0)
-
-        if number_of_podcasts > 0:
-
-            # --- Run the threads to populate the podcast list items
-            counter = 0
-            for item in self.list_of_podcasts:
-
-                id        = item["id"]
-                image_url = item["attributes"]["image"]
-                title     = item["attributes"]["title"]
-                # --- Call a thread
-                t = Thread(target=self.insert_podcast_list_item,
-                           args=(id, image_url, title, counter,))
-                t.start()
-                counter += 1
-
-            # --- Wait for all threads to finish
-            while sum(THREAD_MONITOR) > 0: pass
-
-            # --- A little clean up on the image size
-            self.PodcastListWidget.setIconSize(QSize(100, 100))
-            self.PodcastListWidget.setWordWrap(True)
-
-            # --- Sort teh PodcastListWidget items by ... tbd
-            # TODO: sort the PodcastListWidget items
-            self.PodcastListWidget.sortItems()
-
-            # --- Set the index to the top of the PodcastListWidget
-            self.PodcastListWidget.setCurrentRow(0)
-
-            # --- Populate the text details
-            self.podcast_selected()
-
-        else:
+        # --- Show the podcasts the catalog store holds for the selected
+        #     station straight away, in place of the last station's in the
+        #     catalog, and sync them with the api in the background,
+        #     podcasts_synced() shows them again if they changed
+        api_version = self.api_version_selector.currentText()
+        environment = self.environment_selector.currentText()
+        self.show_podcasts(self.selected_station_id,
+                           self.catalog_store.station_podcasts(self.selected_station_id, api_version, environment) or [])
+        self.podcasts_sync_call.start(self.sync_podcasts, self.selected_station_id, api_version, environment)
+
+    # ------------------------------------------------------------------------- show_podcasts()
+    def show_podcasts(self, station_id, podcasts):
+        """ Index the podcasts of a station in the catalog and hand them to
+            the model, sorted by title. The podcast that was selected stays
+            selected if it is still there, otherwise the top one is, which
+            populates the text details and episodes tab """
+        podcast_ids = self.catalog.set_station_podcasts(station_id, podcasts)
+        self.catalog.drop_other_stations(station_id)
+
+        # --- If there are no podcasts for a given station then we are outta here
+        if len(podcast_ids) == 0:
             # TODO: Add a message box to let the user know that there were no
             #       Podcasts for the selected station
-            pass
+            self.podcast_model.set_ids([])
+            return
+
+        selected_podcast_id = self.PodcastListView.currentIndex().data(Qt.UserRole)
+        self.podcast_model.set_ids(podcast_ids)
+        self.podcast_model.fetchMore()
+        row = self.podcast_model.ids.index(selected_podcast_id) if selected_podcast_id in self.podcast_model.ids else 0
+        while row >= self.podcast_model.rowCount() and self.podcast_model.canFetchMore():
+            self.podcast_model.fetchMore()
+        self.PodcastListView.setCurrentIndex(self.podcast_model.index(row))
+
+    # ------------------------------------------------------------------------- sync_podcasts()
+    def sync_podcasts(self, station_id, api_version, environment):
+        """ Runs on a pool thread, returns (station id, ListDelta or None) """
+        return (station_id, self.catalog_store.sync_station_podcasts(station_id, api_version, environment))
+
+    # ------------------------------------------------------------------------- podcasts_synced()
+    def podcasts_synced(self, result):
+        """ The podcasts of a station were synced with the store. If they
+            have changed, and the station is still the one selected, show
+            them again. """
+        if result is None: return
+        station_id, delta = result
+        if delta is None or not delta.changes(): return
+        if str(self.selected_station_id) != str(station_id): return
+        self.show_podcasts(station_id,
+                           self.catalog_store.station_podcasts(station_id,
+                                                               self.api_version_selector.currentText(),
+                                                               self.environment_selector.currentText()) or [])
 
     # ------------------------------------------------------------------------- podcast_selected()
     def podcast_selected(self):
         """ Populate the podcast text details with the details
             from the selected podcast. This function is executed
-            when a podcast is selected from the PodcastListWidget
+            when a podcast is selected from the PodcastListView
 
         """
 
         if self.episode_player_state == self.player_states[2]: self.episode_player_controller()
 
-        # --- Just in case no PodcastListWidget items have been added yet
-        #     or the item added has no text yet ...
-        if self.PodcastListWidget.count() == 0: return
-        try: selected_podcast_id = self.PodcastListWidget.currentItem().text()
-        except AttributeError: return
-
-        # --- Clean out any old entries that might be laying around
-        for text_box in self.podcast_details_values: text_box.setText("")
+        # --- The row carries the podcast id, just in case no podcasts
+        #     have been added yet
+        podcast = self.catalog.podcast(self.PodcastListView.currentIndex().data(Qt.UserRole))
+        if podcast is None: return
+        self.selected_podcast_id = podcast["id"]
 
-        selected_podcast_id = selected_podcast_id.split("\n")[FIRST]
-        selected_podcast_id = selected_podcast_id.split(":")[LAST]
-        selected_podcast_id = selected_podcast_id.strip()
-
-        for item in self.list_of_podcasts:
-            if str(item["id"]) == selected_podcast_id:
-                podcast_values = list(item["attributes"].values())
-                index = 0
-                for podcast_value_text in self.podcast_details_values:
-                    podcast_value_text.setText(str(podcast_values[index]))
-                    podcast_value_text.setCursorPosition(0)
-                    index += 1
-                break  # No need to look ay further
-            else:
-                pass
+        # --- Fill in the podcast details
+        self.show_details(field_schema.PODCAST, podcast)
 
         # --- Populate the Episodes tab
-        self.populate_episodes(selected_podcast_id)
-        self.EpisodesListWidget.setIconSize(QSize(100, 100))
-
-
+        self.populate_episodes(str(podcast["id"]))
 
     # ------------------------------------------------------------------------- populate_episodes()
     def populate_episodes(self,  selected_podcast_id):
-        """ Using the current podcast ID populate the Episodes LIst widget
+        """ Using the current podcast ID populate the Episodes List view
             with all of the episodes for the selected podcast."""
 
-
         # --- start with a clean list of episodes
-        self.EpisodesListWidget.clear()
-
-        # --- Get a list of episodes using the podcast id from the api
-        self.list_of_episodes = self.podcast_id_2_episodes(selected_podcast_id)
+        self.episode_model.set_ids([])
+
+        # --- Use the image from the selected podcast for all episodes
+        podcast_image_url = self.podcast_model.image_url(self.catalog.podcast(selected_podcast_id))
+
+        # --- Take the episodes from the catalog store, or if it does not
+        #     hold them stream them from the api, through the catalog into
+        #     the model. The model pulls another page of episodes as the
+        #     user scrolls down and the page after that is already being
+        #     fetched in the background
+        api_version = self.api_version_selector.currentText()
+        environment = self.environment_selector.currentText()
+        episodes    = self.catalog_store.podcast_episodes(selected_podcast_id, api_version, environment)
+        self.episodes_from_store = episodes is not None
+        if episodes is None:
+            episodes = self.hold_episodes(selected_podcast_id,
+                                          api_utils.iter_podcast_episodes(selected_podcast_id,
+                                                                          api_version=api_version,
+                                                                          environment=environment),
+                                          api_version, environment)
+        self.episode_model.set_ids(self.catalog.stream_podcast_episodes(selected_podcast_id, episodes),
+                                   podcast_image_url)
+        self.episode_model.fetchMore()
+        self.catalog.drop_other_podcasts(selected_podcast_id)
+
+        # --- Episodes shown from the store are synced with the api in the
+        #     background, episodes_synced() shows them again if they changed
+        if self.episodes_from_store:
+            self.episodes_sync_call.start(self.sync_episodes, selected_podcast_id, api_version, environment)
 
         # --- Check to see if the list of episodes returned from the API is
         #     empty, if so the we are outta here.
-        if len(self.list_of_episodes) == 0:
+        if self.episode_model.rowCount() == 0:
             # TODO: Maybe add a message box to indicate that no episodes
             #       were available for the selected podcast
             return
 
-        for episode in self.list_of_episodes:
-
-            # --- Use the icon from the selected podcast for all episodes
-            episode_icon = self.PodcastListWidget.currentItem().icon()
-
-            # --- Create the list item as a native object
-            #     To the EpisodesListWidget
-            list_item = QListWidgetItem(self.EpisodesListWidget)
-
-            # --- Populate the item test and icon/image
-            list_item.setText("Episode ID: %s\n%s\nPublished: %s" % (str(episode["id"]),
-                                                                     str(episode["attributes"]["title"]),
-                                                                     str(episode["attributes"]["published_date"]) ))
-            list_item.setIcon(episode_icon)
-
-        # --- Populate the text detail values for the selected episode
+    # ------------------------------------------------------------------------- hold_episodes()
+    def hold_episodes(self, podcast_id, episodes, api_version, environment):
+        """ Pass the episodes streamed from the api on and put each page of
+            them in the catalog store as it goes by, off the GUI thread.
+            Once the last one has come, or the episodes are left for another
+            podcast, the list is finished by syncing it in the background,
+            which finds the episodes of the pages seen already held. """
+        page = []
+        try:
+            for episode in episodes:
+                page.append(episode)
+                if len(page) >= api_utils.EPISODES_PAGE_SIZE:
+                    self.store_call.start(self.catalog_store.put_page, catalog_store.EPISODE, page,
+                                          api_version, environment)
+                    page = []
+                yield episode
+        finally:
+            if not self.closing:
+                if page:
+                    self.store_call.start(self.catalog_store.put_page, catalog_store.EPISODE, page,
+                                          api_version, environment)
+                self.store_call.start(self.catalog_store.sync_podcast_episodes, podcast_id, api_version, environment)
+
+    # ------------------------------------------------------------------------- sync_episodes()
+    def sync_episodes(self, podcast_id, api_version, environment):
+        """ Runs on a pool thread, returns (podcast id, ListDelta or None) """
+        return (podcast_id, self.catalog_store.sync_podcast_episodes(podcast_id, api_version, environment))
+
+    # ------------------------------------------------------------------------- episodes_synced()
+    def episodes_synced(self, result):
+        """ The episodes of a podcast were synced with the store. If they
+            were shown from the store and have changed, and the podcast is
+            still the one selected, show them again. """
+        if result is None: return
+        podcast_id, delta = result
+        if delta is None or not delta.changes() or not self.episodes_from_store: return
+        if str(self.selected_podcast_id) != str(podcast_id): return
+        episodes = self.catalog_store.podcast_episodes(podcast_id,
+                                                       self.api_version_selector.currentText(),
+                                                       self.environment_selector.currentText()) or []
+        self.episode_model.set_ids(self.catalog.stream_podcast_episodes(podcast_id, episodes),
+                                   self.podcast_model.image_url(self.catalog.podcast(podcast_id)))
+        self.episode_model.fetchMore()
+        self.catalog.drop_other_podcasts(podcast_id)
 
     # ------------------------------------------------------------------------- episode_selected()
     def episode_selected(self):
         """ Populate the episode text details with the details
             from the selected episode. This function is executed
-               when an episode is selected from the EpisodesListWidget
+               when an episode is selected from the EpisodesListView
         """
 
         # =-- If an Episode is playing then stop that player
         if self.episode_player_state == self.player_states[2]: self.episode_player_controller()
 
-        # --- Just in case no EpiosdesListWidget items have been added yet
-        #     or the item added has no text yet ...
-        if self.EpisodesListWidget.count() == 0: return
-        try:
-            selected_episode_id = self.EpisodesListWidget.currentItem().text()
-        except AttributeError:
-            return
-
-        # --- Clean up any old entries that might be here
-        for text_box in self.episode_details_values: text_box.setText("")
-
-        selected_episode_id = selected_episode_id.split("\n")[FIRST]
-        selected_episode_id = selected_episode_id.split(":")[LAST]
-        selected_episode_id = selected_episode_id.strip()
-
-        for item in self.list_of_episodes:
-            if str(item["id"]) == selected_episode_id:
-                episode_values = list(item["attributes"].values())
-                index = 0
-                episode_stream_url = item["attributes"]["audio_url"]
-                for episode_value_text in self.episode_details_values:
-                    episode_value_text.setText(str(episode_values[index]))
-                    episode_value_text.setCursorPosition(0)
-                    index += 1
-                break  # No need to look ay further
-            else:
-                pass
+        # --- The row carries the episode id, just in case no episodes
+        #     have been added yet
+        episode = self.catalog.episode(self.EpisodesListView.currentIndex().data(Qt.UserRole))
+        if episode is None: return
+        self.selected_episode_id = episode["id"]
 
-        self.EpisodesListWidget.setWordWrap(True)
+        # --- Fill in the episode details
+        episode_stream_url = episode["audio_url"]
+        self.show_details(field_schema.EPISODE, episode)
 
         # --- Insert the Episode player widget
 
-        pixmap = QPixmap(os.path.join(RESOURCE_PATH, "play.png"))
-        pixmap_resized = pixmap.scaled(150, 150, Qt.KeepAspectRatio)
+        pixmap_resized = thumbnails.thumbnail_pixmap(os.path.join(RESOURCE_PATH, "play.png"),
+                                                     thumbnails.LOGO_SIZE, thumbnails.LOGO_SIZE)
         self.episode_player_button.setPixmap(pixmap_resized)
-        self.EpisodePlayer = vlc.MediaPlayer(episode_stream_url)
+        self.EpisodePlayer.prepare(episode_stream_url)
+        self.episode_stream_url = episode_stream_url
         self.episode_player_state = self.player_states[1]  # Media ready
         self.episode_player_label.setText(self.episode_player_state)
 
 
-
-    # ----------------------------------------------------------------------------- get_station_ids()
-    def get_station_ids(self, api_version="v1", environment=STAGING):
-        """ Returns a dictionary of callsigns --> station_ids. If anything goes
-            wrong then return an empty dictionary. """
-        station_data = {}
-        try:
-
-            # Call out hte the API using the correct environment base url
-            # and the correct api version string
-
-            if api_version == "v1":
-
-                base_url = api_base_urls[environment]
-                api_call_url = "%s/%s/stations?page[size]=400" %(base_url, api_version)
-                r = "NO DATA"
-                self.commLogTextArea.append("Calling: %s\n----------------\n" %api_call_url)
-                r = requests.get(api_call_url)
-                if r == "NO DATA":
-                    raise ValueError("No data from %s" %api_call_url)
-                else:
-                    if r.status_code == requests.codes.ok:
-                        response = r.text
-                        self.commLogTextArea.append("Response:\n%s\n----------------\n" %response)
-
-                        python_data = json.loads(response)
-                        for item in python_data["data"]:
-                            station_data[item["attributes"]["callsign"]] = item["attributes"]["id"]
-                    else:
-                        raise ValueError("Bad Response (%d) from %s " %(r.status_code, api_call_url))
-
-            if api_version == "v2":
-                # V2 calls use a special header and reutrn data differently
-                # than v1 calls.
-
-                base_url = api_base_urls[environment]
-                api_call_url = "%s/%s/stations" % (base_url, api_version)
-                r = "NO DATA"
-                r = requests.get(api_call_url,headers=api_header)
-                if r == "NO DATA":
-                    raise ValueError("No data from %s" % api_call_url)
-                else:
-                    if r.status_code == requests.codes.ok:
-                        response = r.text
-                        python_data = json.loads(response)
-                        for item in python_data["stations"]:
-                            station_data[item["callsign"]] = item["id"]
-                    else:
-                        raise ValueError("Bad Response (%d) from %s " % (r.status_code, api_call_url))
-
-            else:
-                pass
-
-        except Exception as e:
-            sys.stderr.write("ERROR -- Unable to obtain information for stations\n")
-            sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
-            station_data = {}
-        finally:
-            return station_data
-
-    # ----------------------------------------------------------------------------- get_station_attributes()
-    def get_station_attributes(self, station_id, api_version="v1", environment=STAGING):
-        """ Given a station ID return a dictionary of key-value pairs where each
-            each key-value pair is a station attribute. If anything goes wrong
-            return a empty dictionary. """
-
-        station_id = str(station_id)
-        station_attributes = {}
-        try:
-
-            # Call out to the the API using the correct environment base url
-            # and the correct api version string
-
-            if api_version == "v1":
-
-                base_url = api_base_urls[environment]
-                api_call_url = "%s/%s/stations/%s" % (base_url, api_version, station_id)
-                r = "NO DATA"
-                self.commLogTextArea.setText("Calling: %s\n----------------\n" %api_call_url)
-                r = requests.get(api_call_url)
-                if r == "NO DATA":
-                    raise ValueError("No data from %s" % api_call_url)
-                else:
-                    if r.status_code == requests.codes.ok:
-                        response = r.text
-                        self.commLogTextArea.append("Response:\n%s\n----------------\n" % response)
-                        python_data = json.loads(response)
-                        station_attributes =  python_data["data"]["attributes"]
-                    else:
-                        raise ValueError("Bad Response (%d) from %s " % (r.status_code, api_call_url))
-
-            if api_version == "v2":
-                # V2 calls use a special header and reutrn data differently
-                # than v1 calls.
-
-                base_url = api_base_urls[environment]
-                api_call_url = "%s/%s/stations/%s" % (base_url, api_version, station_id)
-                r = "NO DATA"
-                r = requests.get(api_call_url, headers=api_header)
-                if r == "NO DATA":
-                    raise ValueError("No data from %s" % api_call_url)
-                else:
-                    if r.status_code == requests.codes.ok:
-                        response = r.text
-                        python_data = json.loads(response)
-                        station_attributes = python_data["station"]
-                    else:
-                        raise ValueError("Bad Response (%d) from %s " % (r.status_code, api_call_url))
-
-            else:
-                pass
-
-        except Exception as e:
-            sys.stderr.write("ERROR -- Unable to obtain information for station %s\n" %station_id)
-            sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
-            station_attributes = {}
-        finally:
-            return station_attributes
-
-    # ----------------------------------------------------------------------------- station_id_2_podcast_list()
-    def station_id_2_podcast_list(self, station_id, api_version="v1", environment=STAGING):
-        """ Given a station ID return a list of podcasts for that station. If
-            anything goes wrong return an empty list.  """
-        podcast_list = []
-        station_id = str(station_id)
-        r = "NO DATA"
-        try:
-
-            # Call out to the the API using the correct environment base url
-            # and the correct api version string
-
-            if api_version == "v1":
-
-                base_url = api_base_urls[environment]
-                api_call_url = "%s/%s/podcasts?filter[station_id]=%s&page[size]=100" % (base_url, api_version, station_id)
-                r = "NO DATA"
-                self.commLogTextArea.append("Calling: %s\n----------------\n" % api_call_url)
-                r = requests.get(api_call_url)
-                if r == "NO DATA":
-                    raise ValueError("No data from %s" % api_call_url)
-                else:
-                    if r.status_code == requests.codes.ok:
-                        response = r.text
-                        self.commLogTextArea.append("Response:\n%s\n----------------\n" % response)
-                        python_data = json.loads(response)
-                        podcast_list = python_data["data"]
-                    else:
-                        raise ValueError("Bad Response (%d) from %s " % (r.status_code, api_call_url))
-
-            if api_version == "v2":
-                # V2 calls use a special header and return data differently
-                # than v1 calls.
-                pass
-
-                # *** ********************************************************** ***
-                # *** PODCAST FILTER BY STATION ID NOT YET IMPLEMENTED IN V2 API ***
-                # *** ********************************************************** ***
-
-                """  
-                base_url = api_base_urls[environment]
-                api_call_url = "%s/%s/podcasts?filter[station_id]=%s&page[size]=100" % (base_url, api_version, station_id)
-                r = "NO DATA"
-                r = requests.get(api_call_url, headers=api_header)
-                if r == "NO DATA":
-                    raise ValueError("No data from %s" % api_call_url)
-                else:
-                    if r.status_code == requests.codes.ok:
-                        response = r.text
-                        python_data = json.loads(response)
-                        station_attributes = python_data["station"]
-                    else:
-                        raise ValueError("Bad Response (%d) from %s " % (r.status_code, api_call_url))
-                """
-
-            else:
-                pass
-
-        except Exception as e:
-            sys.stderr.write("ERROR -- Unable to obtain podcast information\n")
-            sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
-            podcast_list = []
-        finally:
-            return podcast_list
-
-    # ----------------------------------------------------------------------------- podcast_id_2_episodes()
-    def podcast_id_2_episodes(self, podcast_id, environment=STAGING, api_version="v1"):
-        """ Given a podcast id as eitehr an int or a string, return a list of episodes for
-            that podcast where each item in the list is a set of attributes for a particular
-            episode. If anything goes wrong, return an empty list.  """
-
-        #  Example API call
-        # http://originapi-stg.radio.com/v1/episodes?filter%5Bpodcast_id%5D=22334&page%5Bsize%5D=100&page%5Bnumber%5D=1
-
-        episodes = []
-        r = "NO DATA"
-        podcast_id = str(podcast_id)
-
-        try:
-
-            # Call out to the the API using the correct environment base url
-            # and the correct api version string
-
-            if api_version == "v1":
-
-                base_url = api_base_urls[environment]
-                api_call_url = "%s/%s/episodes?filter[podcast_id]=%s&page[size]=100" % (base_url, api_version, podcast_id)
-                r = "NO DATA"
-                self.commLogTextArea.append("Calling: %s\n----------------\n" % api_call_url)
-                r = requests.get(api_call_url)
-                if r == "NO DATA":
-                    raise ValueError("No data from %s" % api_call_url)
-                else:
-                    if r.status_code == requests.codes.ok:
-                        response = r.text
-                        self.commLogTextArea.append("Response:\n%s\n----------------\n" % response)
-                        python_data = json.loads(response)
-                        episodes = python_data["data"]
-                    else:
-                        raise ValueError("Bad Response (%d) from %s " % (r.status_code, api_call_url))
-
-            if api_version == "v2":
-                # V2 calls use a special header and reutrn data differently
-                # than v1 calls.
-                pass
-
-                # *** ********************************************************** ***
-                # *** EPISODES FILTER BY PODCAST ID NOT YET IMPLEMENTED IN V2 API ***
-                # *** ********************************************************** ***
-
-                """  
-                base_url = api_base_urls[environment]
-                api_call_url = "%s/%s/podcasts?filter[station_id]=%s&page[size]=100" % (base_url, api_version, station_id)
-                r = "NO DATA"
-                r = requests.get(api_call_url, headers=api_header)
-                if r == "NO DATA":
-                    raise ValueError("No data from %s" % api_call_url)
-                else:
-                    if r.status_code == requests.codes.ok:
-                        response = r.text
-                        python_data = json.loads(response)
-                        station_attributes = python_data["station"]
-                    else:
-                        raise ValueError("Bad Response (%d) from %s " % (r.status_code, api_call_url))
-                """
-
-            else:
-                pass
-
-        except Exception as e:
-            sys.stderr.write("ERROR -- Unable to obtain episodes for podcast_id %s\n" % podcast_id)
-            sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
-            episodes = []
-        finally:
-            return episodes
-
-
 # === MAIN ====================================================================
 if __name__ == '__main__':
     app = QApplication(sys.argv)
     windowMain = mainWindow()
     windowMain.show()
+
+    # --- The first pass of the event loop paints the window, time up to there
+    QTimer.singleShot(0, lambda: podcast_player_utils.report_cold_start(START_TIME, STARTUP_BUDGET_MS,
+                                                                        windowMain.comm_log.note))
     sys.exit(app.exec_())
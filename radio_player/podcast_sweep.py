@@ -0,0 +1,155 @@
+#!/usr/local/bin/python3
+
+# RADIO.COM	Headless API sweep. Walks every station, podcast and episode for
+# an environment and api version and writes one JSON line per api call
+# with how long it took. With --probe the station streams and episode
+# audio are opened too and time to first byte and bitrate are recorded.
+# Needs no display so it can run from cron, e.g.
+#
+#     podcast_sweep.py --environment production --api-version v1 --workers 16 --output sweep.jsonl
+#
+# --record saves every api response to a snapshot file and --replay serves
+# a snapshot back from a local stand-in server instead of the real api,
+# so a sweep can be repeated exactly with no network.
+#
+# Latency histograms, status and error counts, bytes and cache hit rates
+# per endpoint, and the stream probe timings, are written out in the
+# Prometheus text format when the sweep ends, to stderr or --metrics-file.
+# --metrics-port also serves them on /metrics while the sweep runs.
+#
+# Special notes:
+#    1.) Requires Python 3 and the Requests library
+#    2.) Return codes:
+#           0 --> Every api call succeeded
+#           1 --> One or more api calls or stream probes failed
+#          99 --> Unable to import third party libraries
+#          98 --> Unable to import custom libraries
+
+# Standard Library imports
+import sys
+import os
+import argparse
+
+# Dictionary of variables
+VERSION        = "1.0.0"
+VERBOSE        = False
+DEBUG          = False
+FIRST          = 0
+LAST           = -1
+ME             = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH        = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+LIBRARY_PATH   = os.path.join(MY_PATH, "./lib")
+PRODUCTION     = "production"
+STAGING        = "staging"
+DEVELOPMENT    = "development"
+
+# Custom library imports
+sys.path.append(LIBRARY_PATH)
+try:
+    import api_client
+    import snapshot
+    import sweep
+    import metrics
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'api_client', 'snapshot', 'sweep' and 'metrics' libraries\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+
+# ----------------------------------------------------------------------------- parse_arguments()
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(prog=ME, description="Headless sweep of the stations, podcasts and "
+                                                          "episodes api, one JSON line per api call")
+    parser.add_argument("-e", "--environment",  choices=[DEVELOPMENT, STAGING, PRODUCTION], default=STAGING)
+    parser.add_argument("-a", "--api-version",  choices=["v1", "v2"], default="v1")
+    parser.add_argument("-w", "--workers",      type=int, default=sweep.SWEEP_WORKERS,
+                        help="number of api calls to run at once (default %(default)s)")
+    parser.add_argument("-o", "--output",       default="-",
+                        help="file to write the JSON lines to (default stdout)")
+    parser.add_argument("--max-stations",       type=int, default=0,
+                        help="only sweep the first N stations")
+    parser.add_argument("--no-episodes",        action="store_true",
+                        help="stop at the podcast lists")
+    parser.add_argument("--probe",              action="store_true",
+                        help="also probe every station stream and the first episode of each "
+                             "podcast for time to first byte and bitrate")
+    parser.add_argument("--use-cache",          action="store_true",
+                        help="answer from the response cache where it is fresh, "
+                             "by default every call goes to the api")
+    parser.add_argument("--record",             metavar="SNAPSHOT",
+                        help="save every api response to a snapshot file")
+    parser.add_argument("--replay",             metavar="SNAPSHOT",
+                        help="answer the api calls from a snapshot file instead of the api")
+    parser.add_argument("--replay-latency",     type=float, default=0.0, metavar="SCALE",
+                        help="with --replay, wait SCALE times as long as each call took when it "
+                             "was recorded (default %(default)s, as fast as possible)")
+    parser.add_argument("--metrics-file",       default="-", metavar="FILE",
+                        help="where to write the metrics when the sweep ends (default stderr)")
+    parser.add_argument("--metrics-port",       type=int, default=0, metavar="PORT",
+                        help="serve the metrics on http://127.0.0.1:PORT/metrics while sweeping")
+    return parser.parse_args(argv)
+
+
+# ----------------------------------------------------------------------------- write_metrics()
+def write_metrics(sweep_metrics, file_name):
+    try:
+        if file_name == "-":
+            sys.stderr.write(sweep_metrics.render())
+            sys.stderr.flush()
+        else:
+            with open(file_name, "w") as f:
+                f.write(sweep_metrics.render())
+    except OSError as e:
+        sys.stderr.write("ERROR -- Unable to write the metrics to %s\n" % file_name)
+        sys.stderr.write("---------------------\n%s\n---------------------\n" % str(e))
+        sys.stderr.flush()
+
+
+# === MAIN ====================================================================
+def main(argv=None):
+    args = parse_arguments(argv)
+
+    # A sweep is meant to time the api, not the cache, and a recording has
+    # to see every call
+    api_client.CACHE_ENABLED = api_client.CACHE_ENABLED and args.use_cache and not (args.record or args.replay)
+
+    sweep_metrics  = metrics.Metrics().install()
+    metrics_server = metrics.MetricsServer(sweep_metrics, args.metrics_port).start() if args.metrics_port else None
+
+    recorder = snapshot.Recorder(args.record).start() if args.record else None
+    replay   = None
+    if args.replay:
+        replay = snapshot.ReplayServer(snapshot.Snapshot.load(args.replay), args.replay_latency).start()
+        replay.install([args.environment])
+
+    out = sys.stdout if args.output == "-" else open(args.output, "a")
+    try:
+        summary = sweep.Sweep(environment  = args.environment     ,
+                              api_version  = args.api_version     ,
+                              workers      = args.workers         ,
+                              out          = out                  ,
+                              max_stations = args.max_stations    ,
+                              episodes     = not args.no_episodes ,
+                              probe        = args.probe           ,
+                              metrics      = sweep_metrics        ).run()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        api_client.close_clients()
+        if recorder is not None:
+            sys.stderr.write("Recorded %d api responses to %s\n" % (recorder.stop(), args.record))
+        if replay is not None:
+            replay.stop()
+            if replay.misses:
+                sys.stderr.write("WARNING -- %d api calls were not in the snapshot %s\n" % (replay.misses, args.replay))
+        sweep_metrics.uninstall()
+        if metrics_server is not None:
+            metrics_server.stop()
+        write_metrics(sweep_metrics, args.metrics_file)
+
+    return 0 if summary["errors"] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
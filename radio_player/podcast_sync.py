@@ -0,0 +1,105 @@
+#!/usr/local/bin/python3
+
+# RADIO.COM	Bring the local catalog store of stations, podcasts and
+# episodes up to date with the api, so the player and podcast_diff.py can
+# read from it. The first run fetches everything, every run after that
+# asks for each page with the ETag it had last time and only reads and
+# writes the pages and records that changed. The episodes of a podcast are
+# only looked at if the podcast is new or changed, --full looks at all of
+# them. One JSON line is written per environment with what was added,
+# changed and removed, e.g.
+#
+#     podcast_sync.py --environment staging --episodes
+#     podcast_sync.py --environment development staging production
+#
+# Special notes:
+#    1.) Requires Python 3 and the Requests library
+#    2.) Return codes:
+#           0 --> The store is up to date
+#           2 --> One or more lists could not be synced, what was held for them is kept
+#          99 --> Unable to import third party libraries
+#          98 --> Unable to import custom libraries
+
+# Standard Library imports
+import sys
+import os
+import json
+import argparse
+
+# Dictionary of variables
+VERSION        = "1.0.0"
+VERBOSE        = False
+DEBUG          = False
+FIRST          = 0
+LAST           = -1
+ME             = os.path.split(sys.argv[FIRST])[LAST]  # Name of this file
+MY_PATH        = os.path.dirname(os.path.realpath(__file__))  # Path for this file
+LIBRARY_PATH   = os.path.join(MY_PATH, "./lib")
+PRODUCTION     = "production"
+STAGING        = "staging"
+DEVELOPMENT    = "development"
+
+# Custom library imports
+sys.path.append(LIBRARY_PATH)
+try:
+    import api_client
+    import catalog_store
+except ModuleNotFoundError:
+    sys.stderr.write("ERROR -- Unable to import the 'api_client' and 'catalog_store' libraries\n")
+    sys.stderr.write("         try: git pull\n")
+    sys.stderr.flush()
+    sys.exit(98)
+
+
+# ----------------------------------------------------------------------------- parse_arguments()
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(prog=ME, description="Sync the local catalog store with the api")
+    parser.add_argument("-e", "--environment",  nargs="+", choices=[DEVELOPMENT, STAGING, PRODUCTION],
+                        default=[STAGING])
+    parser.add_argument("-a", "--api-version",  choices=["v1", "v2"], default="v1")
+    parser.add_argument("-w", "--workers",      type=int, default=catalog_store.SYNC_WORKERS,
+                        help="api calls to run at once (default %(default)s)")
+    parser.add_argument("--episodes",           action="store_true",
+                        help="sync the episodes of new and changed podcasts too")
+    parser.add_argument("--full",               action="store_true",
+                        help="with --episodes, look at the episodes of every podcast")
+    parser.add_argument("--max-stations",       type=int, default=0,
+                        help="only sync the podcasts of the first N stations")
+    parser.add_argument("--store",              default=catalog_store.STORE_PATH,
+                        help="the local catalog store (default %(default)s)")
+    parser.add_argument("--use-cache",          action="store_true",
+                        help="answer from the response cache where it is fresh")
+    parser.add_argument("-o", "--output",       default="-",
+                        help="file to write the JSON lines to (default stdout)")
+    return parser.parse_args(argv)
+
+
+# === MAIN ====================================================================
+def main(argv=None):
+    args = parse_arguments(argv)
+
+    api_client.CACHE_ENABLED = api_client.CACHE_ENABLED and args.use_cache
+
+    store  = catalog_store.CatalogStore(args.store)
+    errors = 0
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        for environment in args.environment:
+            summary = store.sync(args.api_version, environment, args.episodes, args.workers, args.max_stations,
+                                 args.full)
+            for error in summary["errors"]:
+                sys.stderr.write("ERROR -- %s\n" % error)
+            errors += len(summary["errors"])
+            out.write(json.dumps(dict({"call": "sync"}, **dict(summary, errors=len(summary["errors"])))) + "\n")
+    finally:
+        api_client.close_clients()
+        store.close()
+        if out is not sys.stdout:
+            out.close()
+        sys.stderr.flush()
+
+    return 2 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())